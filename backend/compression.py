@@ -0,0 +1,147 @@
+"""gzip/brotli response compression.
+
+CompressionMiddleware compresses complete (non-streaming) responses on the
+fly. PrecompressedBody keeps the compressed variants next to a cached body,
+so serving a cache hit costs no compression at all.
+"""
+import gzip
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "application/javascript",
+    "application/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "image/svg+xml",
+)
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring br"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def is_compressible(content_type: str, content_types: Iterable[str] = DEFAULT_CONTENT_TYPES) -> bool:
+    return content_type.split(";", 1)[0].strip().lower() in content_types
+
+
+class PrecompressedBody:
+    """An encoded response body plus its compressed variants, built on first use"""
+    __slots__ = ("body", "media_type", "headers", "_variants")
+
+    gzip_level = 9
+    brotli_quality = 9
+    minimum_size = 1024
+
+    def __init__(self, body: bytes, media_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        self._variants: Dict[str, bytes] = {}
+
+    def encoded(self, encoding: str) -> bytes:
+        variant = self._variants.get(encoding)
+        if variant is None:
+            level = self.brotli_quality if encoding == "br" else self.gzip_level
+            variant = self._variants[encoding] = compress(self.body, encoding, level)
+        return variant
+
+    def response(self, accept_encoding: str = "", status_code: int = 200,
+                 extra_headers: Optional[Dict[str, str]] = None) -> Response:
+        headers = {**self.headers, **(extra_headers or {}), "Vary": "Accept-Encoding"}
+        encoding = choose_encoding(accept_encoding) if len(self.body) >= self.minimum_size else None
+        if encoding is None:
+            return Response(self.body, status_code=status_code, media_type=self.media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        return Response(self.encoded(encoding), status_code=status_code, media_type=self.media_type, headers=headers)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses of an allowed content type.
+
+    Streaming responses (SSE, NDJSON exports, large files) and responses that
+    already carry a Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, content_types: Iterable[str] = DEFAULT_CONTENT_TYPES,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_types)
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        pending = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                pending["start"] = message
+                return
+            start = pending.pop("start", None)
+            if start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            body = message.get("body", b"")
+            if not is_compressible(headers.get("content-type", ""), self.content_types):
+                await send(start)
+                await send(message)
+                return
+
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if (encoding is None or message.get("more_body") or "content-encoding" in headers
+                    or len(body) < self.minimum_size):
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            body = compress(body, encoding, self.levels[encoding])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,148 @@
+"""Idempotency-Key handling for POST endpoints.
+
+IdempotencyMiddleware claims the key in a store before the endpoint runs.
+A retry with a completed key gets the stored response replayed without the
+request being validated or stored again; a retry while the first request
+still runs gets 409, and reusing a key for a different request body gets
+422. Only 2xx responses are kept, any other outcome releases the key so the
+client can retry.
+
+Keys are scoped by method and path, not by client address: a mobile client
+retries from a new address, and behind the proxy every client shares one.
+A stored response holds the submitted personal data, but it is replayed only
+for the same body, so a client guessing a key learns nothing it did not send.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+import orjson
+from starlette.datastructures import Headers
+
+MAX_KEY_LENGTH = 255
+
+
+def scoped_key(scope: str, key: str) -> str:
+    """The key as stored, hashed with the route it was used on"""
+    return hashlib.sha256(f"{scope}\0{key}".encode()).hexdigest()
+
+
+def body_fingerprint(content_type: Optional[str], body: bytes) -> str:
+    """SHA-256 of the body; a multipart boundary is random per request, so it is left out"""
+    media_type, _, params = (content_type or "").partition(";")
+    if media_type.strip().lower().startswith("multipart/"):
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "boundary" and value.strip('"'):
+                body = body.replace(value.strip('"').encode(), b"")
+    return hashlib.sha256(body).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware honouring the Idempotency-Key header on the given POST paths.
+
+    store must provide async claim(key, method, path, fingerprint) returning
+    None when the key was free and is now claimed, or the existing record (a
+    dict with method, path, fingerprint, state and, once done, status_code,
+    media_type and body); complete(key, status_code, media_type, body); and
+    release(key). The request body is read up front to fingerprint it, so
+    bodies larger than max_body_size are refused with 413.
+    """
+
+    def __init__(self, app, store, paths: Iterable[str], max_body_size: int, header: str = "idempotency-key"):
+        self.app = app
+        self.store = store
+        self.paths = frozenset(paths)
+        self.max_body_size = max_body_size
+        self.header = header.lower()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(self.header)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._send_json(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._send_too_large(send)
+            return
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return  # client disconnected before sending the whole body
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                await self._send_too_large(send)
+                return
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        fingerprint = body_fingerprint(headers.get("content-type"), body)
+
+        key = scoped_key(f"{scope['method']} {scope['path']}", key)
+        existing = await self.store.claim(key, scope["method"], scope["path"], fingerprint)
+        if existing is not None:
+            await self._answer_retry(send, existing, scope, fingerprint)
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        captured = {"status": None, "media_type": None, "body": []}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["media_type"] = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except BaseException:
+            await self.store.release(key)
+            raise
+        if captured["status"] is not None and 200 <= captured["status"] < 300:
+            await self.store.complete(key, captured["status"], captured["media_type"], b"".join(captured["body"]))
+        else:
+            await self.store.release(key)
+
+    async def _answer_retry(self, send, record: dict, scope, fingerprint: str):
+        if (record.get("method"), record.get("path"), record.get("fingerprint")) != (scope["method"], scope["path"], fingerprint):
+            await self._send_json(send, 422, "Idempotency-Key was already used for a different request")
+        elif record.get("state") != "done":
+            await self._send_json(send, 409, "A request with this Idempotency-Key is still in progress")
+        else:
+            await self._send(send, record["status_code"], record.get("media_type"), record["body"], replayed=True)
+
+    async def _send_too_large(self, send):
+        await self._send_json(send, 413, f"Requests with an Idempotency-Key may be at most {self.max_body_size} bytes")
+
+    async def _send_json(self, send, status: int, detail: str):
+        await self._send(send, status, "application/json", orjson.dumps({"detail": detail}))
+
+    @staticmethod
+    async def _send(send, status: int, media_type: Optional[str], body: bytes, replayed: bool = False):
+        headers = [(b"content-length", str(len(body)).encode())]
+        if media_type:
+            headers.append((b"content-type", media_type.encode()))
+        if replayed:
+            headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
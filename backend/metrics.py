@@ -0,0 +1,305 @@
+"""Prometheus text-format metrics without external dependencies.
+
+Counters, gauges and histograms keep plain per-label-tuple values behind a
+lock (pymongo listeners call in from Motor's worker threads), so recording a
+sample costs a dict lookup and an addition.
+"""
+import asyncio
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self) -> Iterable[str]:
+        yield from self.header()
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> Iterable[str]:
+        yield from self.header()
+        for labels, series in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]):
+        """Add a callback that yields exposition lines at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+# ASGI scope of the request being served. Motor copies context into its
+# executor threads, so pymongo listeners can see which route issued a command.
+request_scope: ContextVar = ContextVar("request_scope", default=None)
+
+
+def _route_template(scope) -> str:
+    return getattr(scope.get("route"), "path", None) or "<unmatched>"
+
+
+def current_route() -> str:
+    scope = request_scope.get()
+    if scope is None:
+        return "<background>"
+    return _route_template(scope)
+
+
+class RequestTrace:
+    """Time spent per phase (auth, db, validate, encode...) within one request"""
+    __slots__ = ("phases", "mongo_ops")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.mongo_ops = 0
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in self.phases.items()]
+        if self.mongo_ops:
+            entries.append(f'mongo-ops;desc="{self.mongo_ops}"')
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+request_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+@contextmanager
+def trace_phase(name: str):
+    trace = request_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+http_requests_total = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_duration_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_flight = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("router",)
+)
+
+
+def _router_label(path: str) -> str:
+    if path.startswith("/api/admin"):
+        return "admin"
+    if path.startswith("/api"):
+        return "api"
+    return "other"
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording per-route counts, status codes and latency.
+
+    Routes are labelled with their path template (``/api/admin/reports/{report_id}``)
+    so cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = _router_label(scope["path"])
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(router)
+        token = request_scope.set(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_scope.reset(token)
+            http_requests_in_flight.dec(router)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            http_requests_total.inc(scope["method"], template, str(status["code"]))
+            http_request_duration_seconds.observe(elapsed, scope["method"], template)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware emitting a Server-Timing header per request.
+
+    Phases are filled in by trace_phase() blocks and the Mongo command
+    monitor. A sample_rate share of requests is handed to on_sample as a
+    plain dict, off the response path.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0, on_sample: Optional[Callable[[dict], Awaitable]] = None):
+        self.app = app
+        self.sample_rate = sample_rate if on_sample else 0.0
+        self.on_sample = on_sample
+        self._pending = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = request_trace.set(trace)
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing(time.perf_counter() - start).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_trace.reset(token)
+            if self.sample_rate and random.random() < self.sample_rate:
+                self._sample(scope, trace, status["code"], time.perf_counter() - start)
+
+    def _sample(self, scope, trace: RequestTrace, status: int, total: float):
+        document = {
+            "method": scope["method"],
+            "route": _route_template(scope),
+            "path": scope["path"],
+            "status": status,
+            "started_at": datetime.now(timezone.utc),
+            "duration_ms": round(total * 1000, 3),
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in trace.phases.items()},
+            "mongo_ops": trace.mongo_ops,
+        }
+        task = asyncio.ensure_future(self.on_sample(document))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
@@ -0,0 +1,117 @@
+"""Rewrite legacy ISO-string datetimes to native BSON dates.
+
+The migration is online and resumable: it only touches documents whose
+datetime fields are still strings, works in _id order in small batches and
+records its position in the ``migrations`` collection after every batch.
+The API keeps serving both formats while it runs.
+
+Usage:
+    python migrate_datetimes.py [--batch-size 500] [--sleep 0.2] [--collection reports]
+"""
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from server import DATETIME_FIELDS, db, parse_datetime
+
+MIGRATION_ID = "iso_datetimes_to_bson"
+
+logger = logging.getLogger("migrate_datetimes")
+
+
+def _legacy_filter(fields):
+    return {"$or": [{field: {"$type": "string"}} for field in fields]}
+
+
+async def _load_checkpoint(collection_name):
+    state = await db.migrations.find_one({"_id": MIGRATION_ID}) or {}
+    return state.get("checkpoints", {}).get(collection_name)
+
+
+async def _save_checkpoint(collection_name, last_id, migrated):
+    await db.migrations.update_one(
+        {"_id": MIGRATION_ID},
+        {
+            "$set": {f"checkpoints.{collection_name}": last_id},
+            "$inc": {f"migrated.{collection_name}": migrated},
+        },
+        upsert=True,
+    )
+
+
+async def migrate_collection(collection_name, fields, batch_size, sleep):
+    collection = db[collection_name]
+    legacy = _legacy_filter(fields)
+    remaining = await collection.count_documents(legacy)
+    if not remaining:
+        logger.info("%s: nothing to migrate", collection_name)
+        return 0
+
+    last_id = await _load_checkpoint(collection_name)
+    if last_id is not None:
+        logger.info("%s: resuming after _id %s", collection_name, last_id)
+
+    migrated = 0
+    while True:
+        query = dict(legacy)
+        if last_id is not None:
+            query = {"$and": [legacy, {"_id": {"$gt": last_id}}]}
+        batch = await collection.find(query, {field: 1 for field in fields}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            # Match on the old string values so a concurrent admin write wins
+            match = {"_id": doc["_id"]}
+            update = {}
+            for field in fields:
+                value = doc.get(field)
+                if isinstance(value, str):
+                    try:
+                        update[field] = parse_datetime(value)
+                    except ValueError:
+                        logger.warning("%s %s: unparseable %s %r", collection_name, doc["_id"], field, value)
+                        continue
+                    match[field] = value
+            if update:
+                operations.append(UpdateOne(match, {"$set": update}))
+
+        modified = 0
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            modified = result.modified_count
+            migrated += modified
+
+        last_id = batch[-1]["_id"]
+        await _save_checkpoint(collection_name, last_id, modified)
+        logger.info("%s: %d/%d migrated", collection_name, migrated, remaining)
+
+        if sleep:
+            await asyncio.sleep(sleep)
+
+    await db.migrations.update_one({"_id": MIGRATION_ID}, {"$unset": {f"checkpoints.{collection_name}": ""}})
+    return migrated
+
+
+async def run(collections, batch_size, sleep):
+    total = 0
+    for collection_name in collections:
+        total += await migrate_collection(collection_name, DATETIME_FIELDS[collection_name], batch_size, sleep)
+    logger.info("Done, %d documents migrated", total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ISO-string datetimes to BSON dates")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sleep", type=float, default=0.2, help="pause between batches in seconds")
+    parser.add_argument("--collection", action="append", choices=sorted(DATETIME_FIELDS), help="limit to one or more collections")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.collection or list(DATETIME_FIELDS), args.batch_size, args.sleep))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,48 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, Form, HTTPException, Depends, Cookie, Query
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, UploadFile, File, Form, HTTPException, Depends, Cookie, Query, Request
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, uri_parser
+from pymongo import ReturnDocument, UpdateOne, WriteConcern
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError, ExecutionTimeout, OperationFailure, PyMongoError, WriteConcernError
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter
+from typing import List, Optional, Dict, Any, Set
+import re
 import uuid
+import hashlib
+import secrets
+import time
+import orjson
+import asyncio
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 import shutil
+import random
+import smtplib
+from email.message import EmailMessage
+from email.utils import make_msgid
 import jwt
 import bcrypt
 from jose import JWTError, jwt as jose_jwt
 
+from compression import DEFAULT_CONTENT_TYPES, CompressionMiddleware, PrecompressedBody
+from idempotency import IdempotencyMiddleware
+from spool import Spool
+from snapshots import (
+    Snapshot, render_about, render_atom, render_home, render_news_detail, render_news_list, render_rss, render_sitemap,
+)
+from metrics import REGISTRY, PrometheusMiddleware, ServerTimingMiddleware, current_route, request_trace, trace_phase
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -28,28 +55,784 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+# Write batching for public submissions (off by default)
+WRITE_BATCHING_ENABLED = os.getenv("WRITE_BATCHING_ENABLED", "false").lower() == "true"
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", "100"))
+WRITE_BATCH_MAX_LATENCY_MS = float(os.getenv("WRITE_BATCH_MAX_LATENCY_MS", "5"))
+
+# Delta sync: deletes are kept as tombstones for this long, and next_since
+# overlaps the previous window to cover writes that were still in flight
+SYNC_TOMBSTONE_TTL_DAYS = int(os.getenv("SYNC_TOMBSTONE_TTL_DAYS", "30"))
+SYNC_OVERLAP_SECONDS = int(os.getenv("SYNC_OVERLAP_SECONDS", "5"))
+
+# Admin database console limits
+DB_CONSOLE_MAX_LIMIT = int(os.getenv("DB_CONSOLE_MAX_LIMIT", "1000"))
+DB_CONSOLE_MAX_STREAM_LIMIT = int(os.getenv("DB_CONSOLE_MAX_STREAM_LIMIT", "50000"))
+DB_CONSOLE_MAX_TIME_MS = int(os.getenv("DB_CONSOLE_MAX_TIME_MS", "5000"))
+DB_CONSOLE_FORBIDDEN_OPERATORS = {"$where", "$function", "$accumulator"}
+DB_CONSOLE_AGGREGATION_STAGES = {"$match", "$group", "$project", "$sort", "$limit", "$facet", "$bucket"}
+DB_CONSOLE_CACHE_TTL_SECONDS = float(os.getenv("DB_CONSOLE_CACHE_TTL_SECONDS", "30"))
+DB_CONSOLE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("DB_CONSOLE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))  # larger results are not cached
+
+# Admin live events (server-sent events)
+ADMIN_EVENTS_QUEUE_SIZE = int(os.getenv("ADMIN_EVENTS_QUEUE_SIZE", "256"))
+ADMIN_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("ADMIN_EVENTS_HEARTBEAT_SECONDS", "15"))
+ADMIN_EVENTS_TICKET_SECONDS = int(os.getenv("ADMIN_EVENTS_TICKET_SECONDS", "30"))  # lifetime of a stream ticket
+
+# MongoDB client. The pool is per process, so size MONGO_MAX_POOL_SIZE per
+# uvicorn worker and watch mongo_pool_checkout_wait_seconds before raising it.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "0")) or None  # 0 keeps idle connections
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0")) or None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+# Comma-separated, in order of preference: zstd (needs zstandard), snappy (needs python-snappy), zlib
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+MONGO_ZLIB_COMPRESSION_LEVEL = int(os.getenv("MONGO_ZLIB_COMPRESSION_LEVEL", "-1"))
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "stadtwache-backend")
+# Public content GETs may read from secondaries; admin reads and writes stay on the primary.
+# maxStalenessSeconds must be at least 90, -1 disables the staleness check.
+PUBLIC_READ_PREFERENCE = os.getenv("PUBLIC_READ_PREFERENCE", "secondaryPreferred")
+PUBLIC_READ_MAX_STALENESS_SECONDS = int(os.getenv("PUBLIC_READ_MAX_STALENESS_SECONDS", "90"))
+# After an admin write, public reads of that collection go to the primary for this long,
+# so the reload after cache invalidation cannot cache what a lagging secondary still has
+PUBLIC_READ_PRIMARY_AFTER_WRITE_SECONDS = float(os.getenv("PUBLIC_READ_PRIMARY_AFTER_WRITE_SECONDS", "90"))
+
+# Response compression (gzip, and brotli when the brotli package is installed)
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_CONTENT_TYPES = os.getenv("COMPRESSION_CONTENT_TYPES", ",".join(DEFAULT_CONTENT_TYPES)).split(",")
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Public content responses are cached per process together with their compressed
+# variants; admin writes invalidate them, other workers catch up after the TTL
+PUBLIC_CACHE_TTL_SECONDS = float(os.getenv("PUBLIC_CACHE_TTL_SECONDS", "30"))
+PUBLIC_CACHE_MAX_ENTRIES = int(os.getenv("PUBLIC_CACHE_MAX_ENTRIES", "512"))  # news details are cached per id
+# Expired entries are served this much longer while one request reloads them
+PUBLIC_CACHE_STALE_SECONDS = float(os.getenv("PUBLIC_CACHE_STALE_SECONDS", "300"))
+
+# Circuit breaker for public content reads: after PUBLIC_BREAKER_FAILURES
+# consecutive errors or timeouts, serve the last good response until a ping succeeds
+PUBLIC_BREAKER_FAILURES = int(os.getenv("PUBLIC_BREAKER_FAILURES", "3"))
+PUBLIC_BREAKER_TIMEOUT_SECONDS = float(os.getenv("PUBLIC_BREAKER_TIMEOUT_SECONDS", "2"))
+PUBLIC_BREAKER_PROBE_SECONDS = float(os.getenv("PUBLIC_BREAKER_PROBE_SECONDS", "5"))
+PUBLIC_FALLBACK_DIR = os.getenv("PUBLIC_FALLBACK_DIR")  # also keep last good responses on disk, survives restarts
+
+# Local spool for public submissions while MongoDB is unreachable or slower
+# than SPOOL_WRITE_BUDGET_SECONDS; one directory per process. Empty disables it
+SPOOL_DIR = os.getenv("SPOOL_DIR", str(ROOT_DIR / "spool"))
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+SPOOL_WRITE_BUDGET_SECONDS = float(os.getenv("SPOOL_WRITE_BUDGET_SECONDS", "3"))
+SPOOL_REPLAY_INTERVAL_SECONDS = float(os.getenv("SPOOL_REPLAY_INTERVAL_SECONDS", "10"))
+# Spool directories of all processes sharing UPLOAD_DIR, comma separated; the
+# upload sweeper keeps files that spooled submissions still reference
+SPOOL_DIRS = [directory for directory in os.getenv("SPOOL_DIRS", SPOOL_DIR).split(",") if directory]
+
+# Idempotency-Key on public create endpoints: keys live in MongoDB for
+# IDEMPOTENCY_KEY_TTL_DAYS, completed responses also in memory
+IDEMPOTENCY_KEY_TTL_DAYS = int(os.getenv("IDEMPOTENCY_KEY_TTL_DAYS", "1"))
+IDEMPOTENCY_CACHE_SECONDS = float(os.getenv("IDEMPOTENCY_CACHE_SECONDS", "600"))
+IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "2048"))
+# A claim still pending after this long belongs to a request that died; a
+# retry may take it over (default: twice the 60 s proxy read timeout)
+IDEMPOTENCY_PENDING_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_LEASE_SECONDS", "120"))
+# Requests with a key are buffered to fingerprint the body (CV uploads included); larger ones get 413
+IDEMPOTENCY_MAX_BODY_BYTES = int(os.getenv("IDEMPOTENCY_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+
+# Length of the excerpt generated for news saved without one
+NEWS_EXCERPT_LENGTH = int(os.getenv("NEWS_EXCERPT_LENGTH", "200"))
+
+# Pre-rendered HTML pages under /api/pages
+SNAPSHOT_SITE_NAME = os.getenv("SNAPSHOT_SITE_NAME", "Stadtwache")
+SNAPSHOT_REFRESH_DELAY_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_DELAY_SECONDS", "1"))  # coalesces bursts of admin writes
+SNAPSHOT_MAX_NEWS_PAGES = int(os.getenv("SNAPSHOT_MAX_NEWS_PAGES", "200"))
+# Public origin for the absolute links in feeds and the sitemap, e.g.
+# https://www.stadtwache.de; without it those endpoints answer 503
+PUBLIC_SITE_URL = os.getenv("PUBLIC_SITE_URL", "").rstrip("/")
+FEED_MAX_ITEMS = int(os.getenv("FEED_MAX_ITEMS", "20"))
+
+# Background jobs (durable queue in the jobs collection)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # per process, 0 disables the workers
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "30"))
+JOB_MAX_BACKOFF_SECONDS = float(os.getenv("JOB_MAX_BACKOFF_SECONDS", "3600"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))  # a running job is retried after this
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+# Archival: closed reports and old chat messages move to <collection>_archive
+ARCHIVE_REPORT_STATUSES = os.getenv("ARCHIVE_REPORT_STATUSES", "closed,completed").split(",")
+ARCHIVE_REPORTS_AFTER_DAYS = int(os.getenv("ARCHIVE_REPORTS_AFTER_DAYS", "30"))  # since the last update
+ARCHIVE_CHAT_MESSAGES_AFTER_DAYS = int(os.getenv("ARCHIVE_CHAT_MESSAGES_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))  # 0 disables the periodic run
+
+# Retention: the sweeper deletes documents this many days after the date
+# field and records tombstones for them (0, the default, keeps them forever);
+# chat retention also covers the archive
+RETENTION_CHAT_MESSAGES_DAYS = int(os.getenv("RETENTION_CHAT_MESSAGES_DAYS", "0"))  # created_at
+RETENTION_FEEDBACK_DAYS = int(os.getenv("RETENTION_FEEDBACK_DAYS", "0"))  # created_at
+RETENTION_REJECTED_APPLICATIONS_DAYS = int(os.getenv("RETENTION_REJECTED_APPLICATIONS_DAYS", "0"))  # rejected_at
+RETENTION_SWEEP_BATCH_SIZE = int(os.getenv("RETENTION_SWEEP_BATCH_SIZE", "500"))
+RETENTION_SWEEP_INTERVAL_SECONDS = float(os.getenv("RETENTION_SWEEP_INTERVAL_SECONDS", "3600"))  # 0 disables it
+# Uploads no document references any more are deleted by the sweeper (0, the
+# default, disables the periodic run); with UPLOAD_SWEEP_DRY_RUN it only logs them
+UPLOAD_SWEEP_INTERVAL_SECONDS = float(os.getenv("UPLOAD_SWEEP_INTERVAL_SECONDS", "0"))
+UPLOAD_SWEEP_DRY_RUN = os.getenv("UPLOAD_SWEEP_DRY_RUN", "false").lower() == "true"
+UPLOAD_SWEEP_BATCH_SIZE = int(os.getenv("UPLOAD_SWEEP_BATCH_SIZE", "500"))
+UPLOAD_SWEEP_GRACE_SECONDS = float(os.getenv("UPLOAD_SWEEP_GRACE_SECONDS", "3600"))
+
+# Notification mail; without SMTP_HOST no notifications are queued
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() == "true"
+SMTP_SSL = os.getenv("SMTP_SSL", "false").lower() == "true"
+SMTP_FROM = os.getenv("SMTP_FROM", "Stadtwache <noreply@stadtwache.de>")
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+# Metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # if set, /metrics requires it as bearer token
+MONGO_SLOW_QUERY_MS = float(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+
+# Request tracing: share of requests stored in the capped request_traces collection
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_COLLECTION_BYTES = int(os.getenv("TRACE_COLLECTION_BYTES", str(16 * 1024 * 1024)))
+
+upload_bytes_total = REGISTRY.counter("upload_bytes_total", "Bytes written to UPLOAD_DIR", ("kind",))
+uploads_total = REGISTRY.counter("uploads_total", "Files written to UPLOAD_DIR", ("kind",))
+write_batch_size = REGISTRY.histogram(
+    "write_batch_size", "Documents per group-commit insert_many", ("collection",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+mongo_pool_connections = REGISTRY.gauge("mongo_pool_connections", "Open connections per pool", ("address",))
+mongo_pool_checked_out = REGISTRY.gauge("mongo_pool_checked_out", "Connections checked out per pool", ("address",))
+mongo_pool_checkout_failures_total = REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts", ("address", "reason")
+)
+mongo_pool_cleared_total = REGISTRY.counter("mongo_pool_cleared_total", "Pool clear events", ("address",))
+mongo_pool_checkout_wait_seconds = REGISTRY.histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("address",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0),
+)
+mongo_pool_max_size = REGISTRY.gauge("mongo_pool_max_size", "Configured maxPoolSize per process")
+mongo_pool_max_size.set(value=MONGO_MAX_POOL_SIZE)
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Pool size, checkouts and checkout wait time per server address.
+
+    A checkout starts and completes on the same thread, so the start time is
+    kept in a thread-local instead of a shared dict.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _address(self, event):
+        return "%s:%s" % event.address
+
+    def _observe_wait(self, event):
+        started = getattr(self._local, "checkout_started", {}).pop(event.address, None)
+        if started is not None:
+            mongo_pool_checkout_wait_seconds.observe(time.perf_counter() - started, self._address(event))
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_check_out_started(self, event):
+        if not hasattr(self._local, "checkout_started"):
+            self._local.checkout_started = {}
+        self._local.checkout_started[event.address] = time.perf_counter()
+
+    def pool_cleared(self, event):
+        mongo_pool_cleared_total.inc(self._address(event))
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc(self._address(event))
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec(self._address(event))
+
+    def connection_checked_out(self, event):
+        self._observe_wait(event)
+        mongo_pool_checked_out.inc(self._address(event))
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec(self._address(event))
+
+    def connection_check_out_failed(self, event):
+        self._observe_wait(event)
+        mongo_pool_checkout_failures_total.inc(self._address(event), str(event.reason))
+
+mongo_command_duration_seconds = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command", "collection"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+mongo_commands_total = REGISTRY.counter(
+    "mongo_commands_total", "MongoDB commands by route", ("command", "collection", "route", "outcome")
+)
+mongo_slow_commands_total = REGISTRY.counter(
+    "mongo_slow_commands_total", "MongoDB commands over MONGO_SLOW_QUERY_MS", ("command", "collection")
+)
+
+def query_shape(value):
+    """Redact a filter down to its field and operator structure"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(item) for item in value[:3]] + (["..."] if len(value) > 3 else [])
+    return "?"
+
+class CommandMonitor(monitoring.CommandListener):
+    """Per-command latency, per-route counts and a slow query log"""
+    FILTER_KEYS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query", "aggregate": "pipeline"}
+    STATEMENT_KEYS = {"update": "updates", "delete": "deletes"}
+    IGNORED = {"hello", "isMaster", "ismaster", "ping", "endSessions", "saslStart", "saslContinue", "getMore", "killCursors"}
+
+    def __init__(self, slow_ms: float):
+        self.slow_seconds = slow_ms / 1000
+        self._started = {}
+        self.logger = logging.getLogger("mongo.slow_queries")
+
+    def _filter(self, name, command):
+        if name in self.FILTER_KEYS:
+            return command.get(self.FILTER_KEYS[name])
+        statements = command.get(self.STATEMENT_KEYS.get(name, ""))
+        if statements:
+            return statements[0].get("q")
+        return None
+
+    def started(self, event):
+        name = event.command_name
+        if name in self.IGNORED:
+            return
+        collection = event.command.get(name)
+        self._started[(event.connection_id, event.request_id)] = (
+            name,
+            collection if isinstance(collection, str) else "",
+            current_route(),
+            self._filter(name, event.command),
+            request_trace.get(),
+        )
+
+    def _finished(self, event, outcome):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is None:
+            return
+        name, collection, route, filter_, trace = started
+        seconds = event.duration_micros / 1_000_000
+        if trace is not None:
+            trace.add("db", seconds)
+            trace.mongo_ops += 1
+        mongo_command_duration_seconds.observe(seconds, name, collection)
+        mongo_commands_total.inc(name, collection, route, outcome)
+        if seconds >= self.slow_seconds:
+            mongo_slow_commands_total.inc(name, collection)
+            self.logger.warning(
+                "Slow MongoDB %s on %s: %.1f ms (route %s, filter %s)",
+                name, collection, seconds * 1000, route, orjson.dumps(query_shape(filter_)).decode(),
+            )
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+command_monitor = CommandMonitor(MONGO_SLOW_QUERY_MS)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+
+def mongo_client_options() -> Dict[str, Any]:
+    """Keyword arguments for the Motor client; options set in MONGO_URL take precedence"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "appname": MONGO_APP_NAME,
+    }
+    compressors = [name.strip() for name in MONGO_COMPRESSORS.split(",") if name.strip()]
+    if compressors:
+        options["compressors"] = compressors
+        if "zlib" in compressors:
+            options["zlibCompressionLevel"] = MONGO_ZLIB_COMPRESSION_LEVEL
+    query = mongo_url.partition("?")[2]
+    uri_options = {key.lower() for key in uri_parser.split_options(query, validate=False)} if query else set()
+    return {key: value for key, value in options.items() if key.lower() not in uri_options}
+
+client = AsyncIOMotorClient(
+    mongo_url, tz_aware=True, event_listeners=[PoolMetricsListener(), command_monitor], **mongo_client_options()
+)
 db = client[os.environ['DB_NAME']]
 
+def public_read_preference():
+    mode = read_pref_mode_from_name(PUBLIC_READ_PREFERENCE)
+    if PUBLIC_READ_PREFERENCE == "primary":
+        return make_read_preference(mode, None)
+    return make_read_preference(mode, None, PUBLIC_READ_MAX_STALENESS_SECONDS)
+
+# Database handle for public content reads, see PUBLIC_READ_PREFERENCE
+public_db = client.get_database(os.environ['DB_NAME'], read_preference=public_read_preference())
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 admin_router = APIRouter(prefix="/api/admin")
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Helper functions
+# Datetime fields per collection. Older documents hold these as ISO strings;
+# migrate_datetimes.py rewrites them to BSON dates and readers accept both.
+DATETIME_FIELDS = {
+    "admins": ["created_at"],
+    "applications": ["created_at", "updated_at", "rejected_at"],
+    "feedback": ["created_at", "updated_at"],
+    "news": ["date", "updated_at"],
+    "reports": ["created_at", "updated_at"],
+    "chat_messages": ["created_at", "responded_at"],
+    "about": ["updated_at"],
+    "homepage": ["updated_at"],
+    "chat_widget": ["updated_at"],
+}
+
 def prepare_for_mongo(data):
+    # Datetimes are stored as native BSON dates; naive values are taken as UTC
     if isinstance(data, dict):
         for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
+            if isinstance(value, datetime) and value.tzinfo is None:
+                data[key] = value.replace(tzinfo=timezone.utc)
     return data
 
+def new_document(item: BaseModel) -> dict:
+    """Document to insert for a new item. updated_at starts at creation, so
+    delta sync sees new documents without a second date field."""
+    if item.updated_at is None:
+        item.updated_at = datetime.now(timezone.utc)
+    return prepare_for_mongo(item.dict())
+
+def parse_datetime(value):
+    """Return an aware UTC datetime for BSON dates and legacy ISO strings"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+    return value
+
+@lru_cache(maxsize=None)
+def _list_adapter(model):
+    return TypeAdapter(List[model])
+
+def save_upload(upload: UploadFile, path: Path, kind: str) -> int:
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(upload.file, buffer)
+        size = buffer.tell()
+    uploads_total.inc(kind)
+    upload_bytes_total.inc(kind, amount=size)
+    return size
+
+def model_list_response(model, documents):
+    """Encode trusted DB documents once, skipping response_model re-validation"""
+    with trace_phase("validate"):
+        items = [model.model_construct(**doc) for doc in documents]
+    with trace_phase("encode"):
+        content = _list_adapter(model).dump_json(items, warnings=False)
+    return Response(content=content, media_type="application/json")
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after ttl seconds.
+
+    With stale_ttl, lookup() keeps returning an expired entry, marked stale,
+    for that many more seconds. invalidate() and clear() bump generation, so
+    a load that started before them can tell its result is outdated.
+    """
+    instances: Dict[str, "TTLCache"] = {}
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 256, stale_ttl: float = 0):
+        self.name = name
+        TTLCache.instances[name] = self
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """Return (value, fresh), or (None, False) on a miss"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is None or entry[0] + self.stale_ttl < now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        if entry[0] < now:
+            self.stale_hits += 1
+            return entry[1], False
+        self.hits += 1
+        return entry[1], True
+
+    def get(self, key):
+        value, fresh = self.lookup(key)
+        return value if fresh else None
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.generation += 1
+
+    def invalidate(self, predicate):
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+        self.generation += 1
+
+single_flight_requests_total = REGISTRY.counter(
+    "single_flight_requests_total", "Loads started (leader) or joined (follower) per flight group", ("group", "role")
+)
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight load.
+
+    The load runs as its own task, so a caller that disconnects does not
+    cancel it for the others waiting on the same key.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Any, asyncio.Future] = {}
+
+    async def do(self, key, load):
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(load())
+            future.add_done_callback(lambda done: self._done(key, done))
+            single_flight_requests_total.inc(self.name, "leader")
+        else:
+            single_flight_requests_total.inc(self.name, "follower")
+        return await asyncio.shield(future)
+
+    def _done(self, key, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # retrieved here when every caller went away
+
+    def forget(self, predicate):
+        """Let later calls start a new load instead of joining one that read outdated data"""
+        for key in [key for key in self._calls if predicate(key)]:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+circuit_breaker_open = REGISTRY.gauge("circuit_breaker_open", "1 while the breaker fails fast", ("breaker",))
+circuit_breaker_trips_total = REGISTRY.counter("circuit_breaker_trips_total", "Times the breaker opened", ("breaker",))
+stale_fallback_responses_total = REGISTRY.counter(
+    "stale_fallback_responses_total", "Public responses served from the last good copy", ("collection",)
+)
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Fails fast after failure_threshold consecutive MongoDB errors or timeouts.
+
+    While open, a background probe runs every probe_interval seconds and
+    closes the breaker as soon as it succeeds.
+    """
+    errors = (PyMongoError, asyncio.TimeoutError)
+
+    def __init__(self, name: str, failure_threshold: int, timeout: float, probe_interval: float, probe):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.timeout = timeout
+        self.probe_interval = probe_interval
+        self.probe = probe
+        self.failures = 0
+        self.is_open = False
+        self._probe_task = None
+        self.logger = logging.getLogger("circuit_breaker")
+        circuit_breaker_open.set(self.name, value=0)
+
+    async def call(self, load):
+        if self.is_open:
+            raise CircuitOpenError(self.name)
+        try:
+            result = await asyncio.wait_for(load(), self.timeout)
+        except self.errors:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and not self.is_open:
+                self._trip()
+            raise
+        self.failures = 0
+        return result
+
+    def _trip(self):
+        self.is_open = True
+        circuit_breaker_open.set(self.name, value=1)
+        circuit_breaker_trips_total.inc(self.name)
+        self.logger.warning("%s breaker open after %d failures", self.name, self.failures)
+        self._probe_task = asyncio.ensure_future(self._probe_until_closed())
+
+    async def _probe_until_closed(self):
+        while self.is_open:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await asyncio.wait_for(self.probe(), self.timeout)
+            except Exception as e:
+                self.logger.info("%s probe failed: %s", self.name, e)
+                continue
+            self.is_open = False
+            self.failures = 0
+            circuit_breaker_open.set(self.name, value=0)
+            self.logger.warning("%s breaker closed", self.name)
+
+    def stop(self):
+        if self._probe_task:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+class LastGoodResponses:
+    """Last successfully loaded body per public cache key, kept in memory and,
+    with a directory, written to disk so it survives a restart during an outage."""
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory else None
+        self._bodies: Dict[tuple, PrecompressedBody] = {}
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: tuple) -> Path:
+        return self.directory / (re.sub(r"[^A-Za-z0-9_-]", "_", ".".join(key)) + ".json")
+
+    async def remember(self, key: tuple, entry: PrecompressedBody):
+        previous = self._bodies.get(key)
+        self._bodies[key] = entry
+        if self.directory and (previous is None or previous.body != entry.body):
+            await asyncio.to_thread(self._write, self._path(key), entry.body)
+
+    @staticmethod
+    def _write(path: Path, body: bytes):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+
+    async def recall(self, key: tuple) -> Optional[PrecompressedBody]:
+        entry = self._bodies.get(key)
+        if entry is None and self.directory:
+            try:
+                body = await asyncio.to_thread(self._path(key).read_bytes)
+            except OSError:
+                return None
+            entry = self._bodies[key] = PrecompressedBody(body)
+        return entry
+
+async def ping_mongo():
+    await client.admin.command("ping")
+
+public_cache = TTLCache(
+    "public", PUBLIC_CACHE_TTL_SECONDS, max_entries=PUBLIC_CACHE_MAX_ENTRIES, stale_ttl=PUBLIC_CACHE_STALE_SECONDS
+)
+public_flights = SingleFlight("public")
+public_breaker = CircuitBreaker(
+    "public_reads", PUBLIC_BREAKER_FAILURES, PUBLIC_BREAKER_TIMEOUT_SECONDS, PUBLIC_BREAKER_PROBE_SECONDS, ping_mongo
+)
+last_good_responses = LastGoodResponses(PUBLIC_FALLBACK_DIR)
+PrecompressedBody.minimum_size = COMPRESSION_MINIMUM_SIZE
+
+# Collection name -> monotonic time of the last admin write in this process
+last_public_writes: Dict[str, float] = {}
+
+def public_database(collection_name: str):
+    """public_db, or the primary shortly after an admin write to collection_name"""
+    written_at = last_public_writes.get(collection_name)
+    if written_at is not None and time.monotonic() - written_at < PUBLIC_READ_PRIMARY_AFTER_WRITE_SECONDS:
+        return db
+    return public_db
+
+def invalidate_public_cache(collection_name: str):
+    last_public_writes[collection_name] = time.monotonic()
+    public_cache.invalidate(lambda key: key[0] == collection_name)
+    public_flights.forget(lambda key: key[0] == collection_name)
+    page_snapshots.refresh_later(collection_name)
+
+async def load_public_entry(key: tuple, load) -> PrecompressedBody:
+    generation = public_cache.generation
+    body = await public_breaker.call(load)
+    with trace_phase("encode"):
+        if isinstance(body, Response):
+            content = body.body
+        elif isinstance(body, BaseModel):
+            content = body.model_dump_json().encode()
+        else:
+            content = orjson.dumps(body)
+    entry = PrecompressedBody(content)
+    # An admin write during the load invalidated what was read
+    if public_cache.generation == generation:
+        public_cache.set(key, entry)
+        await last_good_responses.remember(key, entry)
+    return entry
+
+async def revalidate_public_entry(key: tuple, load):
+    try:
+        await public_flights.do(key, lambda: load_public_entry(key, load))
+    except Exception as e:
+        logging.getLogger(__name__).warning("Revalidating %s failed: %r", key, e)
+
+STALE_CONTENT_HEADERS = {"X-Content-Stale": "database-unavailable"}
+
+async def cached_public_response(request: Request, key: tuple, load) -> Response:
+    """Serve a public GET from public_cache; key[0] names the collection it reads.
+
+    Concurrent misses for one key share a single load. An expired entry is
+    served as is while one background load replaces it. When MongoDB fails
+    or the breaker is open, the last good body is served, marked stale.
+    """
+    entry, fresh = public_cache.lookup(key)
+    stale_headers = None
+    if entry is None:
+        try:
+            entry = await public_flights.do(key, lambda: load_public_entry(key, load))
+        except (CircuitOpenError, *CircuitBreaker.errors) as e:
+            entry = await last_good_responses.recall(key)
+            if entry is None:
+                raise HTTPException(status_code=503, detail="Content temporarily unavailable") from e
+            stale_fallback_responses_total.inc(key[0])
+            stale_headers = STALE_CONTENT_HEADERS
+    elif not fresh:
+        if public_breaker.is_open:
+            stale_headers = STALE_CONTENT_HEADERS
+        else:
+            asyncio.ensure_future(revalidate_public_entry(key, load))
+    with trace_phase("compress"):
+        return entry.response(request.headers.get("accept-encoding", ""), extra_headers=stale_headers)
+
+async def active_list(collection_name: str, model):
+    documents = await public_database(collection_name)[collection_name].find({"active": True}).sort("order", 1).to_list(100)
+    return model_list_response(model, documents)
+
+async def singleton_content(collection_name: str, model, database=None):
+    """Public single-document content, created with defaults if missing"""
+    content = await (database if database is not None else public_database(collection_name))[collection_name].find_one()
+    if not content and database is not db:
+        # A lagging secondary may not have it yet, check the primary before creating it
+        content = await db[collection_name].find_one()
+    if not content:
+        # Create default content
+        default_content = model()
+        await db[collection_name].insert_one(new_document(default_content))
+        return default_content
+    return model(**content)
+
+async def upsert_singleton(collection_name: str, model, update_data: dict):
+    """Update a single-document collection, creating it with model defaults if missing"""
+    defaults = prepare_for_mongo(model(**update_data).dict())
+    return await db[collection_name].find_one_and_update(
+        {},
+        {"$set": update_data, "$setOnInsert": {k: v for k, v in defaults.items() if k not in update_data}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def record_tombstones(collection_name: str, ids: List[str]):
+    if ids:
+        deleted_at = datetime.now(timezone.utc)
+        await db.tombstones.insert_many(
+            [{"collection": collection_name, "id": doc_id, "deleted_at": deleted_at} for doc_id in ids]
+        )
+
+ARCHIVE_COLLECTIONS = {"reports": "reports_archive", "chat_messages": "chat_messages_archive"}
+
+def archive_union_pipeline(collection_name: str, match: dict, sort: Optional[dict] = None, limit: Optional[int] = None) -> list:
+    """Read a collection together with its archive; $unionWith needs MongoDB 4.4+.
+
+    Sort and limit run in both branches first, so each side can use its index
+    and only limit documents per side reach the final sort.
+    """
+    branch = [{"$match": match}]
+    if sort:
+        branch.append({"$sort": sort})
+    if limit:
+        branch.append({"$limit": limit})
+    pipeline = branch + [{"$unionWith": {"coll": ARCHIVE_COLLECTIONS[collection_name], "pipeline": list(branch)}}]
+    if sort:
+        pipeline.append({"$sort": sort})
+    if limit:
+        pipeline.append({"$limit": limit})
+    return pipeline
+
+async def restore_archived(collection_name: str, doc_id: str) -> bool:
+    """Move an archived document back into its hot collection so it can be edited"""
+    archive = db[ARCHIVE_COLLECTIONS[collection_name]]
+    document = await archive.find_one({"id": doc_id})
+    if document is None:
+        return False
+    try:
+        await db[collection_name].insert_one(document)
+    except DuplicateKeyError:
+        pass  # a concurrent restore put it back already
+    await archive.delete_one({"id": doc_id})
+    # Delta-sync clients pick it up again through its next update
+    await db.tombstones.delete_many({"collection": collection_name, "id": doc_id})
+    return True
+
+async def changes_since_response(collection_name: str, model, since: datetime, limit: int = 1000):
+    """Documents created, updated or deleted after `since` for delta sync.
+
+    Changes come oldest first. A truncated page ends on its last updated_at
+    and next_since continues from there; documents sharing that timestamp are
+    all included, so the next page can skip past it without losing any.
+    """
+    since = parse_datetime(since)
+    if since < datetime.now(timezone.utc) - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS):
+        raise HTTPException(status_code=410, detail="since is older than the tombstone retention, reload the full collection")
+
+    next_since = datetime.now(timezone.utc) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    documents = await db[collection_name].find({"updated_at": {"$gt": since}}).sort("updated_at", 1).to_list(limit + 1)
+    complete = len(documents) <= limit
+    if not complete:
+        last = documents[limit - 1]["updated_at"]
+        documents = [doc for doc in documents[:limit] if doc["updated_at"] != last]
+        documents += await db[collection_name].find({"updated_at": last}).to_list(None)
+        next_since = min(parse_datetime(last), next_since)
+    tombstones = await db.tombstones.find(
+        {"collection": collection_name, "deleted_at": {"$gt": since}}, {"_id": 0, "id": 1}
+    ).to_list(None)
+
+    items = [model.model_construct(**doc) for doc in documents]
+    content = orjson.dumps({
+        "changes": orjson.Fragment(_list_adapter(model).dump_json(items, warnings=False)),
+        "deleted": [tombstone["id"] for tombstone in tombstones],
+        "since": since,
+        "next_since": max(since, next_since),
+        "complete": complete,
+    })
+    return Response(content=content, media_type="application/json")
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -66,14 +849,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
-async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def authenticate_admin_token(token: Optional[str]):
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not token:
+        raise credentials_exception
     try:
-        payload = jose_jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jose_jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -86,6 +871,857 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
         raise credentials_exception
     return admin
 
+async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    with trace_phase("auth"):
+        return await authenticate_admin_token(credentials.credentials)
+
+def _ticket_hash(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+async def issue_stream_ticket(admin: dict) -> str:
+    """Short-lived, single-use credential for URLs; only its hash is stored"""
+    ticket = secrets.token_urlsafe(32)
+    await db.stream_tickets.insert_one({
+        "ticket_hash": _ticket_hash(ticket),
+        "username": admin["username"],
+        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ADMIN_EVENTS_TICKET_SECONDS),
+    })
+    return ticket
+
+async def get_current_admin_for_stream(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    ticket: Optional[str] = Query(None)
+):
+    # EventSource cannot send headers, so it presents a stream ticket as ?ticket=
+    # instead of the JWT, which would end up in access logs
+    with trace_phase("auth"):
+        if credentials:
+            return await authenticate_admin_token(credentials.credentials)
+        claimed = None
+        if ticket:
+            claimed = await db.stream_tickets.find_one_and_delete(
+                {"ticket_hash": _ticket_hash(ticket), "expires_at": {"$gt": datetime.now(timezone.utc)}}
+            )
+        admin = await db.admins.find_one({"username": claimed["username"]}) if claimed else None
+        if admin is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+        return admin
+
+class InsertBatcher:
+    """Group-commit for public submissions.
+
+    Inserts are buffered per collection for at most max_latency_ms (or until
+    max_size documents are waiting) and written with one journaled
+    insert_many. Each caller returns only after its batch is acknowledged.
+    A document rejected by the server fails its own caller with a
+    BulkWriteError; when only the write concern failed, the documents were
+    inserted and every other caller gets a WriteConcernError.
+    """
+    BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+    DURABLE = WriteConcern(w="majority", j=True)
+
+    def __init__(self, enabled: bool, max_size: int, max_latency_ms: float):
+        self.enabled = enabled
+        self.max_size = max(1, max_size)
+        self.max_latency = max_latency_ms / 1000
+        self._pending: Dict[str, list] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flushes = set()
+        self.batches = 0
+        self.documents = 0
+        self.largest_batch = 0
+        self.batch_size_counts = {bucket: 0 for bucket in self.BATCH_SIZE_BUCKETS}
+
+    async def insert(self, collection_name: str, document: dict):
+        if not self.enabled:
+            await db[collection_name].insert_one(document)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(collection_name, [])
+        pending.append((document, future))
+        if len(pending) >= self.max_size:
+            self._flush_now(collection_name)
+        elif collection_name not in self._timers:
+            self._timers[collection_name] = asyncio.get_running_loop().call_later(
+                self.max_latency, self._flush_now, collection_name
+            )
+        await future
+
+    def _flush_now(self, collection_name: str):
+        timer = self._timers.pop(collection_name, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(collection_name, None)
+        if batch:
+            task = asyncio.ensure_future(self._flush(collection_name, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, collection_name: str, batch: list):
+        failed = {}
+        try:
+            collection = db[collection_name].with_options(write_concern=self.DURABLE)
+            await collection.insert_many([document for document, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            concern_errors = e.details.get("writeConcernErrors")
+            if concern_errors:
+                error = WriteConcernError(concern_errors[0].get("errmsg", ""), concern_errors[0].get("code"), concern_errors[0])
+                failed = {index: error for index in range(len(batch))}
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = BulkWriteError(error)
+        except Exception as e:
+            failed = {index: e for index in range(len(batch))}
+
+        self._record(collection_name, len(batch))
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(None)
+
+    def _record(self, collection_name: str, size: int):
+        write_batch_size.observe(size, collection_name)
+        self.batches += 1
+        self.documents += size
+        self.largest_batch = max(self.largest_batch, size)
+        for bucket in self.BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_counts[bucket] += 1
+                break
+
+    async def drain(self):
+        for collection_name in list(self._pending):
+            self._flush_now(collection_name)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_size,
+            "max_latency_ms": self.max_latency * 1000,
+            "batches": self.batches,
+            "documents": self.documents,
+            "average_batch_size": round(self.documents / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.largest_batch,
+            "batch_size_histogram": {f"le_{bucket}": count for bucket, count in self.batch_size_counts.items()},
+            "pending": sum(len(batch) for batch in self._pending.values()),
+        }
+
+insert_batcher = InsertBatcher(WRITE_BATCHING_ENABLED, WRITE_BATCH_MAX_SIZE, WRITE_BATCH_MAX_LATENCY_MS)
+
+class AdminEventBroadcaster:
+    """In-process fan-out of create/update events to connected admin streams.
+
+    Each event is encoded once and the same bytes are queued for every
+    subscriber. A subscriber whose queue overflows is disconnected so it
+    reconnects and refetches instead of slowing everyone else down.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._last_id = 0
+
+    @property
+    def connections(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, payload: BaseModel):
+        if not self._subscribers:
+            return
+        self._last_id += 1
+        message = f"id: {self._last_id}\nevent: {event}\ndata: {payload.model_dump_json()}\n\n".encode()
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+admin_events = AdminEventBroadcaster(ADMIN_EVENTS_QUEUE_SIZE)
+
+jobs_total = REGISTRY.counter("jobs_total", "Background job runs by outcome", ("type", "outcome"))
+job_duration_seconds = REGISTRY.histogram("job_duration_seconds", "Background job run time", ("type",))
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot help; the job is dead-lettered at once"""
+
+class JobQueue:
+    """Durable background jobs stored in the jobs collection.
+
+    Workers claim due jobs with find_one_and_update, so any number of
+    processes can share the queue. A claim is a lease: a job whose worker
+    died is picked up again once locked_until has passed. Failures are
+    retried with exponential backoff and jitter; after max_attempts, or on
+    PermanentJobError, the job moves to jobs_dead_letter.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, backoff_seconds: float, max_backoff_seconds: float,
+                 lease_seconds: float, poll_seconds: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.handlers = {}
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.logger = logging.getLogger("jobs")
+
+    def handler(self, job_type: str):
+        def register(func):
+            self.handlers[job_type] = func
+            return func
+        return register
+
+    async def enqueue(self, job_type: str, payload: dict, delay_seconds: float = 0) -> str:
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "run_at": now + timedelta(seconds=delay_seconds),
+            "created_at": now,
+            "updated_at": now,
+        }
+        await db.jobs.insert_one(job)
+        self._wakeup.set()
+        return job["id"]
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "run_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "locked_until": now + timedelta(seconds=self.lease_seconds), "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _run(self, job: dict):
+        if job["attempts"] > job["max_attempts"]:
+            # Reclaimed after the worker running its last attempt died
+            job["attempts"] = job["max_attempts"]
+            await self._failed(job, PermanentJobError("Lease expired during the last attempt"))
+            return
+        handler = self.handlers.get(job["type"])
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler for job type {job['type']!r}")
+            await handler(job["payload"])
+        except Exception as e:
+            job_duration_seconds.observe(time.perf_counter() - start, job["type"])
+            await self._failed(job, e)
+            return
+        job_duration_seconds.observe(time.perf_counter() - start, job["type"])
+        jobs_total.inc(job["type"], "done")
+        now = datetime.now(timezone.utc)
+        await db.jobs.update_one(
+            {"id": job["id"]},
+            {"$set": {"status": "done", "finished_at": now, "updated_at": now}, "$unset": {"locked_until": ""}},
+        )
+
+    async def _failed(self, job: dict, error: Exception):
+        now = datetime.now(timezone.utc)
+        message = f"{type(error).__name__}: {error}"
+        if isinstance(error, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            jobs_total.inc(job["type"], "dead_letter")
+            self.logger.error("Job %s (%s) dead-lettered after %d attempts: %s", job["id"], job["type"], job["attempts"], message)
+            job.pop("_id", None)
+            job.pop("locked_until", None)
+            await db.jobs_dead_letter.insert_one({**job, "status": "dead", "last_error": message, "failed_at": now, "updated_at": now})
+            await db.jobs.delete_one({"id": job["id"]})
+            return
+        delay = self.backoff(job["attempts"])
+        jobs_total.inc(job["type"], "retry")
+        self.logger.warning("Job %s (%s) attempt %d failed, retrying in %.0f s: %s", job["id"], job["type"], job["attempts"], delay, message)
+        await db.jobs.update_one(
+            {"id": job["id"]},
+            {
+                "$set": {"status": "queued", "run_at": now + timedelta(seconds=delay), "last_error": message, "updated_at": now},
+                "$unset": {"locked_until": ""},
+            },
+        )
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                self.logger.warning("Could not claim a job: %s", e)
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def start(self):
+        self._stopping = False
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10):
+        """Let running jobs finish; jobs still running after timeout are retried after their lease"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks:
+            done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self._tasks = []
+
+    async def retry_dead_letter(self, job_id: str) -> Optional[dict]:
+        job = await db.jobs_dead_letter.find_one_and_delete({"id": job_id})
+        if job is None:
+            return None
+        now = datetime.now(timezone.utc)
+        job.pop("_id", None)
+        job.pop("failed_at", None)
+        job.update({"status": "queued", "attempts": 0, "run_at": now, "updated_at": now})
+        await db.jobs.insert_one(job)
+        self._wakeup.set()
+        return job
+
+    async def stats(self) -> dict:
+        counts = await db.jobs.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]).to_list(None)
+        return {
+            "workers": len(self._tasks),
+            "jobs": {entry["_id"]: entry["count"] for entry in counts},
+            "dead_letter": await db.jobs_dead_letter.estimated_document_count(),
+        }
+
+class PeriodicTask:
+    """Runs run() every interval_seconds in the background; 0 disables it"""
+    name = "task"
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._task = None
+        self.logger = logging.getLogger(self.name)
+
+    async def run(self):
+        raise NotImplementedError
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                self.logger.warning("%s run failed: %s", self.name, e)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self.interval_seconds > 0:
+            self._task = asyncio.ensure_future(self._loop())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+class Archiver(PeriodicTask):
+    """Moves closed reports and old chat messages into their archive collections.
+
+    Each batch is copied with insert_many, then deleted from the hot
+    collection with the same criteria, so a document that changed in between
+    (a reopened report) stays hot and its archive copy is dropped again.
+    Re-running after a crash is safe: copies already archived are skipped by
+    the unique id index. Archived ids get tombstones so delta-sync clients
+    drop them.
+    """
+
+    name = "archive"
+
+    def __init__(self, batch_size: int, interval_seconds: float):
+        super().__init__(interval_seconds)
+        self.batch_size = max(1, batch_size)
+
+    def criteria(self) -> Dict[str, dict]:
+        now = datetime.now(timezone.utc)
+        reports_cutoff = now - timedelta(days=ARCHIVE_REPORTS_AFTER_DAYS)
+        return {
+            "reports": {
+                "status": {"$in": ARCHIVE_REPORT_STATUSES},
+                "$or": [
+                    {"updated_at": {"$lt": reports_cutoff}},
+                    {"updated_at": None, "created_at": {"$lt": reports_cutoff}},
+                ],
+            },
+            "chat_messages": {"created_at": {"$lt": now - timedelta(days=ARCHIVE_CHAT_MESSAGES_AFTER_DAYS)}},
+        }
+
+    async def archive(self, collection_name: str, criteria: dict) -> int:
+        hot = db[collection_name]
+        archive = db[ARCHIVE_COLLECTIONS[collection_name]]
+        moved = 0
+        while True:
+            batch = await hot.find(criteria).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+            ids = [doc["id"] for doc in batch]
+            try:
+                await archive.insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            await hot.delete_many({"id": {"$in": ids}, **criteria})
+            kept = [doc["id"] for doc in await hot.find({"id": {"$in": ids}}, {"id": 1}).to_list(None)]
+            if kept:
+                await archive.delete_many({"id": {"$in": kept}})
+            archived = [doc_id for doc_id in ids if doc_id not in set(kept)]
+            await record_tombstones(collection_name, archived)
+            moved += len(archived)
+            if len(batch) < self.batch_size:
+                break
+        return moved
+
+    async def run(self) -> Dict[str, int]:
+        moved = {}
+        for collection_name, criteria in self.criteria().items():
+            moved[collection_name] = await self.archive(collection_name, criteria)
+        if any(moved.values()):
+            self.logger.info("Archived %s", ", ".join(f"{count} {name}" for name, count in moved.items()))
+        return moved
+
+archiver = Archiver(ARCHIVE_BATCH_SIZE, ARCHIVE_INTERVAL_SECONDS)
+
+class RetentionSweeper(PeriodicTask):
+    """Deletes chat messages, feedback and rejected applications past their retention.
+
+    Unlike a TTL index it records tombstones, so delta-sync clients drop the
+    deleted documents too. Each batch is deleted with the same criteria it
+    was found with, so a document that changed in between (an application
+    no longer rejected) stays.
+    """
+    name = "retention"
+
+    def __init__(self, batch_size: int, interval_seconds: float):
+        super().__init__(interval_seconds)
+        self.batch_size = max(1, batch_size)
+
+    def criteria(self) -> Dict[str, dict]:
+        now = datetime.now(timezone.utc)
+        criteria = {}
+        if RETENTION_CHAT_MESSAGES_DAYS:
+            expired = {"created_at": {"$lt": now - timedelta(days=RETENTION_CHAT_MESSAGES_DAYS)}}
+            criteria["chat_messages"] = criteria["chat_messages_archive"] = expired
+        if RETENTION_FEEDBACK_DAYS:
+            criteria["feedback"] = {"created_at": {"$lt": now - timedelta(days=RETENTION_FEEDBACK_DAYS)}}
+        if RETENTION_REJECTED_APPLICATIONS_DAYS:
+            criteria["applications"] = {
+                "status": "rejected",
+                "rejected_at": {"$lt": now - timedelta(days=RETENTION_REJECTED_APPLICATIONS_DAYS)},
+            }
+        return criteria
+
+    async def sweep(self, collection_name: str, criteria: dict) -> int:
+        collection = db[collection_name]
+        deleted = 0
+        while True:
+            batch = await collection.find(criteria, {"id": 1}).limit(self.batch_size).to_list(self.batch_size)
+            if not batch:
+                break
+            ids = [doc["id"] for doc in batch]
+            await collection.delete_many({"id": {"$in": ids}, **criteria})
+            kept = {doc["id"] for doc in await collection.find({"id": {"$in": ids}}, {"id": 1}).to_list(None)}
+            removed = [doc_id for doc_id in ids if doc_id not in kept]
+            # Archived documents already got their tombstone when they left the hot collection
+            if collection_name not in ARCHIVE_COLLECTIONS.values():
+                await record_tombstones(collection_name, removed)
+            deleted += len(removed)
+            if len(batch) < self.batch_size:
+                break
+        return deleted
+
+    async def run(self) -> Dict[str, int]:
+        deleted = {}
+        for collection_name, criteria in self.criteria().items():
+            deleted[collection_name] = await self.sweep(collection_name, criteria)
+        if any(deleted.values()):
+            self.logger.info("Deleted %s", ", ".join(f"{count} {name}" for name, count in deleted.items()))
+        return deleted
+
+retention_sweeper = RetentionSweeper(RETENTION_SWEEP_BATCH_SIZE, RETENTION_SWEEP_INTERVAL_SECONDS)
+
+# Collections and fields that reference files in UPLOAD_DIR
+UPLOAD_REFERENCES = [
+    ("applications", "cv_filename"),
+    ("news", "image"),
+    ("about", "image"),
+    ("homepage", "hero_image"),
+    ("services", "image"),
+    ("team", "image"),
+]
+# Names save_upload callers generate: optional kind prefix, uuid4, extension
+UPLOAD_NAME_PATTERN = re.compile(r"^(?:[a-z]+_)?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[a-z0-9]+$")
+
+class UploadSweeper(PeriodicTask):
+    """Deletes uploads in UPLOAD_DIR that no document references any more.
+
+    Documents removed by retention (or deleted by an admin) leave their
+    uploads behind; the directory is scanned in batches and each batch is
+    checked with one $in query per referencing field. Files younger than
+    grace_seconds are skipped, their document may not be written yet, and
+    so are files a submission in any of SPOOL_DIRS references. A dry run
+    only logs the files it would delete.
+    """
+    name = "upload_sweep"
+
+    def __init__(self, batch_size: int, grace_seconds: float, interval_seconds: float, dry_run: bool = False):
+        super().__init__(interval_seconds)
+        self.batch_size = max(1, batch_size)
+        self.grace_seconds = grace_seconds
+        self.dry_run = dry_run
+
+    def _candidates(self) -> List[List[str]]:
+        cutoff = time.time() - self.grace_seconds
+        batches, batch = [], []
+        with os.scandir(UPLOAD_DIR) as entries:
+            for entry in entries:
+                if UPLOAD_NAME_PATTERN.match(entry.name) and entry.is_file() and entry.stat().st_mtime < cutoff:
+                    batch.append(entry.name)
+                    if len(batch) == self.batch_size:
+                        batches.append(batch)
+                        batch = []
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _delete(names: List[str]) -> int:
+        deleted = 0
+        for name in names:
+            try:
+                (UPLOAD_DIR / name).unlink()
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    @staticmethod
+    def _spooled_references() -> Set[str]:
+        """Uploads referenced by submissions waiting in a spool, of any process"""
+        fields = {}
+        for collection_name, field in UPLOAD_REFERENCES:
+            fields.setdefault(collection_name, []).append(field)
+        names = set()
+        for directory in SPOOL_DIRS:
+            for path in Spool(Path(directory)).segments():
+                try:
+                    lines = Spool.read(path)
+                except FileNotFoundError:
+                    continue  # replayed meanwhile, MongoDB has the documents
+                for line in lines:
+                    try:
+                        record = json_util.loads(line)
+                    except ValueError:
+                        continue
+                    for field in fields.get(record.get("collection"), ()):
+                        if record["document"].get(field):
+                            names.add(record["document"][field])
+        return names
+
+    async def run(self, dry_run: Optional[bool] = None) -> Dict[str, Any]:
+        dry_run = self.dry_run if dry_run is None else dry_run
+        scanned = unreferenced = deleted = 0
+        # Read the spools before MongoDB: a record replayed in between is then found there
+        spooled = await asyncio.to_thread(self._spooled_references)
+        for names in await asyncio.to_thread(self._candidates):
+            scanned += len(names)
+            orphans = set(names) - spooled
+            for collection_name, field in UPLOAD_REFERENCES:
+                referenced = await db[collection_name].distinct(field, {field: {"$in": list(orphans)}})
+                orphans.difference_update(referenced)
+                if not orphans:
+                    break
+            unreferenced += len(orphans)
+            if orphans and dry_run:
+                self.logger.info("Dry run, would delete unreferenced uploads: %s", ", ".join(sorted(orphans)))
+            elif orphans:
+                deleted += await asyncio.to_thread(self._delete, sorted(orphans))
+        if deleted:
+            self.logger.info("Deleted %d unreferenced uploads", deleted)
+        return {"scanned": scanned, "unreferenced": unreferenced, "deleted": deleted, "dry_run": dry_run}
+
+upload_sweeper = UploadSweeper(
+    UPLOAD_SWEEP_BATCH_SIZE, UPLOAD_SWEEP_GRACE_SECONDS, UPLOAD_SWEEP_INTERVAL_SECONDS, UPLOAD_SWEEP_DRY_RUN
+)
+
+spooled_submissions_total = REGISTRY.counter(
+    "spooled_submissions_total", "Public submissions written to the local spool", ("collection",)
+)
+replayed_submissions_total = REGISTRY.counter(
+    "replayed_submissions_total", "Spooled submissions stored in MongoDB, by outcome", ("collection", "outcome")
+)
+
+submission_spool = Spool(Path(SPOOL_DIR), SPOOL_SEGMENT_BYTES) if SPOOL_DIR else None
+
+# Collections the spool accepts, with the admin event published once stored
+SPOOLED_SUBMISSIONS = {
+    "reports": "report.created",
+    "feedback": "feedback.created",
+    "chat_messages": "chat_message.created",
+    "applications": "application.created",
+}
+# A write concern error (WTimeoutError included) means the insert reached the primary
+# without its durability confirmed; the replay's upsert does not store it twice
+SPOOLABLE_ERRORS = (ConnectionFailure, WriteConcernError, asyncio.TimeoutError)
+
+async def store_submission(collection_name: str, document: dict, response: Response) -> bool:
+    """Insert a public submission, spooling it to local disk when MongoDB is
+    unreachable or slower than SPOOL_WRITE_BUDGET_SECONDS.
+
+    Returns False if spooled; the response is then 202 Accepted.
+    """
+    if submission_spool is None:
+        try:
+            await insert_batcher.insert(collection_name, document)
+        except WriteConcernError as e:
+            # Stored on the primary, only the acknowledgement from the replicas is missing
+            logging.getLogger(__name__).warning("%s submission %s stored without write concern: %r", collection_name, document["id"], e)
+        return True
+    if not public_breaker.is_open:
+        try:
+            await asyncio.wait_for(insert_batcher.insert(collection_name, document), SPOOL_WRITE_BUDGET_SECONDS)
+            return True
+        except SPOOLABLE_ERRORS as e:
+            logging.getLogger(__name__).warning("Spooling %s submission: %r", collection_name, e)
+    record = json_util.dumps({"collection": collection_name, "document": document}).encode()
+    try:
+        await asyncio.to_thread(submission_spool.append, record)
+    except OSError as e:
+        raise HTTPException(status_code=503, detail="Submission temporarily unavailable, please try again") from e
+    spooled_submissions_total.inc(collection_name)
+    response.status_code = 202
+    return False
+
+class SubmissionReplayer(PeriodicTask):
+    """Stores spooled submissions once MongoDB answers again.
+
+    Each record is upserted on its id with $setOnInsert, so a record whose
+    original insert did land after all, or a segment replayed twice after a
+    crash, is not stored twice. A segment is deleted after all its records
+    are acknowledged. The admin event is published for duplicates too: an
+    original insert that landed late never published one.
+    """
+    name = "spool_replay"
+
+    async def run(self) -> Dict[str, int]:
+        replayed = duplicates = 0
+        if submission_spool is None or not await asyncio.to_thread(submission_spool.segments):
+            return {"replayed": replayed, "duplicates": duplicates}
+        for path in await asyncio.to_thread(submission_spool.seal):
+            by_collection: Dict[str, list] = {}
+            for line in await asyncio.to_thread(submission_spool.read, path):
+                try:
+                    record = json_util.loads(line)
+                except ValueError:
+                    self.logger.error("Skipping unreadable record in %s", path.name)
+                    continue
+                if record.get("collection") in SPOOLED_SUBMISSIONS:
+                    by_collection.setdefault(record["collection"], []).append(record["document"])
+            for collection_name, documents in by_collection.items():
+                collection = db[collection_name].with_options(write_concern=InsertBatcher.DURABLE)
+                result = await collection.bulk_write([
+                    UpdateOne({"id": document["id"]}, {"$setOnInsert": document}, upsert=True) for document in documents
+                ], ordered=False)
+                inserted = result.upserted_count
+                replayed += inserted
+                duplicates += len(documents) - inserted
+                replayed_submissions_total.inc(collection_name, "stored", amount=inserted)
+                replayed_submissions_total.inc(collection_name, "duplicate", amount=len(documents) - inserted)
+                for document in documents:
+                    admin_events.publish(SPOOLED_SUBMISSIONS[collection_name], self.event_payload(collection_name, document))
+            await asyncio.to_thread(submission_spool.remove, path)
+        if replayed or duplicates:
+            self.logger.info("Replayed %d spooled submissions (%d already stored)", replayed, duplicates)
+        return {"replayed": replayed, "duplicates": duplicates}
+
+    @staticmethod
+    def event_payload(collection_name: str, document: dict) -> BaseModel:
+        model = {"reports": Report, "feedback": Feedback, "chat_messages": ChatMessage, "applications": Application}
+        return model[collection_name](**document)
+
+submission_replayer = SubmissionReplayer(SPOOL_REPLAY_INTERVAL_SECONDS)
+
+class IdempotencyStore:
+    """Idempotency keys for IdempotencyMiddleware.
+
+    A unique index on key makes the claim atomic across processes; the
+    documents expire through a TTL index on created_at. A claim pending for
+    longer than lease_seconds is taken over by the next matching request
+    with one find_one_and_update, so a crashed request does not block its
+    key until the TTL. Completed responses are also cached in memory, so
+    most retries cost no query. While MongoDB is unreachable or slower than
+    SPOOL_WRITE_BUDGET_SECONDS, keys are tracked in this process only and
+    the submission goes on to the spool.
+    """
+
+    def __init__(self, cache_seconds: float, max_entries: int, lease_seconds: float):
+        self.cache = TTLCache("idempotency", cache_seconds, max_entries=max_entries)
+        self.lease_seconds = lease_seconds
+        self._pending: Dict[str, dict] = {}
+        self.logger = logging.getLogger("idempotency")
+
+    async def _mongo(self, operation):
+        if public_breaker.is_open:
+            raise ConnectionFailure("public_reads breaker open")
+        return await asyncio.wait_for(operation, SPOOL_WRITE_BUDGET_SECONDS)
+
+    async def claim(self, key: str, method: str, path: str, fingerprint: str) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=self.lease_seconds)
+        record = self.cache.get(key) or self._pending.get(key)
+        if record is not None and not (record["state"] == "pending" and record["claimed_at"] < stale_before):
+            return record
+        record = {"key": key, "method": method, "path": path, "fingerprint": fingerprint, "state": "pending", "claimed_at": now}
+        self._pending[key] = record
+        try:
+            await self._mongo(db.idempotency_keys.insert_one({**record, "created_at": now}))
+        except DuplicateKeyError:
+            del self._pending[key]
+            try:
+                return await self._claim_existing(record, stale_before)
+            except SPOOLABLE_ERRORS as e:
+                # Its state is unknown; report it as in progress and let the client retry
+                self.logger.warning("Idempotency-Key %s could not be looked up: %r", key, e)
+                return record
+        except SPOOLABLE_ERRORS as e:
+            self.logger.warning("Idempotency-Key %s tracked in memory only: %r", key, e)
+        return None
+
+    async def _claim_existing(self, record: dict, stale_before: datetime) -> Optional[dict]:
+        """The stored record for a key already claimed, or None after taking over its stale claim"""
+        key = record["key"]
+        existing = await self._mongo(db.idempotency_keys.find_one({"key": key}, {"_id": 0}))
+        if existing is None:
+            # Expired or released in between; report it as in progress and let the client retry
+            return record
+        if existing["state"] == "done":
+            self.cache.set(key, existing)
+            return existing
+        if (existing["method"], existing["path"], existing.get("fingerprint")) != (record["method"], record["path"], record["fingerprint"]):
+            return existing
+        taken_over = await self._mongo(db.idempotency_keys.find_one_and_update(
+            {"key": key, "state": "pending", "claimed_at": {"$lt": stale_before}},
+            {"$set": {"claimed_at": record["claimed_at"]}},
+        ))
+        if taken_over is None:
+            return existing
+        self.logger.warning("Idempotency-Key %s taken over from a request pending since %s", key, taken_over["claimed_at"])
+        self._pending[key] = record
+        return None
+
+    async def complete(self, key: str, status_code: int, media_type: Optional[str], body: bytes):
+        # The claim is gone here when a request outlived its lease and both it and the taker-over finish
+        pending = self._pending.pop(key, None)
+        record = {**(pending or {}), "state": "done", "status_code": status_code, "media_type": media_type, "body": body}
+        if pending is not None:
+            self.cache.set(key, record)
+        try:
+            await self._mongo(db.idempotency_keys.update_one(
+                {"key": key},
+                {"$set": record, "$setOnInsert": {"created_at": datetime.now(timezone.utc)}},
+                upsert=True,
+            ))
+        except SPOOLABLE_ERRORS as e:
+            self.logger.warning("Idempotency-Key %s not stored: %r", key, e)
+
+    async def release(self, key: str):
+        self._pending.pop(key, None)
+        try:
+            await self._mongo(db.idempotency_keys.delete_one({"key": key, "state": "pending"}))
+        except SPOOLABLE_ERRORS as e:
+            self.logger.warning("Idempotency-Key %s not released: %r", key, e)
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_CACHE_SECONDS, IDEMPOTENCY_CACHE_MAX_ENTRIES, IDEMPOTENCY_PENDING_LEASE_SECONDS)
+
+async def ensure_ttl_index(collection_name: str, field: str, expire_after_days: int):
+    """Index field and, unless expire_after_days is 0, expire documents that long after it.
+
+    A changed retention setting conflicts with the existing index options,
+    so the index is rebuilt then.
+    """
+    options = {"name": f"{field}_1"}
+    if expire_after_days:
+        options["expireAfterSeconds"] = expire_after_days * 86400
+    try:
+        await db[collection_name].create_index(field, **options)
+    except OperationFailure as e:
+        if e.code not in (85, 86):  # IndexOptionsConflict, IndexKeySpecsConflict
+            raise
+        await db[collection_name].drop_index(options["name"])
+        await db[collection_name].create_index(field, **options)
+
+job_queue = JobQueue(JOB_WORKERS, JOB_MAX_ATTEMPTS, JOB_BACKOFF_SECONDS, JOB_MAX_BACKOFF_SECONDS, JOB_LEASE_SECONDS, JOB_POLL_SECONDS)
+
+def _send_smtp(message: EmailMessage):
+    smtp_class = smtplib.SMTP_SSL if SMTP_SSL else smtplib.SMTP
+    with smtp_class(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT_SECONDS) as smtp:
+        if SMTP_STARTTLS:
+            smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD or "")
+        smtp.send_message(message)
+
+@job_queue.handler("send_email")
+async def send_email_job(payload: dict):
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = payload["to"]
+    message["Subject"] = payload["subject"]
+    # Stable Message-ID so a retried delivery can be recognised as a duplicate
+    message["Message-ID"] = payload["message_id"]
+    if payload.get("reply_to"):
+        message["Reply-To"] = payload["reply_to"]
+    message.set_content(payload["body"])
+    try:
+        await asyncio.to_thread(_send_smtp, message)
+    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+        raise PermanentJobError(str(e)) from e
+
+async def notify_by_email(to: str, subject: str, body: str, reply_to: Optional[str] = None):
+    """Queue a notification mail; a no-op unless SMTP_HOST is configured"""
+    if not SMTP_HOST:
+        return
+    payload = {"to": to, "subject": subject, "body": body, "reply_to": reply_to, "message_id": make_msgid(domain="stadtwache.de")}
+    try:
+        await job_queue.enqueue("send_email", payload)
+    except PyMongoError as e:
+        # Callers have already saved the change the mail is about, so it must not turn into a 500
+        logging.getLogger(__name__).error("Could not queue mail %r: %r", subject, e)
+
 # Define Models
 class Application(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -100,6 +1736,7 @@ class Application(BaseModel):
     admin_email: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = None
+    rejected_at: Optional[datetime] = None  # retention clock for rejected applications
 
 class ApplicationCreate(BaseModel):
     name: str
@@ -124,6 +1761,7 @@ class Feedback(BaseModel):
     status: str = Field(default="new")  # new, reviewed
     admin_response: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
 
 class FeedbackCreate(BaseModel):
     name: str
@@ -141,6 +1779,18 @@ class NewsItem(BaseModel):
     date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     priority: str = Field(default="normal")  # normal, high, urgent
     published: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
+
+class NewsSummary(BaseModel):
+    """List view of a news item, without its content"""
+    id: str
+    title: str
+    excerpt: Optional[str] = None
+    image: Optional[str] = None
+    date: datetime
+    priority: str = "normal"
+
+NEWS_SUMMARY_PROJECTION = {field: 1 for field in NewsSummary.model_fields}
 
 class NewsItemCreate(BaseModel):
     title: str
@@ -164,6 +1814,7 @@ class Service(BaseModel):
     image: Optional[str] = None
     order: int = Field(default=0)
     active: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
 
 class ServiceCreate(BaseModel):
     title: str
@@ -189,6 +1840,7 @@ class TeamMember(BaseModel):
     phone: Optional[str] = None
     order: int = Field(default=0)
     active: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
 
 class TeamMemberCreate(BaseModel):
     name: str
@@ -217,6 +1869,7 @@ class Statistic(BaseModel):
     color: str = Field(default="blue")
     order: int = Field(default=0)
     active: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
 
 class StatisticCreate(BaseModel):
     title: str
@@ -242,6 +1895,7 @@ class NavigationItem(BaseModel):
     section: str
     order: int = Field(default=0)
     active: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
 
 class NavigationUpdate(BaseModel):
     items: List[NavigationItem]
@@ -307,7 +1961,7 @@ class AboutPage(BaseModel):
     values: Optional[str] = None
     history: Optional[str] = None
     image: Optional[str] = None
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
 
 class AboutPageUpdate(BaseModel):
     title: Optional[str] = None
@@ -327,6 +1981,7 @@ class ChatMessage(BaseModel):
     status: str = Field(default="new")  # new, responded, closed
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     responded_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
 class ChatMessageCreate(BaseModel):
     visitor_name: str
@@ -344,6 +1999,7 @@ class ChatButton(BaseModel):
     value: str  # email address, phone number, URL, or predefined message
     order: int = Field(default=0)
     active: bool = Field(default=True)
+    updated_at: Optional[datetime] = None
 
 class ChatButtonCreate(BaseModel):
     label: str
@@ -370,7 +2026,7 @@ class ChatWidget(BaseModel):
     contact_email: str = Field(default="support@stadtwache.de")
     phone_number: Optional[str] = None
     operating_hours: str = Field(default="Mo-Fr: 8:00-18:00")
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
 
 class ChatWidgetUpdate(BaseModel):
     enabled: Optional[bool] = None
@@ -412,7 +2068,7 @@ class HomepageContent(BaseModel):
     show_team: bool = Field(default=True)
     show_statistics: bool = Field(default=True)
     footer_text: str = Field(default="© 2024 Stadtwache. Alle Rechte vorbehalten.")
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
 
 class HomepageUpdate(BaseModel):
     hero_title: Optional[str] = None
@@ -432,7 +2088,22 @@ class HomepageUpdate(BaseModel):
 class DatabaseQuery(BaseModel):
     collection: str
     query: Optional[Dict[str, Any]] = {}
+    projection: Optional[Dict[str, Any]] = None
+    sort: Optional[Dict[str, int]] = None  # {"created_at": -1}
+    skip: int = Field(default=0, ge=0)
+    after: Optional[str] = None  # next_cursor of the previous page (_id paging)
     limit: Optional[int] = 100
+    max_time_ms: Optional[int] = None
+    explain: bool = False
+    stream: bool = False  # NDJSON response
+    include_archived: bool = False  # reports and chat_messages only
+
+class DatabaseAggregation(BaseModel):
+    collection: str
+    pipeline: List[Dict[str, Any]]
+    max_time_ms: Optional[int] = None
+    stream: bool = False  # NDJSON response
+    include_archived: bool = False  # reports and chat_messages only
 
 # Public Routes
 @api_router.get("/")
@@ -440,44 +2111,34 @@ async def root():
     return {"message": "Stadtwache API"}
 
 # Homepage content
-@api_router.get("/homepage")
-async def get_homepage_content():
-    content = await db.homepage.find_one()
-    if not content:
-        # Create default content
-        default_content = HomepageContent()
-        content_dict = prepare_for_mongo(default_content.dict())
-        await db.homepage.insert_one(content_dict)
-        return default_content
-    return HomepageContent(**content)
+@api_router.get("/homepage", response_model=HomepageContent)
+async def get_homepage_content(request: Request):
+    return await cached_public_response(request, ("homepage",), lambda: singleton_content("homepage", HomepageContent))
 
 # Services
 @api_router.get("/services", response_model=List[Service])
-async def get_services():
-    services = await db.services.find({"active": True}).sort("order", 1).to_list(100)
-    return [Service(**service) for service in services]
+async def get_services(request: Request):
+    return await cached_public_response(request, ("services",), lambda: active_list("services", Service))
 
 # Team
 @api_router.get("/team", response_model=List[TeamMember])
-async def get_team():
-    team = await db.team.find({"active": True}).sort("order", 1).to_list(100)
-    return [TeamMember(**member) for member in team]
+async def get_team(request: Request):
+    return await cached_public_response(request, ("team",), lambda: active_list("team", TeamMember))
 
 # Statistics
 @api_router.get("/statistics", response_model=List[Statistic])
-async def get_statistics():
-    stats = await db.statistics.find({"active": True}).sort("order", 1).to_list(100)
-    return [Statistic(**stat) for stat in stats]
+async def get_statistics(request: Request):
+    return await cached_public_response(request, ("statistics",), lambda: active_list("statistics", Statistic))
 
 # Navigation
 @api_router.get("/navigation", response_model=List[NavigationItem])
-async def get_navigation():
-    nav_items = await db.navigation.find({"active": True}).sort("order", 1).to_list(100)
-    return [NavigationItem(**item) for item in nav_items]
+async def get_navigation(request: Request):
+    return await cached_public_response(request, ("navigation",), lambda: active_list("navigation", NavigationItem))
 
 # Application routes
 @api_router.post("/applications", response_model=Application)
 async def create_application(
+    response: Response,
     name: str = Form(...),
     email: str = Form(...),
     phone: str = Form(...),
@@ -496,8 +2157,7 @@ async def create_application(
             cv_filename = f"{uuid.uuid4()}.{file_extension}"
             file_path = UPLOAD_DIR / cv_filename
             
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(cv_file.file, buffer)
+            save_upload(cv_file, file_path, "cv")
         
         application_data = {
             "name": name,
@@ -509,27 +2169,32 @@ async def create_application(
         }
         
         application = Application(**application_data)
-        application_dict = prepare_for_mongo(application.dict())
-        await db.applications.insert_one(application_dict)
+        application_dict = new_document(application)
+        if await store_submission("applications", application_dict, response):
+            admin_events.publish("application.created", application)
         
         return application
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Feedback routes
 @api_router.post("/feedback", response_model=Feedback)
-async def create_feedback(feedback: FeedbackCreate):
+async def create_feedback(feedback: FeedbackCreate, response: Response):
     feedback_obj = Feedback(**feedback.dict())
-    feedback_dict = prepare_for_mongo(feedback_obj.dict())
-    await db.feedback.insert_one(feedback_dict)
+    feedback_dict = new_document(feedback_obj)
+    if await store_submission("feedback", feedback_dict, response):
+        admin_events.publish("feedback.created", feedback_obj)
     return feedback_obj
 
 # Report routes - Public
 @api_router.post("/reports", response_model=Report)
-async def create_report(report: ReportCreate):
+async def create_report(report: ReportCreate, response: Response):
     report_obj = Report(**report.dict())
-    report_dict = prepare_for_mongo(report_obj.dict())
-    await db.reports.insert_one(report_dict)
+    report_dict = new_document(report_obj)
+    if await store_submission("reports", report_dict, response):
+        admin_events.publish("report.created", report_obj)
     return report_obj
 
 @api_router.get("/reports/types")
@@ -550,60 +2215,229 @@ async def get_report_types():
     }
 
 # About Page
-@api_router.get("/about")
-async def get_about_page():
-    about = await db.about.find_one()
-    if not about:
-        # Create default content
-        default_about = AboutPage()
-        about_dict = prepare_for_mongo(default_about.dict())
-        await db.about.insert_one(about_dict)
-        return default_about
-    return AboutPage(**about)
+@api_router.get("/about", response_model=AboutPage)
+async def get_about_page(request: Request):
+    return await cached_public_response(request, ("about",), lambda: singleton_content("about", AboutPage))
 
 # Chat Widget
-@api_router.get("/chat-widget")
-async def get_chat_widget():
-    chat = await db.chat_widget.find_one()
-    if not chat:
-        # Create default content
-        default_chat = ChatWidget()
-        chat_dict = prepare_for_mongo(default_chat.dict())
-        await db.chat_widget.insert_one(chat_dict)
-        return default_chat
-    return ChatWidget(**chat)
+@api_router.get("/chat-widget", response_model=ChatWidget)
+async def get_chat_widget(request: Request):
+    return await cached_public_response(request, ("chat_widget",), lambda: singleton_content("chat_widget", ChatWidget))
 
 # Chat Messages - Public
 @api_router.post("/chat/messages", response_model=ChatMessage)
-async def create_chat_message(message: ChatMessageCreate):
+async def create_chat_message(message: ChatMessageCreate, response: Response):
     chat_msg = ChatMessage(**message.dict())
-    msg_dict = prepare_for_mongo(chat_msg.dict())
-    await db.chat_messages.insert_one(msg_dict)
+    msg_dict = new_document(chat_msg)
+    if await store_submission("chat_messages", msg_dict, response):
+        admin_events.publish("chat_message.created", chat_msg)
     return chat_msg
 
 @api_router.get("/chat/buttons", response_model=List[ChatButton])
-async def get_chat_buttons():
-    buttons = await db.chat_buttons.find({"active": True}).sort("order", 1).to_list(100)
-    return [ChatButton(**btn) for btn in buttons]
+async def get_chat_buttons(request: Request):
+    return await cached_public_response(request, ("chat_buttons",), lambda: active_list("chat_buttons", ChatButton))
 
 # News routes - Public
-@api_router.get("/news", response_model=List[NewsItem])
-async def get_news():
-    news_list = await db.news.find({"published": True}).sort("date", -1).to_list(100)
-    return [NewsItem(**news) for news in news_list]
-
-@api_router.get("/news/latest")
-async def get_latest_news():
-    latest_news = await db.news.find_one({"published": True}, sort=[("date", -1)])
-    if latest_news:
-        return NewsItem(**latest_news)
-    return None
-
-@api_router.get("/news/featured")
-async def get_featured_news():
+def make_excerpt(content: str, length: int = NEWS_EXCERPT_LENGTH) -> str:
+    """Plain-text start of content, cut at a word boundary"""
+    text = " ".join(content.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length + 1]
+    cut = cut.rsplit(" ", 1)[0] if " " in cut else text[:length]
+    return cut.rstrip(" ,.;:-") + "…"
+
+async def published_news(limit: int):
+    news_list = await public_database("news").news.find({"published": True}, NEWS_SUMMARY_PROJECTION).sort("date", -1).to_list(limit)
+    return model_list_response(NewsSummary, news_list)
+
+@api_router.get("/news", response_model=List[NewsSummary])
+async def get_news(request: Request):
+    return await cached_public_response(request, ("news", "list"), lambda: published_news(100))
+
+async def latest_news():
+    latest = await public_database("news").news.find_one({"published": True}, sort=[("date", -1)])
+    return NewsItem(**latest) if latest else None
+
+@api_router.get("/news/latest", response_model=Optional[NewsItem])
+async def get_latest_news(request: Request):
+    return await cached_public_response(request, ("news", "latest"), latest_news)
+
+@api_router.get("/news/featured", response_model=List[NewsSummary])
+async def get_featured_news(request: Request):
     """Get top 6 news for homepage"""
-    featured_news = await db.news.find({"published": True}).sort("date", -1).to_list(6)
-    return [NewsItem(**news) for news in featured_news]
+    return await cached_public_response(request, ("news", "featured"), lambda: published_news(6))
+
+async def news_detail(news_id: str):
+    news = await public_database("news").news.find_one({"id": news_id, "published": True})
+    if news is None:
+        raise HTTPException(status_code=404, detail="News not found")
+    return NewsItem(**news)
+
+@api_router.get("/news/{news_id}", response_model=NewsItem)
+async def get_news_item(news_id: str, request: Request):
+    return await cached_public_response(request, ("news", "detail", news_id), lambda: news_detail(news_id))
+
+# Pre-rendered pages
+class PageSnapshots:
+    """HTML snapshots of public pages plus the news feeds and sitemap,
+    re-rendered in the background after admin writes.
+
+    Pages render from the primary on first request and stay in memory. An
+    admin write marks the pages built from that collection, and one task
+    re-renders them after refresh_delay seconds, so visitors keep getting the
+    previous snapshot until the new one is ready.
+    """
+    link_base = "/api/pages"
+    sources = {"homepage": {"home"}, "news": {"home", "news", "rss", "atom", "sitemap"}, "about": {"about"}}
+    media_types = {
+        "rss": "application/rss+xml; charset=utf-8",
+        "atom": "application/atom+xml; charset=utf-8",
+        "sitemap": "application/xml; charset=utf-8",
+    }
+
+    def __init__(self, site_name: str, site_url: str, refresh_delay: float, max_news_pages: int, feed_items: int):
+        self.site_name = site_name
+        self.site_url = site_url
+        self.feed_items = feed_items
+        self.refresh_delay = refresh_delay
+        self.max_news_pages = max_news_pages
+        self._pages: Dict[str, Snapshot] = OrderedDict()
+        self._stale = set()
+        self._task = None
+        self._flights = SingleFlight("pages")
+        self.renders = 0
+
+    async def page(self, name: str) -> Optional[Snapshot]:
+        snapshot = self._pages.get(name)
+        if snapshot is None:
+            snapshot = await self._flights.do(name, lambda: public_breaker.call(lambda: self._render(name)))
+        return snapshot
+
+    async def _render(self, name: str) -> Optional[Snapshot]:
+        last_modified = None
+        with trace_phase("render"):
+            if name in ("rss", "atom"):
+                documents = await db.news.find({"published": True}).sort("date", -1).to_list(self.feed_items)
+                items = [NewsItem(**document) for document in documents]
+                render = render_rss if name == "rss" else render_atom
+                body = render(items, self.site_url, self.link_base, self.site_name)
+                last_modified = max((item.updated_at or item.date for item in items), default=None)
+            elif name == "sitemap":
+                documents = await db.news.find({"published": True}, {"id": 1, "date": 1, "updated_at": 1}).sort("date", -1).to_list(50000)
+                news = [(document["id"], parse_datetime(document.get("updated_at") or document["date"])) for document in documents]
+                body = render_sitemap(news, self.site_url, self.link_base)
+                last_modified = max((updated_at for _, updated_at in news), default=None)
+            elif name == "home":
+                content = await singleton_content("homepage", HomepageContent, db)
+                news = await self._news_summaries(6) if content.show_latest_news else []
+                body = render_home(content, news, self.link_base)
+            elif name == "news":
+                body = render_news_list(await self._news_summaries(100), self.link_base, self.site_name)
+            elif name == "about":
+                about = await singleton_content("about", AboutPage, db)
+                body = render_about(about, self.link_base, self.site_name, self._upload_url(about.image))
+            else:
+                news = await db.news.find_one({"id": name.split("/", 1)[1], "published": True})
+                if news is None:
+                    self._pages.pop(name, None)
+                    return None
+                item = NewsItem(**news)
+                body = render_news_detail(item, self.link_base, self.site_name, self._upload_url(item.image))
+        self.renders += 1
+        media_type = self.media_types.get(name, "text/html; charset=utf-8")
+        snapshot = self._pages[name] = Snapshot(body, media_type, last_modified).replaces(self._pages.get(name))
+        detail_pages = [key for key in self._pages if key.startswith("news/")]
+        for key in detail_pages[:max(0, len(detail_pages) - self.max_news_pages)]:
+            del self._pages[key]
+        return snapshot
+
+    async def _news_summaries(self, limit: int):
+        # Read from the primary: a re-render right after a write must not see a lagging secondary
+        documents = await db.news.find({"published": True}, NEWS_SUMMARY_PROJECTION).sort("date", -1).to_list(limit)
+        return [NewsSummary(**document) for document in documents]
+
+    @staticmethod
+    def _upload_url(filename: Optional[str]) -> Optional[str]:
+        return f"/api/uploads/{filename}" if filename else None
+
+    def refresh_later(self, collection_name: str):
+        pages = set(self.sources.get(collection_name, ()))
+        if collection_name == "news":
+            pages.update(key for key in self._pages if key.startswith("news/"))
+        self._stale.update(pages & self._pages.keys())
+        if self._stale and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._refresh())
+
+    async def _refresh(self):
+        delay = self.refresh_delay
+        while self._stale:
+            await asyncio.sleep(delay)
+            failed = set()
+            while self._stale:
+                name = self._stale.pop()
+                try:
+                    await public_breaker.call(lambda: self._render(name))
+                except Exception as e:
+                    # Keep serving the previous snapshot and retry once the database answers
+                    logging.getLogger(__name__).warning("Re-rendering page %s failed: %r", name, e)
+                    failed.add(name)
+            self._stale |= failed
+            delay = max(self.refresh_delay, public_breaker.probe_interval)
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def clear(self):
+        self._pages.clear()
+        self._stale.clear()
+
+page_snapshots = PageSnapshots(
+    SNAPSHOT_SITE_NAME, PUBLIC_SITE_URL, SNAPSHOT_REFRESH_DELAY_SECONDS, SNAPSHOT_MAX_NEWS_PAGES, FEED_MAX_ITEMS
+)
+
+async def snapshot_response(request: Request, name: str) -> Response:
+    # The Host header is client-controlled and the scheme is lost behind the TLS proxy
+    if name in PageSnapshots.media_types and not page_snapshots.site_url:
+        raise HTTPException(status_code=503, detail="PUBLIC_SITE_URL is not configured")
+    try:
+        snapshot = await page_snapshots.page(name)
+    except (CircuitOpenError, *CircuitBreaker.errors) as e:
+        raise HTTPException(status_code=503, detail="Page temporarily unavailable") from e
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return snapshot.response(request.headers)
+
+@api_router.get("/pages/home", include_in_schema=False)
+async def get_home_page(request: Request):
+    return await snapshot_response(request, "home")
+
+@api_router.get("/pages/news", include_in_schema=False)
+async def get_news_page(request: Request):
+    return await snapshot_response(request, "news")
+
+@api_router.get("/pages/news/{news_id}", include_in_schema=False)
+async def get_news_item_page(news_id: str, request: Request):
+    return await snapshot_response(request, f"news/{news_id}")
+
+@api_router.get("/pages/about", include_in_schema=False)
+async def get_about_page_snapshot(request: Request):
+    return await snapshot_response(request, "about")
+
+# News feeds and sitemap, answered from memory until news change
+@api_router.get("/feeds/news.rss", include_in_schema=False)
+async def get_news_rss(request: Request):
+    return await snapshot_response(request, "rss")
+
+@api_router.get("/feeds/news.atom", include_in_schema=False)
+async def get_news_atom(request: Request):
+    return await snapshot_response(request, "atom")
+
+@api_router.get("/sitemap.xml", include_in_schema=False)
+async def get_sitemap(request: Request):
+    return await snapshot_response(request, "sitemap")
 
 # Admin Authentication
 @admin_router.post("/login")
@@ -624,9 +2458,11 @@ async def get_admin_me(current_admin = Depends(get_current_admin)):
 
 # Admin News Management
 @admin_router.get("/news", response_model=List[NewsItem])
-async def admin_get_all_news(current_admin = Depends(get_current_admin)):
+async def admin_get_all_news(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("news", NewsItem, since)
     news_list = await db.news.find().sort("date", -1).to_list(100)
-    return [NewsItem(**news) for news in news_list]
+    return model_list_response(NewsItem, news_list)
 
 @admin_router.post("/news", response_model=NewsItem)
 async def admin_create_news(
@@ -648,21 +2484,22 @@ async def admin_create_news(
             image_filename = f"news_{uuid.uuid4()}.{file_extension}"
             image_path = UPLOAD_DIR / image_filename
             
-            with open(image_path, "wb") as buffer:
-                shutil.copyfileobj(news_image.file, buffer)
+            save_upload(news_image, image_path, "news")
         
         news_data = {
             "title": title,
             "content": content,
-            "excerpt": excerpt,
+            "excerpt": excerpt or make_excerpt(content),
             "priority": priority,
             "published": published,
             "image": image_filename
         }
         
         news_obj = NewsItem(**news_data)
-        news_dict = prepare_for_mongo(news_obj.dict())
+        news_dict = new_document(news_obj)
+        news_dict["excerpt_generated"] = not excerpt
         await db.news.insert_one(news_dict)
+        invalidate_public_cache("news")
         return news_obj
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -670,13 +2507,41 @@ async def admin_create_news(
 @admin_router.put("/news/{news_id}", response_model=NewsItem)
 async def admin_update_news(news_id: str, news_update: NewsItemUpdate, current_admin = Depends(get_current_admin)):
     update_data = {k: v for k, v in news_update.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
+    update = {"$set": update_data}
+
+    # An empty excerpt asks for a generated one; new content regenerates an
+    # excerpt that was generated before, but keeps one written by an admin
+    excerpt = update_data.pop("excerpt", None)
+    if excerpt:
+        update_data.update(excerpt=excerpt, excerpt_generated=False)
+    elif excerpt == "" or "content" in update_data:
+        content = update_data.get("content")
+        if content is None:
+            current = await db.news.find_one({"id": news_id}, {"content": 1})
+            if current is None:
+                raise HTTPException(status_code=404, detail="News not found")
+            content = current["content"]
+        generated = make_excerpt(content)
+        if excerpt == "":
+            update_data.update(excerpt=generated, excerpt_generated=True)
+        else:
+            generated_before = {"$or": [
+                {"$eq": ["$excerpt_generated", True]},
+                {"$eq": [{"$ifNull": ["$excerpt", ""]}, ""]},
+            ]}
+            update = [{"$set": {
+                **{key: {"$literal": value} for key, value in update_data.items()},
+                "excerpt": {"$cond": [generated_before, {"$literal": generated}, "$excerpt"]},
+                "excerpt_generated": {"$cond": [generated_before, True, False]},
+            }}]
     
-    result = await db.news.update_one({"id": news_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_news = await db.news.find_one_and_update(
+        {"id": news_id}, update, return_document=ReturnDocument.AFTER
+    )
+    if updated_news is None:
         raise HTTPException(status_code=404, detail="News not found")
-    
-    updated_news = await db.news.find_one({"id": news_id})
+    invalidate_public_cache("news")
     return NewsItem(**updated_news)
 
 @admin_router.delete("/news/{news_id}")
@@ -684,13 +2549,32 @@ async def admin_delete_news(news_id: str, current_admin = Depends(get_current_ad
     result = await db.news.delete_one({"id": news_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="News not found")
+    await record_tombstones("news", [news_id])
+    invalidate_public_cache("news")
     return {"message": "News deleted successfully"}
 
 # Admin Reports Management
 @admin_router.get("/reports", response_model=List[Report])
-async def admin_get_reports(current_admin = Depends(get_current_admin)):
-    reports = await db.reports.find().sort("created_at", -1).to_list(1000)
-    return [Report(**report) for report in reports]
+async def admin_get_reports(
+    since: Optional[datetime] = None,
+    include_archived: bool = False,
+    current_admin = Depends(get_current_admin)
+):
+    if since:
+        return await changes_since_response("reports", Report, since)
+    if include_archived:
+        pipeline = archive_union_pipeline("reports", {}, {"created_at": -1}, 1000)
+        reports = await db.reports.aggregate(pipeline).to_list(1000)
+    else:
+        reports = await db.reports.find().sort("created_at", -1).to_list(1000)
+    return model_list_response(Report, reports)
+
+async def update_report(report_id: str, update_data: dict, return_document) -> Optional[dict]:
+    """$set update_data on a report, restoring it from the archive first if it was archived"""
+    report = await db.reports.find_one_and_update({"id": report_id}, {"$set": update_data}, return_document=return_document)
+    if report is None and await restore_archived("reports", report_id):
+        report = await db.reports.find_one_and_update({"id": report_id}, {"$set": update_data}, return_document=return_document)
+    return report
 
 @admin_router.put("/reports/{report_id}")
 async def admin_update_report(
@@ -699,14 +2583,21 @@ async def admin_update_report(
     current_admin = Depends(get_current_admin)
 ):
     update_data = {k: v for k, v in report_update.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.reports.update_one({"id": report_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    previous = await update_report(report_id, update_data, ReturnDocument.BEFORE)
+    if previous is None:
         raise HTTPException(status_code=404, detail="Report not found")
-    
-    updated_report = await db.reports.find_one({"id": report_id})
-    return Report(**updated_report)
+    report_obj = Report(**{**previous, **update_data})
+    admin_events.publish("report.updated", report_obj)
+    # Status and priority edits resend the form with the old response; mail only a new one
+    if report_update.admin_response and report_update.admin_response != previous.get("admin_response"):
+        await notify_by_email(
+            report_obj.reporter_email,
+            f"Ihre Meldung bei der Stadtwache: {report_obj.incident_type}",
+            f"Hallo {report_obj.reporter_name},\n\n{report_obj.admin_response}\n\nIhre Stadtwache",
+        )
+    return report_obj
 
 @admin_router.put("/reports/{report_id}/status")
 async def admin_update_report_status(
@@ -716,34 +2607,40 @@ async def admin_update_report_status(
 ):
     update_data = {
         "status": status,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": datetime.now(timezone.utc)
     }
     
-    result = await db.reports.update_one({"id": report_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_report = await update_report(report_id, update_data, ReturnDocument.AFTER)
+    if updated_report is None:
         raise HTTPException(status_code=404, detail="Report not found")
-    
-    updated_report = await db.reports.find_one({"id": report_id})
-    return Report(**updated_report)
+    report_obj = Report(**updated_report)
+    admin_events.publish("report.updated", report_obj)
+    return report_obj
 
 @admin_router.delete("/reports/{report_id}")
 async def admin_delete_report(report_id: str, current_admin = Depends(get_current_admin)):
     result = await db.reports.delete_one({"id": report_id})
+    if result.deleted_count == 0:
+        result = await db.reports_archive.delete_one({"id": report_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Report not found")
+    await record_tombstones("reports", [report_id])
     return {"message": "Report deleted successfully"}
 
 @admin_router.get("/reports/stats")
-async def admin_get_report_stats(current_admin = Depends(get_current_admin)):
+async def admin_get_report_stats(include_archived: bool = False, current_admin = Depends(get_current_admin)):
     total_reports = await db.reports.count_documents({})
     new_reports = await db.reports.count_documents({"status": "new"})
     urgent_reports = await db.reports.count_documents({"priority": "urgent"})
     
-    return {
+    stats = {
         "total_reports": total_reports,
         "new_reports": new_reports,
         "urgent_reports": urgent_reports
     }
+    if include_archived:
+        stats["archived_reports"] = await db.reports_archive.estimated_document_count()
+    return stats
 
 # Admin About Page Management
 @admin_router.get("/about")
@@ -752,7 +2649,7 @@ async def admin_get_about(current_admin = Depends(get_current_admin)):
     if not about:
         # Create default content
         default_about = AboutPage()
-        about_dict = prepare_for_mongo(default_about.dict())
+        about_dict = new_document(default_about)
         await db.about.insert_one(about_dict)
         return default_about
     return AboutPage(**about)
@@ -789,30 +2686,31 @@ async def admin_update_about(
         image_filename = f"about_{uuid.uuid4()}.{file_extension}"
         image_path = UPLOAD_DIR / image_filename
         
-        with open(image_path, "wb") as buffer:
-            shutil.copyfileobj(about_image.file, buffer)
+        save_upload(about_image, image_path, "about")
         
         update_data["image"] = image_filename
     
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    # Check if about page exists
-    existing = await db.about.find_one()
-    if existing:
-        await db.about.update_one({}, {"$set": update_data})
-    else:
-        default_about = AboutPage(**update_data)
-        about_dict = prepare_for_mongo(default_about.dict())
-        await db.about.insert_one(about_dict)
-    
-    updated_about = await db.about.find_one()
+    updated_about = await upsert_singleton("about", AboutPage, update_data)
+    invalidate_public_cache("about")
     return AboutPage(**updated_about)
 
 # Admin Chat Messages Management
 @admin_router.get("/chat/messages", response_model=List[ChatMessage])
-async def admin_get_chat_messages(current_admin = Depends(get_current_admin)):
-    messages = await db.chat_messages.find().sort("created_at", -1).to_list(1000)
-    return [ChatMessage(**msg) for msg in messages]
+async def admin_get_chat_messages(
+    since: Optional[datetime] = None,
+    include_archived: bool = False,
+    current_admin = Depends(get_current_admin)
+):
+    if since:
+        return await changes_since_response("chat_messages", ChatMessage, since)
+    if include_archived:
+        pipeline = archive_union_pipeline("chat_messages", {}, {"created_at": -1}, 1000)
+        messages = await db.chat_messages.aggregate(pipeline).to_list(1000)
+    else:
+        messages = await db.chat_messages.find().sort("created_at", -1).to_list(1000)
+    return model_list_response(ChatMessage, messages)
 
 @admin_router.put("/chat/messages/{message_id}/respond")
 async def admin_respond_to_chat(
@@ -823,37 +2721,52 @@ async def admin_respond_to_chat(
     update_data = {
         "admin_response": response.admin_response,
         "status": "responded",
-        "responded_at": datetime.now(timezone.utc).isoformat()
+        "responded_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc)
     }
     
-    result = await db.chat_messages.update_one({"id": message_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_message = await db.chat_messages.find_one_and_update(
+        {"id": message_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_message is None:
         raise HTTPException(status_code=404, detail="Chat message not found")
-    
-    updated_message = await db.chat_messages.find_one({"id": message_id})
-    return ChatMessage(**updated_message)
+    message_obj = ChatMessage(**updated_message)
+    admin_events.publish("chat_message.updated", message_obj)
+    await notify_by_email(
+        message_obj.visitor_email,
+        "Antwort auf Ihre Nachricht an die Stadtwache",
+        f"Hallo {message_obj.visitor_name},\n\n{message_obj.admin_response}\n\n"
+        f"Ihre Nachricht:\n> {message_obj.message}\n\nIhre Stadtwache",
+    )
+    return message_obj
 
 @admin_router.get("/chat/stats")
-async def admin_get_chat_stats(current_admin = Depends(get_current_admin)):
+async def admin_get_chat_stats(include_archived: bool = False, current_admin = Depends(get_current_admin)):
     total_messages = await db.chat_messages.count_documents({})
     new_messages = await db.chat_messages.count_documents({"status": "new"})
     
-    return {
+    stats = {
         "total_messages": total_messages,
         "new_messages": new_messages
     }
+    if include_archived:
+        stats["archived_messages"] = await db.chat_messages_archive.estimated_document_count()
+    return stats
 
 # Admin Chat Buttons Management
 @admin_router.get("/chat/buttons", response_model=List[ChatButton])
-async def admin_get_chat_buttons(current_admin = Depends(get_current_admin)):
+async def admin_get_chat_buttons(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("chat_buttons", ChatButton, since)
     buttons = await db.chat_buttons.find().sort("order", 1).to_list(100)
-    return [ChatButton(**btn) for btn in buttons]
+    return model_list_response(ChatButton, buttons)
 
 @admin_router.post("/chat/buttons", response_model=ChatButton)
 async def admin_create_chat_button(button: ChatButtonCreate, current_admin = Depends(get_current_admin)):
     button_obj = ChatButton(**button.dict())
-    button_dict = prepare_for_mongo(button_obj.dict())
+    button_dict = new_document(button_obj)
     await db.chat_buttons.insert_one(button_dict)
+    invalidate_public_cache("chat_buttons")
     return button_obj
 
 @admin_router.put("/chat/buttons/{button_id}", response_model=ChatButton)
@@ -863,12 +2776,14 @@ async def admin_update_chat_button(
     current_admin = Depends(get_current_admin)
 ):
     update_data = {k: v for k, v in button_update.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.chat_buttons.update_one({"id": button_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_button = await db.chat_buttons.find_one_and_update(
+        {"id": button_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_button is None:
         raise HTTPException(status_code=404, detail="Chat button not found")
-    
-    updated_button = await db.chat_buttons.find_one({"id": button_id})
+    invalidate_public_cache("chat_buttons")
     return ChatButton(**updated_button)
 
 @admin_router.delete("/chat/buttons/{button_id}")
@@ -876,6 +2791,8 @@ async def admin_delete_chat_button(button_id: str, current_admin = Depends(get_c
     result = await db.chat_buttons.delete_one({"id": button_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Chat button not found")
+    await record_tombstones("chat_buttons", [button_id])
+    invalidate_public_cache("chat_buttons")
     return {"message": "Chat button deleted successfully"}
 
 # Admin Chat Widget Management
@@ -885,7 +2802,7 @@ async def admin_get_chat_widget(current_admin = Depends(get_current_admin)):
     if not chat:
         # Create default content
         default_chat = ChatWidget()
-        chat_dict = prepare_for_mongo(default_chat.dict())
+        chat_dict = new_document(default_chat)
         await db.chat_widget.insert_one(chat_dict)
         return default_chat
     return ChatWidget(**chat)
@@ -896,25 +2813,19 @@ async def admin_update_chat_widget(
     current_admin = Depends(get_current_admin)
 ):
     update_data = {k: v for k, v in chat_update.dict().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    
-    # Check if chat widget exists
-    existing = await db.chat_widget.find_one()
-    if existing:
-        await db.chat_widget.update_one({}, {"$set": update_data})
-    else:
-        default_chat = ChatWidget(**update_data)
-        chat_dict = prepare_for_mongo(default_chat.dict())
-        await db.chat_widget.insert_one(chat_dict)
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    updated_chat = await db.chat_widget.find_one()
+    updated_chat = await upsert_singleton("chat_widget", ChatWidget, update_data)
+    invalidate_public_cache("chat_widget")
     return ChatWidget(**updated_chat)
 
 # Admin Applications Management
 @admin_router.get("/applications", response_model=List[Application])
-async def admin_get_applications(current_admin = Depends(get_current_admin)):
+async def admin_get_applications(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("applications", Application, since)
     applications = await db.applications.find().sort("created_at", -1).to_list(1000)
-    return [Application(**app) for app in applications]
+    return model_list_response(Application, applications)
 
 @admin_router.put("/applications/{application_id}/respond")
 async def admin_respond_to_application(
@@ -922,25 +2833,37 @@ async def admin_respond_to_application(
     response: ApplicationResponse, 
     current_admin = Depends(get_current_admin)
 ):
+    now = datetime.now(timezone.utc)
     update_data = {
         "status": response.status,
         "admin_response": response.admin_response,
         "admin_email": response.admin_email,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": now,
+        "rejected_at": now if response.status == "rejected" else None
     }
     
-    result = await db.applications.update_one({"id": application_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_app = await db.applications.find_one_and_update(
+        {"id": application_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_app is None:
         raise HTTPException(status_code=404, detail="Application not found")
-    
-    updated_app = await db.applications.find_one({"id": application_id})
-    return Application(**updated_app)
+    app_obj = Application(**updated_app)
+    admin_events.publish("application.updated", app_obj)
+    await notify_by_email(
+        app_obj.email,
+        f"Ihre Bewerbung bei der Stadtwache: {app_obj.position}",
+        f"Hallo {app_obj.name},\n\n{app_obj.admin_response}\n\nIhre Stadtwache",
+        reply_to=app_obj.admin_email,
+    )
+    return app_obj
 
 # Admin Feedback Management
 @admin_router.get("/feedback", response_model=List[Feedback])
-async def admin_get_feedback(current_admin = Depends(get_current_admin)):
+async def admin_get_feedback(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("feedback", Feedback, since)
     feedback_list = await db.feedback.find().sort("created_at", -1).to_list(1000)
-    return [Feedback(**fb) for fb in feedback_list]
+    return model_list_response(Feedback, feedback_list)
 
 @admin_router.put("/feedback/{feedback_id}/respond")
 async def admin_respond_to_feedback(
@@ -951,15 +2874,17 @@ async def admin_respond_to_feedback(
     update_data = {
         "status": "reviewed",
         "admin_response": admin_response,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": datetime.now(timezone.utc)
     }
     
-    result = await db.feedback.update_one({"id": feedback_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_feedback = await db.feedback.find_one_and_update(
+        {"id": feedback_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_feedback is None:
         raise HTTPException(status_code=404, detail="Feedback not found")
-    
-    updated_feedback = await db.feedback.find_one({"id": feedback_id})
-    return Feedback(**updated_feedback)
+    feedback_obj = Feedback(**updated_feedback)
+    admin_events.publish("feedback.updated", feedback_obj)
+    return feedback_obj
 
 # Admin Homepage Management
 @admin_router.get("/homepage")
@@ -967,7 +2892,7 @@ async def admin_get_homepage(current_admin = Depends(get_current_admin)):
     content = await db.homepage.find_one()
     if not content:
         default_content = HomepageContent()
-        content_dict = prepare_for_mongo(default_content.dict())
+        content_dict = new_document(default_content)
         await db.homepage.insert_one(content_dict)
         return default_content
     return HomepageContent(**content)
@@ -1015,30 +2940,23 @@ async def admin_update_homepage(
         image_filename = f"hero_{uuid.uuid4()}.{file_extension}"
         image_path = UPLOAD_DIR / image_filename
         
-        with open(image_path, "wb") as buffer:
-            shutil.copyfileobj(hero_image.file, buffer)
+        save_upload(hero_image, image_path, "hero")
         
         update_data["hero_image"] = image_filename
     
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    # Check if homepage exists
-    existing = await db.homepage.find_one()
-    if existing:
-        await db.homepage.update_one({}, {"$set": update_data})
-    else:
-        default_content = HomepageContent(**update_data)
-        content_dict = prepare_for_mongo(default_content.dict())
-        await db.homepage.insert_one(content_dict)
-    
-    updated_content = await db.homepage.find_one()
+    updated_content = await upsert_singleton("homepage", HomepageContent, update_data)
+    invalidate_public_cache("homepage")
     return HomepageContent(**updated_content)
 
 # Admin Services Management
 @admin_router.get("/services", response_model=List[Service])
-async def admin_get_services(current_admin = Depends(get_current_admin)):
+async def admin_get_services(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("services", Service, since)
     services = await db.services.find().sort("order", 1).to_list(100)
-    return [Service(**service) for service in services]
+    return model_list_response(Service, services)
 
 @admin_router.post("/services", response_model=Service)
 async def admin_create_service(
@@ -1060,8 +2978,7 @@ async def admin_create_service(
             image_filename = f"service_{uuid.uuid4()}.{file_extension}"
             image_path = UPLOAD_DIR / image_filename
             
-            with open(image_path, "wb") as buffer:
-                shutil.copyfileobj(service_image.file, buffer)
+            save_upload(service_image, image_path, "service")
         
         service_data = {
             "title": title,
@@ -1073,8 +2990,9 @@ async def admin_create_service(
         }
         
         service_obj = Service(**service_data)
-        service_dict = prepare_for_mongo(service_obj.dict())
+        service_dict = new_document(service_obj)
         await db.services.insert_one(service_dict)
+        invalidate_public_cache("services")
         return service_obj
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1082,12 +3000,14 @@ async def admin_create_service(
 @admin_router.put("/services/{service_id}", response_model=Service)
 async def admin_update_service(service_id: str, service_update: ServiceUpdate, current_admin = Depends(get_current_admin)):
     update_data = {k: v for k, v in service_update.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.services.update_one({"id": service_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_service = await db.services.find_one_and_update(
+        {"id": service_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_service is None:
         raise HTTPException(status_code=404, detail="Service not found")
-    
-    updated_service = await db.services.find_one({"id": service_id})
+    invalidate_public_cache("services")
     return Service(**updated_service)
 
 @admin_router.delete("/services/{service_id}")
@@ -1095,13 +3015,17 @@ async def admin_delete_service(service_id: str, current_admin = Depends(get_curr
     result = await db.services.delete_one({"id": service_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Service not found")
+    await record_tombstones("services", [service_id])
+    invalidate_public_cache("services")
     return {"message": "Service deleted successfully"}
 
 # Admin Team Management
 @admin_router.get("/team", response_model=List[TeamMember])
-async def admin_get_team(current_admin = Depends(get_current_admin)):
+async def admin_get_team(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("team", TeamMember, since)
     team = await db.team.find().sort("order", 1).to_list(100)
-    return [TeamMember(**member) for member in team]
+    return model_list_response(TeamMember, team)
 
 @admin_router.post("/team", response_model=TeamMember)
 async def admin_create_team_member(
@@ -1125,8 +3049,7 @@ async def admin_create_team_member(
             image_filename = f"team_{uuid.uuid4()}.{file_extension}"
             image_path = UPLOAD_DIR / image_filename
             
-            with open(image_path, "wb") as buffer:
-                shutil.copyfileobj(member_image.file, buffer)
+            save_upload(member_image, image_path, "team")
         
         member_data = {
             "name": name,
@@ -1140,8 +3063,9 @@ async def admin_create_team_member(
         }
         
         member_obj = TeamMember(**member_data)
-        member_dict = prepare_for_mongo(member_obj.dict())
+        member_dict = new_document(member_obj)
         await db.team.insert_one(member_dict)
+        invalidate_public_cache("team")
         return member_obj
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1149,12 +3073,14 @@ async def admin_create_team_member(
 @admin_router.put("/team/{member_id}", response_model=TeamMember)
 async def admin_update_team_member(member_id: str, member_update: TeamMemberUpdate, current_admin = Depends(get_current_admin)):
     update_data = {k: v for k, v in member_update.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.team.update_one({"id": member_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_member = await db.team.find_one_and_update(
+        {"id": member_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_member is None:
         raise HTTPException(status_code=404, detail="Team member not found")
-    
-    updated_member = await db.team.find_one({"id": member_id})
+    invalidate_public_cache("team")
     return TeamMember(**updated_member)
 
 @admin_router.delete("/team/{member_id}")
@@ -1162,30 +3088,37 @@ async def admin_delete_team_member(member_id: str, current_admin = Depends(get_c
     result = await db.team.delete_one({"id": member_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Team member not found")
+    await record_tombstones("team", [member_id])
+    invalidate_public_cache("team")
     return {"message": "Team member deleted successfully"}
 
 # Admin Statistics Management
 @admin_router.get("/statistics", response_model=List[Statistic])
-async def admin_get_statistics(current_admin = Depends(get_current_admin)):
+async def admin_get_statistics(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("statistics", Statistic, since)
     stats = await db.statistics.find().sort("order", 1).to_list(100)
-    return [Statistic(**stat) for stat in stats]
+    return model_list_response(Statistic, stats)
 
 @admin_router.post("/statistics", response_model=Statistic)
 async def admin_create_statistic(stat: StatisticCreate, current_admin = Depends(get_current_admin)):
     stat_obj = Statistic(**stat.dict())
-    stat_dict = prepare_for_mongo(stat_obj.dict())
+    stat_dict = new_document(stat_obj)
     await db.statistics.insert_one(stat_dict)
+    invalidate_public_cache("statistics")
     return stat_obj
 
 @admin_router.put("/statistics/{stat_id}", response_model=Statistic)
 async def admin_update_statistic(stat_id: str, stat_update: StatisticUpdate, current_admin = Depends(get_current_admin)):
     update_data = {k: v for k, v in stat_update.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc)
     
-    result = await db.statistics.update_one({"id": stat_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    updated_stat = await db.statistics.find_one_and_update(
+        {"id": stat_id}, {"$set": update_data}, return_document=ReturnDocument.AFTER
+    )
+    if updated_stat is None:
         raise HTTPException(status_code=404, detail="Statistic not found")
-    
-    updated_stat = await db.statistics.find_one({"id": stat_id})
+    invalidate_public_cache("statistics")
     return Statistic(**updated_stat)
 
 @admin_router.delete("/statistics/{stat_id}")
@@ -1193,24 +3126,30 @@ async def admin_delete_statistic(stat_id: str, current_admin = Depends(get_curre
     result = await db.statistics.delete_one({"id": stat_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Statistic not found")
+    await record_tombstones("statistics", [stat_id])
+    invalidate_public_cache("statistics")
     return {"message": "Statistic deleted successfully"}
 
 # Admin Navigation Management
 @admin_router.get("/navigation", response_model=List[NavigationItem])
-async def admin_get_navigation(current_admin = Depends(get_current_admin)):
+async def admin_get_navigation(since: Optional[datetime] = None, current_admin = Depends(get_current_admin)):
+    if since:
+        return await changes_since_response("navigation", NavigationItem, since)
     nav_items = await db.navigation.find().sort("order", 1).to_list(100)
-    return [NavigationItem(**item) for item in nav_items]
+    return model_list_response(NavigationItem, nav_items)
 
 @admin_router.put("/navigation")
 async def admin_update_navigation(nav_update: NavigationUpdate, current_admin = Depends(get_current_admin)):
     # Clear existing navigation
+    existing_ids = [item["id"] for item in await db.navigation.find({}, {"id": 1}).to_list(None)]
     await db.navigation.delete_many({})
+    await record_tombstones("navigation", existing_ids)
     
     # Insert new navigation items
-    for item in nav_update.items:
-        item_dict = prepare_for_mongo(item.dict())
-        await db.navigation.insert_one(item_dict)
+    if nav_update.items:
+        await db.navigation.insert_many([new_document(item) for item in nav_update.items])
     
+    invalidate_public_cache("navigation")
     return {"message": "Navigation updated successfully"}
 
 # Admin Database Management
@@ -1219,26 +3158,215 @@ async def get_database_collections(current_admin = Depends(get_current_admin)):
     collections = await db.list_collection_names()
     return {"collections": collections}
 
+def _check_console_operators(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in DB_CONSOLE_FORBIDDEN_OPERATORS:
+                raise HTTPException(status_code=400, detail=f"Operator {key} is not allowed")
+            _check_console_operators(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_console_operators(item)
+
+def _console_cursor_id(value: str):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return value
+
+def _console_document(doc: dict) -> dict:
+    # Convert ObjectId to string for JSON serialization
+    if '_id' in doc:
+        doc['_id'] = str(doc['_id'])
+    return doc
+
+def _summarize_plan(plan: dict, stages: list, indexes: list):
+    stages.append(plan.get("stage"))
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    for child in plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]:
+        _summarize_plan(child, stages, indexes)
+
+def _explain_summary(explain: dict) -> dict:
+    planner = explain.get("queryPlanner", {})
+    execution = explain.get("executionStats", {})
+    winning_plan = planner.get("winningPlan", {})
+    stages, indexes = [], []
+    _summarize_plan(winning_plan, stages, indexes)
+    return {
+        "winning_plan": winning_plan,
+        "stages": stages,
+        "indexes_used": indexes,
+        "collection_scan": "COLLSCAN" in stages,
+        "keys_examined": execution.get("totalKeysExamined"),
+        "docs_examined": execution.get("totalDocsExamined"),
+        "returned": execution.get("nReturned"),
+        "execution_time_ms": execution.get("executionTimeMillis"),
+    }
+
+async def _stream_console_documents(cursor):
+    try:
+        async for doc in cursor:
+            yield json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS).encode() + b"\n"
+    except (ExecutionTimeout, OperationFailure) as e:
+        yield orjson.dumps({"error": str(e)}) + b"\n"
+
 @admin_router.post("/database/query")
 async def query_database(query: DatabaseQuery, current_admin = Depends(get_current_admin)):
+    # Projections accept aggregation expressions too, so $function can hide there
+    for spec in (query.query, query.projection, query.sort):
+        _check_console_operators(spec)
+    if query.sort and any(direction not in (1, -1) for direction in query.sort.values()):
+        raise HTTPException(status_code=400, detail="Sort directions must be 1 or -1")
+    if query.after and query.sort and list(query.sort) != ["_id"]:
+        raise HTTPException(status_code=400, detail="Cursor paging with 'after' only supports sorting by _id")
+
+    max_limit = DB_CONSOLE_MAX_STREAM_LIMIT if query.stream else DB_CONSOLE_MAX_LIMIT
+    limit = max(1, min(query.limit or 100, max_limit))
+    max_time_ms = max(1, min(query.max_time_ms or DB_CONSOLE_MAX_TIME_MS, DB_CONSOLE_MAX_TIME_MS))
+
+    filter_ = dict(query.query or {})
+    sort = list(query.sort.items()) if query.sort else None
+    if query.after:
+        direction = query.sort["_id"] if query.sort else 1
+        filter_ = {"$and": [filter_, {"_id": {"$gt" if direction == 1 else "$lt": _console_cursor_id(query.after)}}]}
+        sort = [("_id", direction)]
+
+    if query.include_archived:
+        if query.collection not in ARCHIVE_COLLECTIONS:
+            raise HTTPException(status_code=400, detail=f"{query.collection} has no archive")
+        if query.explain:
+            raise HTTPException(status_code=400, detail="explain is not supported with include_archived")
+        pipeline = archive_union_pipeline(query.collection, filter_, dict(sort) if sort else None, query.skip + limit)
+        pipeline.append({"$skip": query.skip})
+        if query.projection:
+            pipeline.append({"$project": query.projection})
+        cursor = db[query.collection].aggregate(pipeline, maxTimeMS=max_time_ms, batchSize=500)
+    else:
+        cursor = db[query.collection].find(filter_, query.projection).skip(query.skip).limit(limit).max_time_ms(max_time_ms)
+        if sort:
+            cursor = cursor.sort(sort)
+        if query.stream:
+            cursor = cursor.batch_size(500)
+
     try:
-        collection = db[query.collection]
-        cursor = collection.find(query.query).limit(query.limit)
-        documents = await cursor.to_list(length=query.limit)
-        
-        # Convert ObjectId to string for JSON serialization
-        for doc in documents:
-            if '_id' in doc:
-                doc['_id'] = str(doc['_id'])
+        if query.explain:
+            return {
+                "collection": query.collection,
+                "explain": _explain_summary(await cursor.explain()),
+            }
+
+        if query.stream:
+            return StreamingResponse(_stream_console_documents(cursor), media_type="application/x-ndjson")
+
+        documents = await cursor.to_list(length=limit)
+        next_cursor = str(documents[-1]["_id"]) if len(documents) == limit and "_id" in documents[-1] else None
         
         return {
             "collection": query.collection,
             "count": len(documents),
-            "documents": documents
+            "documents": [_console_document(doc) for doc in documents],
+            "next_cursor": next_cursor,
+            "max_time_ms": max_time_ms,
         }
+    except ExecutionTimeout:
+        raise HTTPException(status_code=504, detail=f"Query exceeded {max_time_ms} ms")
+    except OperationFailure as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+aggregation_cache = TTLCache("aggregation", DB_CONSOLE_CACHE_TTL_SECONDS, max_entries=64)
+
+def _check_pipeline(pipeline: list):
+    if not isinstance(pipeline, list):
+        raise HTTPException(status_code=400, detail="A pipeline must be a list of stages")
+    for stage in pipeline:
+        if not isinstance(stage, dict) or len(stage) != 1:
+            raise HTTPException(status_code=400, detail="Each pipeline stage must be an object with exactly one operator")
+        name, spec = next(iter(stage.items()))
+        if name not in DB_CONSOLE_AGGREGATION_STAGES:
+            raise HTTPException(status_code=400, detail=f"Stage {name} is not allowed")
+        if name == "$facet":
+            if not isinstance(spec, dict) or not spec:
+                raise HTTPException(status_code=400, detail="$facet takes an object of named sub-pipelines")
+            for sub_pipeline in spec.values():
+                _check_pipeline(sub_pipeline)
+        else:
+            _check_console_operators(spec)
+
+def _cache_aggregation(cache_key, lines: list):
+    if sum(len(line) for line in lines) <= DB_CONSOLE_CACHE_MAX_ENTRY_BYTES:
+        aggregation_cache.set(cache_key, lines)
+
+async def _stream_aggregation(cursor, cache_key, limit: int):
+    # Lines are kept for the cache only while they fit in one cache entry
+    lines, size = [], 0
+    try:
+        async for doc in cursor:
+            line = json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS).encode()
+            if lines is not None:
+                size += len(line)
+                if size <= DB_CONSOLE_CACHE_MAX_ENTRY_BYTES:
+                    lines.append(line)
+                else:
+                    lines = None
+            yield line + b"\n"
+    except (ExecutionTimeout, OperationFailure) as e:
+        yield orjson.dumps({"error": str(e)}) + b"\n"
+        return
+    if lines is not None and len(lines) <= limit:
+        aggregation_cache.set(cache_key, lines)
+
+async def _stream_cached_lines(lines: list):
+    for line in lines:
+        yield line + b"\n"
+
+@admin_router.post("/database/aggregate")
+async def aggregate_database(aggregation: DatabaseAggregation, current_admin = Depends(get_current_admin)):
+    """Read-only aggregation over whitelisted stages, cached briefly per identical pipeline"""
+    _check_pipeline(aggregation.pipeline)
+    limit = DB_CONSOLE_MAX_STREAM_LIMIT if aggregation.stream else DB_CONSOLE_MAX_LIMIT
+    max_time_ms = max(1, min(aggregation.max_time_ms or DB_CONSOLE_MAX_TIME_MS, DB_CONSOLE_MAX_TIME_MS))
+    pipeline = aggregation.pipeline + [{"$limit": limit}]
+    if aggregation.include_archived:
+        if aggregation.collection not in ARCHIVE_COLLECTIONS:
+            raise HTTPException(status_code=400, detail=f"{aggregation.collection} has no archive")
+        # A leading $match runs in both branches instead of after the union
+        match = pipeline[0]["$match"] if "$match" in pipeline[0] else {}
+        rest = pipeline[1:] if "$match" in pipeline[0] else pipeline
+        pipeline = archive_union_pipeline(aggregation.collection, match) + rest
+    cache_key = json_util.dumps([aggregation.collection, pipeline])
+
+    lines = aggregation_cache.get(cache_key)
+    if aggregation.stream:
+        if lines is not None:
+            return StreamingResponse(_stream_cached_lines(lines), media_type="application/x-ndjson", headers={"X-Cache": "HIT"})
+        cursor = db[aggregation.collection].aggregate(pipeline, allowDiskUse=False, maxTimeMS=max_time_ms, batchSize=500)
+        return StreamingResponse(_stream_aggregation(cursor, cache_key, limit), media_type="application/x-ndjson", headers={"X-Cache": "MISS"})
+
+    cached = lines is not None
+    if not cached:
+        try:
+            cursor = db[aggregation.collection].aggregate(pipeline, allowDiskUse=False, maxTimeMS=max_time_ms)
+            lines = [
+                json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS).encode()
+                for doc in await cursor.to_list(length=limit)
+            ]
+        except ExecutionTimeout:
+            raise HTTPException(status_code=504, detail=f"Aggregation exceeded {max_time_ms} ms")
+        except OperationFailure as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _cache_aggregation(cache_key, lines)
+
+    content = orjson.dumps({
+        "collection": aggregation.collection,
+        "count": len(lines),
+        "cached": cached,
+        "documents": orjson.Fragment(b"[" + b",".join(lines) + b"]"),
+    })
+    return Response(content=content, media_type="application/json")
+
 @admin_router.get("/database/stats")
 async def get_database_stats(current_admin = Depends(get_current_admin)):
     try:
@@ -1254,6 +3382,103 @@ async def get_database_stats(current_admin = Depends(get_current_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Admin live events
+async def _admin_event_stream(queue: asyncio.Queue):
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), ADMIN_EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        admin_events.unsubscribe(queue)
+
+@admin_router.post("/events/ticket")
+async def create_event_stream_ticket(current_admin = Depends(get_current_admin)):
+    """Single-use ticket for opening /admin/events with EventSource"""
+    return {"ticket": await issue_stream_ticket(current_admin), "expires_in": ADMIN_EVENTS_TICKET_SECONDS}
+
+@admin_router.get("/events")
+async def admin_event_stream(current_admin = Depends(get_current_admin_for_stream)):
+    """Server-sent events for new and updated reports, chat messages, applications and feedback"""
+    queue = admin_events.subscribe()
+    return StreamingResponse(
+        _admin_event_stream(queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Admin request traces
+@admin_router.get("/traces")
+async def admin_get_traces(
+    route: Optional[str] = None,
+    min_duration_ms: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_admin = Depends(get_current_admin)
+):
+    """Most recent sampled request traces (newest first)"""
+    query = {}
+    if route:
+        query["route"] = route
+    if min_duration_ms is not None:
+        query["duration_ms"] = {"$gte": min_duration_ms}
+    traces = await db.request_traces.find(query, {"_id": 0}).sort("$natural", -1).to_list(limit)
+    return {"sample_rate": TRACE_SAMPLE_RATE, "traces": traces}
+
+@admin_router.get("/write-batches/stats")
+async def get_write_batch_stats(current_admin = Depends(get_current_admin)):
+    return insert_batcher.stats()
+
+# Submission spool
+@admin_router.get("/spool/stats")
+async def get_spool_stats(current_admin = Depends(get_current_admin)):
+    if submission_spool is None:
+        return {"enabled": False}
+    segments = await asyncio.to_thread(submission_spool.segments)
+    return {
+        "enabled": True,
+        "segments": len(segments),
+        "pending_bytes": await asyncio.to_thread(submission_spool.pending_bytes),
+        "appended": submission_spool.appended,
+    }
+
+@admin_router.post("/spool/replay")
+async def replay_spool(current_admin = Depends(get_current_admin)):
+    return await submission_replayer.run()
+
+# Archival
+@admin_router.post("/archive/run")
+async def run_archival(current_admin = Depends(get_current_admin)):
+    return {"archived": await archiver.run()}
+
+@admin_router.post("/uploads/sweep")
+async def run_upload_sweep(dry_run: Optional[bool] = None, current_admin = Depends(get_current_admin)):
+    return await upload_sweeper.run(dry_run)
+
+# Background jobs
+@admin_router.get("/jobs/stats")
+async def get_job_stats(current_admin = Depends(get_current_admin)):
+    return await job_queue.stats()
+
+@admin_router.get("/jobs/dead-letter")
+async def get_dead_letter_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    current_admin = Depends(get_current_admin)
+):
+    return await db.jobs_dead_letter.find({}, {"_id": 0}).sort("failed_at", -1).to_list(limit)
+
+@admin_router.post("/jobs/dead-letter/{job_id}/retry")
+async def retry_dead_letter_job(job_id: str, current_admin = Depends(get_current_admin)):
+    job = await job_queue.retry_dead_letter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"message": "Job queued again", "id": job_id}
+
 # Serve uploaded files
 @api_router.get("/uploads/{filename}")
 async def serve_uploaded_file(filename: str):
@@ -1262,10 +3487,41 @@ async def serve_uploaded_file(filename: str):
         return FileResponse(file_path)
     raise HTTPException(status_code=404, detail="File not found")
 
+def _runtime_metrics():
+    yield "# HELP cache_requests_total Cache lookups by result"
+    yield "# TYPE cache_requests_total counter"
+    for name, cache in TTLCache.instances.items():
+        yield f'cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}'
+        yield f'cache_requests_total{{cache="{name}",result="stale"}} {cache.stale_hits}'
+        yield f'cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}'
+    yield "# HELP cache_hit_ratio Share of cache lookups served from cache"
+    yield "# TYPE cache_hit_ratio gauge"
+    for name, cache in TTLCache.instances.items():
+        lookups = cache.hits + cache.stale_hits + cache.misses
+        yield f'cache_hit_ratio{{cache="{name}"}} {(cache.hits + cache.stale_hits) / lookups if lookups else 0.0}'
+    yield "# HELP admin_event_connections Connected admin event streams"
+    yield "# TYPE admin_event_connections gauge"
+    yield f"admin_event_connections {admin_events.connections}"
+
+REGISTRY.register_collector(_runtime_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    if METRICS_TOKEN and (credentials is None or credentials.credentials != METRICS_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Include routers in the main app
 app.include_router(api_router)
 app.include_router(admin_router)
 
+# Innermost, so stored responses are uncompressed and replays are compressed per request
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths=["/api/reports", "/api/applications", "/api/feedback", "/api/chat/messages"],
+    max_body_size=IDEMPOTENCY_MAX_BODY_BYTES,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -1273,6 +3529,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    content_types=COMPRESSION_CONTENT_TYPES,
+    gzip_level=COMPRESSION_GZIP_LEVEL,
+    brotli_quality=COMPRESSION_BROTLI_QUALITY,
+)
+app.add_middleware(PrometheusMiddleware)
+
+async def store_request_trace(document: dict):
+    try:
+        await db.request_traces.insert_one(document)
+    except Exception as e:
+        logger.debug("Could not store request trace: %s", e)
+
+app.add_middleware(ServerTimingMiddleware, sample_rate=TRACE_SAMPLE_RATE, on_sample=store_request_trace)
 
 # Configure logging
 logging.basicConfig(
@@ -1283,6 +3555,60 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
+    if TRACE_SAMPLE_RATE and "request_traces" not in await db.list_collection_names():
+        await db.create_collection("request_traces", capped=True, size=TRACE_COLLECTION_BYTES)
+
+    # Indexes for delta sync
+    await db.tombstones.create_index("deleted_at", expireAfterSeconds=SYNC_TOMBSTONE_TTL_DAYS * 86400)
+    # Stream tickets: lookup by hash, removed by TTL once expired (expiry is also checked on use)
+    await db.stream_tickets.create_index("ticket_hash", unique=True)
+    await db.stream_tickets.create_index("expires_at", expireAfterSeconds=0)
+    await db.tombstones.create_index([("collection", 1), ("deleted_at", 1)])
+    for collection_name in ["news", "reports", "chat_messages", "chat_buttons", "applications", "feedback", "services", "team", "statistics", "navigation"]:
+        await db[collection_name].create_index("updated_at")
+    # Documents stored before updated_at was set on insert count as changed when created, or at
+    # this start for collections without a creation date, so delta sync serves each one once
+    backfilled_at = datetime.now(timezone.utc)
+    for collection_name, created_field in [("news", "date"), ("reports", "created_at"), ("chat_messages", "created_at"),
+                                           ("applications", "created_at"), ("feedback", "created_at"),
+                                           ("chat_buttons", None), ("services", None), ("team", None),
+                                           ("statistics", None), ("navigation", None)]:
+        updated_at = {"$ifNull": [f"${created_field}", backfilled_at]} if created_field else backfilled_at
+        await db[collection_name].update_many({"updated_at": None}, [{"$set": {"updated_at": updated_at}}])
+
+    # Job queue: claim order, and finished jobs expire after JOB_RETENTION_DAYS
+    await db.jobs.create_index([("status", 1), ("run_at", 1)])
+    await db.jobs.create_index("id", unique=True)
+    await db.jobs.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_DAYS * 86400)
+    await db.jobs_dead_letter.create_index("id", unique=True)
+
+    # Archival: candidate lookups on the hot side, id lookups and history sorts on the archive side
+    await db.reports.create_index([("status", 1), ("updated_at", 1)])
+    for archive_name in ARCHIVE_COLLECTIONS.values():
+        await db[archive_name].create_index("id", unique=True)
+    await db.reports_archive.create_index("created_at")
+
+    # Retention sweeper lookups (BSON dates, see migrate_datetimes.py for legacy string dates); without
+    # expireAfterSeconds, so TTL indexes of earlier versions are rebuilt as plain ones
+    await ensure_ttl_index("chat_messages", "created_at", 0)
+    await ensure_ttl_index("chat_messages_archive", "created_at", 0)
+    await ensure_ttl_index("feedback", "created_at", 0)
+    await ensure_ttl_index("applications", "rejected_at", 0)
+    await db.applications.create_index("cv_filename", sparse=True)
+    # Applications rejected before rejected_at existed start their retention clock at their last update
+    await db.applications.update_many(
+        {"status": "rejected", "rejected_at": {"$exists": False}},
+        [{"$set": {"rejected_at": {"$ifNull": ["$updated_at", "$created_at"]}}}],
+    )
+
+    # News saved before excerpts were generated at write time
+    missing_excerpts = await db.news.find({"excerpt": {"$in": [None, ""]}}, {"id": 1, "content": 1}).to_list(None)
+    if missing_excerpts:
+        await db.news.bulk_write([
+            UpdateOne({"id": news["id"]}, {"$set": {"excerpt": make_excerpt(news.get("content", "")), "excerpt_generated": True}})
+            for news in missing_excerpts
+        ])
+
     # Create default admin user if not exists
     admin_exists = await db.admins.find_one({"username": "admin"})
     if not admin_exists:
@@ -1306,7 +3632,7 @@ async def startup_event():
             NavigationItem(label="Kontakt", section="contact", order=4)
         ]
         for item in default_nav:
-            item_dict = prepare_for_mongo(item.dict())
+            item_dict = new_document(item)
             await db.navigation.insert_one(item_dict)
         logger.info("Default navigation created")
     
@@ -1320,7 +3646,7 @@ async def startup_event():
             Service(title="Bürgerdienste", description="Beratung und Unterstützung für Bürger", icon="Users", order=3)
         ]
         for service in default_services:
-            service_dict = prepare_for_mongo(service.dict())
+            service_dict = new_document(service)
             await db.services.insert_one(service_dict)
         logger.info("Default services created")
     
@@ -1334,7 +3660,7 @@ async def startup_event():
             Statistic(title="Mitarbeiter", value="45", icon="Users", color="purple", order=3)
         ]
         for stat in default_stats:
-            stat_dict = prepare_for_mongo(stat.dict())
+            stat_dict = new_document(stat)
             await db.statistics.insert_one(stat_dict)
         logger.info("Default statistics created")
     
@@ -1347,7 +3673,7 @@ async def startup_event():
             TeamMember(name="Thomas Müller", position="Polizeihauptmeister", description="Leiter Verkehrspolizei", email="t.mueller@stadtwache.de", order=2)
         ]
         for member in default_team:
-            member_dict = prepare_for_mongo(member.dict())
+            member_dict = new_document(member)
             await db.team.insert_one(member_dict)
         logger.info("Default team created")
 
@@ -1361,10 +3687,29 @@ async def startup_event():
             ChatButton(label="Termin vereinbaren", action="message", value="Ich möchte einen Termin vereinbaren.", order=3)
         ]
         for button in default_buttons:
-            button_dict = prepare_for_mongo(button.dict())
+            button_dict = new_document(button)
             await db.chat_buttons.insert_one(button_dict)
         logger.info("Default chat buttons created")
 
+    await db.idempotency_keys.create_index("key", unique=True)
+    await ensure_ttl_index("idempotency_keys", "created_at", IDEMPOTENCY_KEY_TTL_DAYS)
+
+    job_queue.start()
+    archiver.start()
+    retention_sweeper.start()
+    upload_sweeper.start()
+    submission_replayer.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    archiver.stop()
+    retention_sweeper.stop()
+    upload_sweeper.stop()
+    submission_replayer.stop()
+    page_snapshots.stop()
+    public_breaker.stop()
+    await job_queue.stop()
+    await insert_batcher.drain()
+    if submission_spool is not None:
+        submission_spool.close()
     client.close()
\ No newline at end of file
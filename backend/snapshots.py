@@ -0,0 +1,212 @@
+"""Pre-rendered public documents served with validators.
+
+Snapshot wraps an encoded body with its ETag and Last-Modified and answers
+conditional requests with 304. The render_* functions turn public content
+into plain HTML pages, so crawlers and slow devices see the content without
+running the React bundle, and into the RSS/Atom news feeds and sitemap.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from html import escape
+from typing import Iterable, Optional
+
+from starlette.responses import Response
+
+from compression import PrecompressedBody
+
+PRIORITY_LABELS = {"urgent": "Dringend", "high": "Wichtig"}
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+class Snapshot:
+    """A rendered body with strong ETag and Last-Modified validators"""
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, body: bytes, media_type: str, last_modified: Optional[datetime] = None,
+                 cache_control: str = "no-cache"):
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        # HTTP dates have second precision
+        self.last_modified = _utc(last_modified or datetime.now(timezone.utc)).replace(microsecond=0)
+        self.body = PrecompressedBody(body, media_type, headers={
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": cache_control,
+        })
+
+    def replaces(self, previous: Optional["Snapshot"]) -> "Snapshot":
+        """Keep the previous snapshot when the body did not change, so validators stay stable"""
+        return previous if previous is not None and previous.etag == self.etag else self
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def response(self, headers) -> Response:
+        if self.not_modified(headers.get("if-none-match"), headers.get("if-modified-since")):
+            return Response(status_code=304, headers={
+                key: value for key, value in self.body.headers.items() if key != "Last-Modified"
+            })
+        return self.body.response(headers.get("accept-encoding", ""))
+
+
+def _text(value: Optional[str]) -> str:
+    """Escaped text with line breaks kept"""
+    return escape(value or "").replace("\n", "<br>\n")
+
+
+def _date(value: datetime) -> str:
+    return f'<time datetime="{value.isoformat()}">{value.strftime("%d.%m.%Y")}</time>'
+
+
+def page(title: str, description: str, body: str, site_name: str) -> bytes:
+    head = [
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f"<title>{escape(title)}</title>",
+        f'<meta name="description" content="{escape(" ".join(description.split()))}">',
+        f'<meta property="og:title" content="{escape(title)}">',
+        f'<meta property="og:site_name" content="{escape(site_name)}">',
+    ]
+    return (
+        '<!DOCTYPE html>\n<html lang="de">\n<head>\n' + "\n".join(head) + "\n</head>\n"
+        f"<body>\n{body}\n</body>\n</html>\n"
+    ).encode()
+
+
+def _news_teaser(item, link_base: str) -> str:
+    priority = PRIORITY_LABELS.get(item.priority)
+    return (
+        "<article>\n"
+        f'<h3><a href="{escape(link_base)}/news/{escape(item.id)}">{escape(item.title)}</a></h3>\n'
+        f"<p>{_date(item.date)}{' · ' + priority if priority else ''}</p>\n"
+        f"<p>{_text(item.excerpt)}</p>\n"
+        "</article>"
+    )
+
+
+def render_home(content, news: Iterable, link_base: str) -> bytes:
+    sections = [
+        f"<header>\n<h1>{escape(content.hero_title)}</h1>\n<p>{_text(content.hero_subtitle)}</p>\n</header>",
+        "<main>",
+    ]
+    if content.show_latest_news:
+        teasers = "\n".join(_news_teaser(item, link_base) for item in news)
+        sections.append(f'<section>\n<h2>Aktuelle Meldungen</h2>\n{teasers}\n'
+                        f'<p><a href="{escape(link_base)}/news">Alle Meldungen</a></p>\n</section>')
+    sections.append(
+        "<section>\n<h2>Kontakt</h2>\n"
+        f"<p>Notruf: {escape(content.emergency_number)}</p>\n"
+        f"<p>Telefon: {escape(content.phone_number)}</p>\n"
+        f'<p>E-Mail: <a href="mailto:{escape(content.email)}">{escape(content.email)}</a></p>\n'
+        f"<address>{_text(content.address)}</address>\n"
+        f"<h3>Öffnungszeiten</h3>\n<p>{_text(content.opening_hours)}</p>\n</section>"
+    )
+    sections.append(f'</main>\n<footer>\n<p><a href="{escape(link_base)}/about">Über uns</a></p>\n'
+                    f"<p>{_text(content.footer_text)}</p>\n</footer>")
+    return page(content.hero_title, content.hero_subtitle, "\n".join(sections), content.hero_title)
+
+
+def render_news_list(news: Iterable, link_base: str, site_name: str) -> bytes:
+    teasers = "\n".join(_news_teaser(item, link_base) for item in news) or "<p>Derzeit keine aktuellen Meldungen.</p>"
+    body = (f'<header>\n<p><a href="{escape(link_base)}/home">{escape(site_name)}</a></p>\n'
+            f"<h1>Aktuelle Meldungen</h1>\n</header>\n<main>\n{teasers}\n</main>")
+    return page(f"Aktuelle Meldungen – {site_name}", "Wichtige Informationen und Updates", body, site_name)
+
+
+def render_news_detail(item, link_base: str, site_name: str, image_url: Optional[str] = None) -> bytes:
+    priority = PRIORITY_LABELS.get(item.priority)
+    image = f'<img src="{escape(image_url)}" alt="{escape(item.title)}">\n' if image_url else ""
+    body = (
+        f'<header>\n<p><a href="{escape(link_base)}/news">Aktuelle Meldungen</a></p>\n</header>\n'
+        f"<main>\n<article>\n<h1>{escape(item.title)}</h1>\n"
+        f"<p>{_date(item.date)}{' · ' + priority if priority else ''}</p>\n"
+        f"{image}<p>{_text(item.content)}</p>\n</article>\n</main>"
+    )
+    return page(f"{item.title} – {site_name}", item.excerpt or item.content[:200], body, site_name)
+
+
+def render_about(about, link_base: str, site_name: str, image_url: Optional[str] = None) -> bytes:
+    sections = [f"<h1>{escape(about.title)}</h1>", f"<p>{_text(about.subtitle)}</p>"]
+    if image_url:
+        sections.append(f'<img src="{escape(image_url)}" alt="{escape(about.title)}">')
+    sections.append(f"<p>{_text(about.content)}</p>")
+    for heading, text in (("Mission", about.mission), ("Vision", about.vision),
+                          ("Werte", about.values), ("Geschichte", about.history)):
+        if text:
+            sections.append(f"<section>\n<h2>{heading}</h2>\n<p>{_text(text)}</p>\n</section>")
+    body = (f'<header>\n<p><a href="{escape(link_base)}/home">{escape(site_name)}</a></p>\n</header>\n'
+            "<main>\n" + "\n".join(sections) + "\n</main>")
+    return page(f"{about.title} – {site_name}", about.subtitle, body, site_name)
+
+
+def _xml_date(value: datetime) -> str:
+    return _utc(value).isoformat().replace("+00:00", "Z")
+
+
+def render_rss(items: Iterable, site_url: str, link_base: str, site_name: str) -> bytes:
+    entries = []
+    for item in items:
+        link = escape(f"{site_url}{link_base}/news/{item.id}")
+        entries.append(
+            f"<item>\n<title>{escape(item.title)}</title>\n<link>{link}</link>\n"
+            f'<guid isPermaLink="false">{escape(item.id)}</guid>\n'
+            f"<pubDate>{format_datetime(_utc(item.date), usegmt=True)}</pubDate>\n"
+            f"<description>{escape(item.excerpt or '')}</description>\n</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n'
+        f"<title>Aktuelle Meldungen – {escape(site_name)}</title>\n"
+        f"<link>{escape(site_url + link_base)}/news</link>\n"
+        f'<atom:link href="{escape(site_url)}/api/feeds/news.rss" rel="self" type="application/rss+xml"/>\n'
+        "<description>Wichtige Informationen und Updates</description>\n<language>de</language>\n"
+        + "\n".join(entries) + "\n</channel>\n</rss>\n"
+    ).encode()
+
+
+def render_atom(items: list, site_url: str, link_base: str, site_name: str) -> bytes:
+    updated = max((item.updated_at or item.date for item in items), default=datetime.now(timezone.utc))
+    entries = []
+    for item in items:
+        link = escape(f"{site_url}{link_base}/news/{item.id}")
+        entries.append(
+            f"<entry>\n<title>{escape(item.title)}</title>\n"
+            f'<link rel="alternate" type="text/html" href="{link}"/>\n'
+            f"<id>urn:uuid:{escape(item.id)}</id>\n"
+            f"<published>{_xml_date(item.date)}</published>\n<updated>{_xml_date(item.updated_at or item.date)}</updated>\n"
+            f"<summary>{escape(item.excerpt or '')}</summary>\n"
+            f'<content type="text">{escape(item.content)}</content>\n</entry>'
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="de">\n'
+        f"<title>Aktuelle Meldungen – {escape(site_name)}</title>\n"
+        f'<link rel="alternate" type="text/html" href="{escape(site_url + link_base)}/news"/>\n'
+        f'<link rel="self" type="application/atom+xml" href="{escape(site_url)}/api/feeds/news.atom"/>\n'
+        f"<id>{escape(site_url)}/api/feeds/news.atom</id>\n<updated>{_xml_date(updated)}</updated>\n"
+        f"<author><name>{escape(site_name)}</name></author>\n"
+        + "\n".join(entries) + "\n</feed>\n"
+    ).encode()
+
+
+def render_sitemap(news: Iterable, site_url: str, link_base: str) -> bytes:
+    """news are (id, updated_at) pairs of the published news"""
+    urls = [f"<url><loc>{escape(site_url + link_base)}/{page}</loc></url>" for page in ("home", "news", "about")]
+    urls.extend(
+        f"<url><loc>{escape(f'{site_url}{link_base}/news/{news_id}')}</loc><lastmod>{_xml_date(updated_at)}</lastmod></url>"
+        for news_id, updated_at in news
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n' + "\n".join(urls) + "\n</urlset>\n"
+    ).encode()
@@ -0,0 +1,83 @@
+"""Append-only local spool for writes that could not reach MongoDB.
+
+Records are single lines appended to numbered segment files and fsync'd
+before append() returns, so an accepted record survives a crash or power
+loss. seal() closes the active segment and hands every segment to the
+replayer, which deletes a segment only after all its records are stored.
+A line cut short by a crash has no trailing newline and is skipped.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+
+class Spool:
+    prefix = "segment-"
+    suffix = ".log"
+
+    def __init__(self, directory: Path, segment_bytes: int = 4 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._active = None
+        self.appended = 0
+
+    def _fsync_directory(self):
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _open_segment(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.prefix}{time.time_ns():020d}{self.suffix}"
+        self._active = open(path, "ab")
+        # The new directory entry must be durable too, not just the data
+        self._fsync_directory()
+
+    def _close_active(self):
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+
+    def append(self, record: bytes):
+        """Write one record (without newlines) durably; blocking, run it in a thread"""
+        with self._lock:
+            if self._active is None or self._active.tell() >= self.segment_bytes:
+                self._close_active()
+                self._open_segment()
+            self._active.write(record + b"\n")
+            self._active.flush()
+            os.fsync(self._active.fileno())
+            self.appended += 1
+
+    def segments(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"{self.prefix}*{self.suffix}"))
+
+    def seal(self) -> List[Path]:
+        """Close the active segment and return all segments, oldest first"""
+        with self._lock:
+            self._close_active()
+            return self.segments()
+
+    @staticmethod
+    def read(path: Path) -> List[bytes]:
+        lines = path.read_bytes().split(b"\n")
+        # The last element is empty after a complete final record, partial otherwise
+        return [line for line in lines[:-1] if line]
+
+    def remove(self, path: Path):
+        path.unlink()
+        self._fsync_directory()
+
+    def pending_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.segments())
+
+    def close(self):
+        with self._lock:
+            self._close_active()
@@ -0,0 +1,259 @@
+"""Mixed-workload load test for the Stadtwache API.
+
+Runs the FastAPI app in-process over ASGI (against the mongod in MONGO_URL,
+using a throw-away database) or against a running server, and reports
+p50/p95/p99 latency and throughput per endpoint.
+
+Usage:
+    python benchmarks/load_bench.py --concurrency 50 --duration 30 --output results.json
+    python benchmarks/load_bench.py --base-url http://localhost:8001 --compare results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+ADMIN_USERNAME = os.getenv("BENCH_ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("BENCH_ADMIN_PASSWORD", "admin123")
+
+REPORT = {
+    "incident_type": "Diebstahl",
+    "description": "Fahrrad vor dem Bahnhof entwendet. " * 10,
+    "location": "Hauptstraße 123",
+    "incident_date": "2024-05-01",
+    "incident_time": "14:30",
+    "reporter_name": "Load Test",
+    "reporter_email": "loadtest@example.de",
+    "reporter_phone": "+49 123 456789",
+}
+
+FEEDBACK = {
+    "name": "Load Test",
+    "email": "loadtest@example.de",
+    "subject": "Benchmark",
+    "message": "Automatisch erzeugtes Feedback.",
+    "rating": 5,
+}
+
+CV_BYTES = b"%PDF-1.4\n" + os.urandom(200 * 1024)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.latencies[name].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[name] += 1
+        return response
+
+
+async def public_page_load(client, recorder, headers):
+    # What the React homepage fetches on first render
+    await asyncio.gather(
+        recorder.call(client, "GET /api/homepage", "GET", "/api/homepage"),
+        recorder.call(client, "GET /api/services", "GET", "/api/services"),
+        recorder.call(client, "GET /api/team", "GET", "/api/team"),
+        recorder.call(client, "GET /api/statistics", "GET", "/api/statistics"),
+        recorder.call(client, "GET /api/navigation", "GET", "/api/navigation"),
+        recorder.call(client, "GET /api/news/featured", "GET", "/api/news/featured"),
+        recorder.call(client, "GET /api/chat-widget", "GET", "/api/chat-widget"),
+        recorder.call(client, "GET /api/chat/buttons", "GET", "/api/chat/buttons"),
+    )
+
+
+async def report_burst(client, recorder, headers):
+    await asyncio.gather(*[
+        recorder.call(client, "POST /api/reports", "POST", "/api/reports", json=REPORT)
+        for _ in range(5)
+    ])
+    await recorder.call(client, "POST /api/feedback", "POST", "/api/feedback", json=FEEDBACK)
+
+
+async def admin_refresh(client, recorder, headers):
+    await asyncio.gather(*[
+        recorder.call(client, f"GET /api/admin/{path}", "GET", f"/api/admin/{path}", headers=headers)
+        for path in ["reports", "news", "applications", "feedback", "chat/messages", "chat/buttons", "homepage", "about", "chat-widget"]
+    ])
+
+
+async def application_upload(client, recorder, headers):
+    await recorder.call(
+        client, "POST /api/applications", "POST", "/api/applications",
+        data={"name": "Load Test", "email": "loadtest@example.de", "phone": "123", "position": "Test", "message": "Benchmark"},
+        files={"cv_file": ("lebenslauf.pdf", CV_BYTES, "application/pdf")},
+    )
+
+
+SCENARIOS = {
+    "public_page_load": public_page_load,
+    "report_burst": report_burst,
+    "admin_refresh": admin_refresh,
+    "application_upload": application_upload,
+}
+DEFAULT_MIX = "public_page_load=70,report_burst=10,admin_refresh=15,application_upload=5"
+
+
+def parse_mix(mix: str):
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for name, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": recorder.errors.get(name, 0),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    return endpoints
+
+
+async def worker(client, recorder, headers, weights, deadline):
+    names, values = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        scenario = random.choices(names, values)[0]
+        await SCENARIOS[scenario](client, recorder, headers)
+
+
+async def login(client):
+    response = await client.post("/api/admin/login", json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(args):
+    weights = parse_mix(args.mix)
+    app = None
+    if args.base_url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency * 2))
+        base_url = args.base_url
+    else:
+        os.environ["DB_NAME"] = args.db_name
+        sys.path.insert(0, str(BACKEND_DIR))
+        import server
+        # Keep benchmark CV uploads out of the real upload directory
+        upload_dir = Path(tempfile.mkdtemp(prefix="bench-uploads-"))
+        server.UPLOAD_DIR = upload_dir
+        app = server.app
+        await app.router.startup()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+            headers = await login(client)
+            # Warm-up so connection setup and default documents don't skew results
+            await asyncio.gather(*[SCENARIOS[name](client, Recorder(), headers) for name in weights])
+
+            recorder = Recorder()
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*[
+                worker(client, recorder, headers, weights, deadline) for _ in range(args.concurrency)
+            ])
+            elapsed = time.perf_counter() - start
+    finally:
+        if app is not None:
+            if args.drop:
+                await server.client.drop_database(args.db_name)
+            await app.router.shutdown()
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "mix": weights,
+        "total_requests": sum(len(v) for v in recorder.latencies.values()),
+        "throughput_rps": round(sum(len(v) for v in recorder.latencies.values()) / elapsed, 2),
+        "endpoints": summarize(recorder, elapsed),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    print(f"{results['target']} @ {results['concurrency']} workers, {results['duration_s']} s, "
+          f"{results['total_requests']} requests, {results['throughput_rps']} req/s")
+    header = f"{'endpoint':<34}{'reqs':>7}{'err':>5}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    if baseline:
+        header += f"{'Δp95':>9}"
+    print(header)
+    for name, stats in results["endpoints"].items():
+        line = (f"{name:<34}{stats['requests']:>7}{stats['errors']:>5}{stats['throughput_rps']:>9}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous and previous["p95_ms"]:
+            line += f"{(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:>+8.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--db-name", default="stadtwache_benchmark", help="database used by the in-process app")
+    parser.add_argument("--drop", action="store_true", help="drop the benchmark database afterwards")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15, help="seconds")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="earlier JSON results to compare p95 against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
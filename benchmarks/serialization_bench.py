@@ -0,0 +1,188 @@
+"""Microbenchmark: legacy list serialization vs. model_list_response.
+
+Runs without a database. Usage:
+    python benchmarks/serialization_bench.py [--rounds 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import server  # noqa: E402
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def report_doc(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "incident_type": "Diebstahl",
+        "description": "Fahrrad vor dem Bahnhof entwendet. " * 20,
+        "location": "Hauptstraße 123",
+        "incident_date": "2024-05-01",
+        "incident_time": "14:30",
+        "reporter_name": f"Bürger {i}",
+        "reporter_email": f"buerger{i}@example.de",
+        "reporter_phone": "+49 123 456789",
+        "status": "new",
+        "priority": "normal",
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+def news_summary_doc(i):
+    # GET /api/news reads NEWS_SUMMARY_PROJECTION only
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Meldung {i}",
+        "excerpt": "Lorem ipsum dolor sit amet. " * 8,
+        "image": None,
+        "date": _now(),
+        "priority": "normal",
+    }
+
+
+def feedback_doc(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Bürger {i}",
+        "email": f"buerger{i}@example.de",
+        "subject": "Lob",
+        "message": "Vielen Dank für die schnelle Hilfe. " * 5,
+        "rating": 5,
+        "status": "new",
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+def chat_doc(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "visitor_name": f"Besucher {i}",
+        "visitor_email": f"besucher{i}@example.de",
+        "message": "Wann ist das Revier geöffnet?",
+        "status": "new",
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+def application_doc(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Bewerber {i}",
+        "email": f"bewerber{i}@example.de",
+        "phone": "+49 123 456789",
+        "position": "Polizeimeister",
+        "message": "Hiermit bewerbe ich mich. " * 10,
+        "status": "pending",
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+def service_doc(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "title": f"Dienst {i}",
+        "description": "24/7 Patrouillen für Ihre Sicherheit",
+        "icon": "Shield",
+        "order": i,
+        "active": True,
+        "updated_at": _now(),
+    }
+
+
+# (endpoint, model, document factory, number of documents)
+CASES = [
+    ("GET /api/admin/reports", server.Report, report_doc, 1000),
+    ("GET /api/admin/applications", server.Application, application_doc, 1000),
+    ("GET /api/admin/feedback", server.Feedback, feedback_doc, 1000),
+    ("GET /api/admin/chat/messages", server.ChatMessage, chat_doc, 1000),
+    ("GET /api/news", server.NewsSummary, news_summary_doc, 100),
+    ("GET /api/services", server.Service, service_doc, 100),
+]
+
+
+async def legacy(model, field, docs):
+    items = [model(**doc) for doc in docs]
+    content = await serialize_response(field=field, response_content=items)
+    return JSONResponse(content).body
+
+
+def fast(model, docs):
+    return server.model_list_response(model, docs).body
+
+
+def _normalized(value):
+    # pydantic writes UTC as "Z", jsonable_encoder as "+00:00"; compare the instants
+    if isinstance(value, dict):
+        return {key: _normalized(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalized(item) for item in value]
+    if isinstance(value, str) and "T" in value:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def same_payload(legacy_body: bytes, fast_body: bytes) -> bool:
+    return _normalized(json.loads(legacy_body)) == _normalized(json.loads(fast_body))
+
+
+async def measure(rounds):
+    results = []
+    for endpoint, model, factory, count in CASES:
+        docs = [factory(i) for i in range(count)]
+        field = create_response_field(name="Response", type_=List[model])
+
+        # Both paths must produce the same payload
+        assert same_payload(await legacy(model, field, docs), fast(model, docs)), endpoint
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await legacy(model, field, docs)
+        legacy_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fast(model, docs)
+        fast_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        results.append((endpoint, count, legacy_ms, fast_ms))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(measure(args.rounds))
+    print(f"{'endpoint':<32}{'docs':>6}{'legacy ms':>12}{'fast ms':>10}{'speedup':>10}")
+    for endpoint, count, legacy_ms, fast_ms in results:
+        print(f"{endpoint:<32}{count:>6}{legacy_ms:>12.2f}{fast_ms:>10.2f}{legacy_ms / fast_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,27 @@ import "./App.css";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Idempotency-Key for a form submission. crypto.randomUUID only exists on
+// secure origins in current browsers, so fall back to a v4 UUID built from
+// getRandomValues, or Math.random where even that is missing.
+const newSubmissionKey = () => {
+  if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+    return window.crypto.randomUUID();
+  }
+  const bytes = new Uint8Array(16);
+  if (window.crypto && typeof window.crypto.getRandomValues === 'function') {
+    window.crypto.getRandomValues(bytes);
+  } else {
+    for (let i = 0; i < bytes.length; i++) {
+      bytes[i] = Math.floor(Math.random() * 256);
+    }
+  }
+  bytes[6] = (bytes[6] & 0x0f) | 0x40;
+  bytes[8] = (bytes[8] & 0x3f) | 0x80;
+  const hex = Array.from(bytes, (byte) => byte.toString(16).padStart(2, '0')).join('');
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+};
+
 // Admin Context
 const AdminContext = React.createContext();
 
@@ -202,6 +223,68 @@ const AdminDashboard = ({ onLogout }) => {
     loadData();
   }, []);
 
+  // Live updates pushed by the backend, so the dashboard never has to reload
+  useEffect(() => {
+    if (!localStorage.getItem('admin_token') || typeof EventSource === 'undefined') return;
+
+    let source = null;
+    let retryTimer = null;
+    let stopped = false;
+    let reconnecting = false;
+
+    const upsert = (setter) => (event) => {
+      const item = JSON.parse(event.data);
+      setter((items) => items.some((existing) => existing.id === item.id)
+        ? items.map((existing) => (existing.id === item.id ? item : existing))
+        : [item, ...items]);
+    };
+    const streams = {
+      report: upsert(setReports),
+      chat_message: upsert(setChatMessages),
+      application: upsert(setApplications),
+      feedback: upsert(setFeedback)
+    };
+
+    // Tickets are single-use, so every (re)connect asks for a new one instead of
+    // letting EventSource retry the old URL
+    const connect = async () => {
+      let ticket;
+      try {
+        ticket = (await axios.post(`${API}/admin/events/ticket`)).data.ticket;
+      } catch (error) {
+        console.error('Error opening live updates:', error);
+        retryTimer = setTimeout(connect, 5000);
+        return;
+      }
+      if (stopped) return;
+
+      source = new EventSource(`${API}/admin/events?ticket=${encodeURIComponent(ticket)}`);
+      source.addEventListener('open', () => {
+        // Events sent while disconnected (or dropped because we fell behind) are lost
+        if (reconnecting) {
+          reconnecting = false;
+          loadData();
+        }
+      });
+      source.addEventListener('error', () => {
+        source.close();
+        reconnecting = true;
+        if (!stopped) retryTimer = setTimeout(connect, 3000);
+      });
+      Object.entries(streams).forEach(([name, handler]) => {
+        source.addEventListener(`${name}.created`, handler);
+        source.addEventListener(`${name}.updated`, handler);
+      });
+    };
+    connect();
+
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+    };
+  }, []);
+
   const handleLogout = () => {
     localStorage.removeItem('admin_token');
     delete axios.defaults.headers.common['Authorization'];
@@ -1712,6 +1795,17 @@ const HeroSection = ({ setActiveSection }) => {
 const NewsSection = () => {
   const [news, setNews] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [selectedNews, setSelectedNews] = useState(null);
+
+  const openNews = async (id) => {
+    try {
+      const response = await axios.get(`${API}/news/${id}`);
+      setSelectedNews(response.data);
+    } catch (error) {
+      console.error('Error fetching news item:', error);
+      toast.error('Fehler beim Laden der Meldung');
+    }
+  };
 
   const fetchNews = async () => {
     try {
@@ -1784,13 +1878,32 @@ const NewsSection = () => {
                   <CardTitle className="text-lg">{item.title}</CardTitle>
                 </CardHeader>
                 <CardContent>
-                  <p className="text-slate-600">{item.content}</p>
+                  <p className="text-slate-600 mb-4">{item.excerpt}</p>
+                  <Button variant="outline" size="sm" onClick={() => openNews(item.id)}>
+                    Weiterlesen
+                  </Button>
                 </CardContent>
               </Card>
             ))
           )}
         </div>
       </div>
+
+      <Dialog open={selectedNews !== null} onOpenChange={(open) => !open && setSelectedNews(null)}>
+        <DialogContent className="max-w-2xl">
+          {selectedNews && (
+            <>
+              <DialogHeader>
+                <DialogTitle>{selectedNews.title}</DialogTitle>
+                <DialogDescription>
+                  {new Date(selectedNews.date).toLocaleDateString('de-DE')}
+                </DialogDescription>
+              </DialogHeader>
+              <p className="text-slate-600 whitespace-pre-line">{selectedNews.content}</p>
+            </>
+          )}
+        </DialogContent>
+      </Dialog>
     </section>
   );
 };
@@ -2185,6 +2298,8 @@ const OnlineReportForm = () => {
   });
   const [incidentTypes, setIncidentTypes] = useState([]);
   const [loading, setLoading] = useState(false);
+  // Reused until the submission succeeds, so a resubmit after a lost response is not stored twice
+  const [submissionKey, setSubmissionKey] = useState(newSubmissionKey);
 
   useEffect(() => {
     const loadIncidentTypes = async () => {
@@ -2203,8 +2318,11 @@ const OnlineReportForm = () => {
     setLoading(true);
 
     try {
-      await axios.post(`${API}/reports`, formData);
+      await axios.post(`${API}/reports`, formData, {
+        headers: { 'Idempotency-Key': submissionKey },
+      });
       toast.success('Online-Meldung erfolgreich eingereicht! Wir werden uns zeitnah bei Ihnen melden.');
+      setSubmissionKey(newSubmissionKey());
       setFormData({
         incident_type: '',
         description: '',
@@ -2492,6 +2610,8 @@ const ApplicationForm = () => {
   });
   const [file, setFile] = useState(null);
   const [loading, setLoading] = useState(false);
+  // Reused until the submission succeeds, so a resubmit after a lost response is not stored twice
+  const [submissionKey, setSubmissionKey] = useState(newSubmissionKey);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -2509,10 +2629,12 @@ const ApplicationForm = () => {
       await axios.post(`${API}/applications`, formDataObj, {
         headers: {
           'Content-Type': 'multipart/form-data',
+          'Idempotency-Key': submissionKey,
         },
       });
 
       toast.success('Bewerbung erfolgreich eingereicht!');
+      setSubmissionKey(newSubmissionKey());
       setFormData({
         name: '',
         email: '',
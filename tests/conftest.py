@@ -0,0 +1,23 @@
+"""Environment shared by the test modules.
+
+server reads its settings once at import, so they are set here, before any
+test module imports it.
+"""
+import os
+import sys
+import uuid
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = f"stadtwache_test_{uuid.uuid4().hex[:8]}"
+# Responses queue their notification mail only with SMTP_HOST set; no
+# workers run, so nothing is sent
+os.environ["SMTP_HOST"] = "smtp.invalid"
+os.environ["JOB_WORKERS"] = "0"
+os.environ["PUBLIC_SITE_URL"] = "https://stadtwache.example"
+# No periodic tasks: the upload sweeper would clean backend/uploads against
+# the test database, and tests run the spool replay themselves
+for setting in ["ARCHIVE_INTERVAL_SECONDS", "RETENTION_SWEEP_INTERVAL_SECONDS", "UPLOAD_SWEEP_INTERVAL_SECONDS",
+                "SPOOL_REPLAY_INTERVAL_SECONDS"]:
+    os.environ[setting] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
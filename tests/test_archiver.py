@@ -0,0 +1,109 @@
+"""Archiving closed reports and editing them after they were archived.
+
+Needs a mongod at MONGO_URL (default mongodb://localhost:27017); skipped
+without one.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+        yield client, {"Authorization": f"Bearer {token}"}, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.fixture
+def database(api):
+    _, _, database = api
+    for name in ["reports", "reports_archive", "tombstones"]:
+        database[name].delete_many({})
+    return database
+
+
+def _report(status, age_days):
+    updated_at = datetime.now(timezone.utc) - timedelta(days=age_days)
+    return {
+        "id": str(uuid.uuid4()), "incident_type": "Diebstahl", "description": "Fahrrad weg", "location": "Marktplatz",
+        "incident_date": "2024-05-01", "incident_time": "12:00", "reporter_name": "Test",
+        "reporter_email": "test@example.de", "reporter_phone": "0123", "status": status, "priority": "normal",
+        "created_at": updated_at, "updated_at": updated_at,
+    }
+
+
+def test_only_old_closed_reports_are_archived(api, database):
+    client, _, _ = api
+    old_closed = _report("closed", server.ARCHIVE_REPORTS_AFTER_DAYS + 1)
+    old_open = _report("new", server.ARCHIVE_REPORTS_AFTER_DAYS + 1)
+    recent_closed = _report("closed", 1)
+    database.reports.insert_many([old_closed, old_open, recent_closed])
+
+    moved = client.portal.call(server.archiver.run)
+
+    assert moved["reports"] == 1
+    assert database.reports_archive.find_one({"id": old_closed["id"]}) is not None
+    assert sorted(doc["id"] for doc in database.reports.find()) == sorted([old_open["id"], recent_closed["id"]])
+    assert database.tombstones.find_one({"collection": "reports", "id": old_closed["id"]}) is not None
+
+
+def test_rerun_after_an_interrupted_copy_is_safe(api, database):
+    client, _, _ = api
+    report = _report("completed", server.ARCHIVE_REPORTS_AFTER_DAYS + 1)
+    database.reports.insert_one(dict(report))
+    # A previous run copied the report and died before deleting it
+    database.reports_archive.insert_one(dict(report))
+
+    assert client.portal.call(server.archiver.run)["reports"] == 1
+    assert database.reports.count_documents({}) == 0
+    assert database.reports_archive.count_documents({"id": report["id"]}) == 1
+
+
+def test_archived_report_is_restored_when_edited(api, database):
+    client, headers, _ = api
+    report = _report("closed", server.ARCHIVE_REPORTS_AFTER_DAYS + 1)
+    database.reports.insert_one(report)
+    client.portal.call(server.archiver.run)
+
+    response = client.put(f"/api/admin/reports/{report['id']}", json={"admin_notes": "Wiederaufgenommen"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["admin_notes"] == "Wiederaufgenommen"
+    assert database.reports.find_one({"id": report["id"]})["admin_notes"] == "Wiederaufgenommen"
+    assert database.reports_archive.find_one({"id": report["id"]}) is None
+    assert database.tombstones.find_one({"collection": "reports", "id": report["id"]}) is None
+    # Edited just now, so the next run leaves it alone
+    assert client.portal.call(server.archiver.run)["reports"] == 0
+
+
+def test_status_change_restores_an_archived_report(api, database):
+    client, headers, _ = api
+    report = _report("closed", server.ARCHIVE_REPORTS_AFTER_DAYS + 1)
+    database.reports.insert_one(report)
+    client.portal.call(server.archiver.run)
+
+    response = client.put(f"/api/admin/reports/{report['id']}/status", data={"status": "in_progress"}, headers=headers)
+
+    assert response.status_code == 200
+    assert database.reports.find_one({"id": report["id"]})["status"] == "in_progress"
+
+
+def test_unknown_report_is_still_404(api, database):
+    client, headers, _ = api
+    response = client.put(f"/api/admin/reports/{uuid.uuid4()}", json={"admin_notes": "x"}, headers=headers)
+    assert response.status_code == 404
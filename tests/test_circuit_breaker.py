@@ -0,0 +1,126 @@
+"""The public reads circuit breaker and the stale fallback behind it.
+
+Loads and probes are plain coroutines, so these tests need no mongod.
+"""
+import asyncio
+
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+from starlette.requests import Request
+
+import server
+
+
+async def _ok():
+    return "ok"
+
+
+async def _down():
+    raise ServerSelectionTimeoutError("no primary")
+
+
+async def _slow():
+    await asyncio.sleep(1)
+
+
+def _breaker(probe=_down, timeout=0.05):
+    return server.CircuitBreaker("test", 2, timeout, 0.01, probe)
+
+
+async def _fail(breaker, load=_down, times=1):
+    for _ in range(times):
+        with pytest.raises(server.CircuitBreaker.errors):
+            await breaker.call(load)
+
+
+def test_opens_after_consecutive_failures():
+    breaker, calls = _breaker(), []
+
+    async def counted():
+        calls.append(1)
+        return "ok"
+
+    async def run():
+        await _fail(breaker)
+        assert not breaker.is_open
+        await _fail(breaker, _slow)  # timeouts count as failures
+        assert breaker.is_open
+        with pytest.raises(server.CircuitOpenError):
+            await breaker.call(counted)
+        breaker.stop()
+
+    asyncio.run(run())
+    assert calls == []
+
+
+def test_success_resets_the_failure_count():
+    breaker = _breaker()
+
+    async def run():
+        await _fail(breaker)
+        assert await breaker.call(_ok) == "ok"
+        await _fail(breaker)
+        return breaker.is_open
+
+    assert asyncio.run(run()) is False
+
+
+def test_probe_closes_the_breaker():
+    probes = []
+
+    async def probe():
+        probes.append(1)
+        if len(probes) < 3:
+            raise ServerSelectionTimeoutError("still down")
+
+    breaker = _breaker(probe)
+
+    async def run():
+        await _fail(breaker, times=2)
+        assert breaker.is_open
+        for _ in range(100):
+            if not breaker.is_open:
+                break
+            await asyncio.sleep(0.01)
+        return await breaker.call(_ok)
+
+    assert asyncio.run(run()) == "ok"
+    assert len(probes) == 3
+    assert breaker.failures == 0
+
+
+@pytest.fixture
+def public_reads(monkeypatch):
+    breaker = server.CircuitBreaker("test_public", 1, 0.05, 60, _down)
+    monkeypatch.setattr(server, "public_breaker", breaker)
+    # Every lookup misses, so each request goes to the breaker
+    monkeypatch.setattr(server.TTLCache, "instances", dict(server.TTLCache.instances))
+    monkeypatch.setattr(server, "public_cache", server.TTLCache("test_public", 0))
+    monkeypatch.setattr(server, "last_good_responses", server.LastGoodResponses(None))
+    yield breaker
+    breaker.stop()
+
+
+def _get(key, load):
+    return server.cached_public_response(Request({"type": "http", "headers": []}), key, load)
+
+
+def test_last_good_body_is_served_while_mongodb_is_down(public_reads):
+    async def run():
+        good = await _get(("services",), _ok)
+        stale = await _get(("services",), _down)
+        # Open now: the load is not even tried
+        again = await _get(("services",), _slow)
+        return good, stale, again
+
+    good, stale, again = asyncio.run(run())
+    assert public_reads.is_open
+    assert stale.body == again.body == good.body == b'"ok"'
+    assert "x-content-stale" not in good.headers
+    assert stale.headers["x-content-stale"] == again.headers["x-content-stale"] == "database-unavailable"
+
+
+def test_without_a_last_good_body_the_answer_is_503(public_reads):
+    with pytest.raises(server.HTTPException) as raised:
+        asyncio.run(_get(("team",), _down))
+    assert raised.value.status_code == 503
@@ -0,0 +1,86 @@
+"""Accept-Encoding negotiation and the compression middleware.
+
+Runs against small in-process apps, so these tests need no mongod.
+"""
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import compression
+from compression import CompressionMiddleware, PrecompressedBody, choose_encoding
+
+BODY = b'{"items": [' + b", ".join(b'"Streifendienst"' for _ in range(200)) + b"]}"
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0, gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+
+def test_without_brotli_only_gzip_is_offered(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_precompressed_variant_is_built_once(monkeypatch):
+    body = PrecompressedBody(BODY)
+    first = body.response("gzip")
+    calls = []
+    monkeypatch.setattr(compression, "compress", lambda *args: calls.append(args))
+
+    second = body.response("gzip")
+
+    assert calls == []
+    assert first.body == second.body
+    assert gzip.decompress(second.body) == BODY
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.headers["vary"] == "Accept-Encoding"
+
+
+def test_small_precompressed_body_is_sent_as_is():
+    response = PrecompressedBody(b'{"ok": true}').response("gzip, br")
+    assert response.body == b'{"ok": true}'
+    assert "content-encoding" not in response.headers
+
+
+def _client():
+    async def json(request):
+        return Response(BODY, media_type="application/json")
+
+    async def png(request):
+        return Response(BODY, media_type="image/png")
+
+    async def stream(request):
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[Route("/json", json), Route("/png", png), Route("/stream", stream)])
+    return TestClient(CompressionMiddleware(app, minimum_size=100))
+
+
+def test_middleware_compresses_allowed_content_types():
+    response = _client().get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize("path", ["/png", "/stream"])
+def test_middleware_passes_other_responses_through(path):
+    response = _client().get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(BODY)
@@ -0,0 +1,73 @@
+"""Operator checks of the admin database console.
+
+Forbidden operators are rejected before any query reaches MongoDB, so these
+tests need no mongod.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+FUNCTION = {"$function": {"body": "function() { return 1 }", "args": [], "lang": "js"}}
+
+
+@pytest.mark.parametrize("fields", [
+    {"query": {"$where": "sleep(10000) || true"}},
+    {"query": {"$expr": {"$eq": [FUNCTION, 1]}}},
+    {"projection": {"name": 1, "computed": FUNCTION}},
+    {"projection": {"computed": {"$accumulator": {}}}},
+    {"sort": {"$where": 1}},
+])
+def test_forbidden_operator_is_rejected(fields):
+    query = server.DatabaseQuery(collection="reports", **fields)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(server.query_database(query, current_admin={"username": "admin"}))
+    assert raised.value.status_code == 400
+    assert "is not allowed" in raised.value.detail
+
+
+@pytest.mark.parametrize("pipeline", [
+    ["$match"],
+    [{"$facet": {"a": {"x": 1}}}],
+    [{"$facet": {"a": ["$match"]}}],
+    [{"$facet": []}],
+    [{"$match": {}, "$limit": 1}],
+])
+def test_malformed_pipeline_is_rejected(pipeline):
+    aggregation = server.DatabaseAggregation.model_construct(collection="reports", pipeline=pipeline)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(server.aggregate_database(aggregation, current_admin={"username": "admin"}))
+    assert raised.value.status_code == 400
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+def _stream(documents, cache_key):
+    async def run():
+        return [line async for line in server._stream_aggregation(FakeCursor(documents), cache_key, 100)]
+    return asyncio.run(run())
+
+
+def test_large_aggregation_results_are_not_cached(monkeypatch):
+    monkeypatch.setattr(server, "DB_CONSOLE_CACHE_MAX_ENTRY_BYTES", 64)
+    server.aggregation_cache.clear()
+
+    _stream([{"n": 1}], "small")
+    lines = _stream([{"n": index, "text": "x" * 20} for index in range(5)], "large")
+
+    assert server.aggregation_cache.get("small") is not None
+    assert server.aggregation_cache.get("large") is None
+    # The result is streamed in full either way
+    assert len(lines) == 5
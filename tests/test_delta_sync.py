@@ -0,0 +1,67 @@
+"""Delta sync: updated_at handling and paging of changes_since_response.
+
+The model tests run anywhere; the paging test needs a mongod at MONGO_URL
+(default mongodb://localhost:27017) and is skipped without one.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+
+def test_stored_document_without_updated_at_reads_as_none():
+    service = server.Service(title="Streifendienst", description="Patrouillen")
+    assert service.updated_at is None
+    assert server.model_list_response(server.Service, [{"id": "s", "title": "T", "description": "D"}]).body.count(b'"updated_at":null') == 1
+
+
+def test_new_document_starts_with_updated_at():
+    service = server.Service(title="Streifendienst", description="Patrouillen")
+    document = server.new_document(service)
+    assert document["updated_at"] is not None
+    assert service.updated_at == document["updated_at"]
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        yield client, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+def test_truncated_pages_do_not_skip_documents_sharing_a_timestamp(api):
+    client, database = api
+    database.statistics.delete_many({})
+    start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=1)
+    # Three distinct timestamps, then four documents written by one update
+    database.statistics.insert_many([
+        {"id": f"stat-{index}", "title": f"Zahl {index}", "value": str(index), "order": index,
+         "updated_at": start + timedelta(seconds=min(index, 3))}
+        for index in range(7)
+    ])
+
+    async def page(since):
+        response = await server.changes_since_response("statistics", server.Statistic, since, limit=2)
+        return orjson.loads(response.body)
+
+    since, seen = start - timedelta(seconds=1), []
+    for _ in range(5):
+        result = client.portal.call(page, since)
+        seen += [change["id"] for change in result["changes"]]
+        if result["complete"]:
+            break
+        since = result["next_since"]
+    assert result["complete"]
+    assert sorted(set(seen)) == [f"stat-{index}" for index in range(7)]
@@ -0,0 +1,77 @@
+"""Stream tickets for the admin event stream.
+
+Needs a mongod at MONGO_URL (default mongodb://localhost:27017); skipped
+without one.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+        yield client, {"Authorization": f"Bearer {token}"}, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+def _authenticate(client, ticket):
+    """The admin for ticket, or the status code it is refused with"""
+    async def call():
+        try:
+            return (await server.get_current_admin_for_stream(None, ticket))["username"]
+        except HTTPException as e:
+            return e.status_code
+    return client.portal.call(call)
+
+
+def test_ticket_is_single_use(api):
+    client, headers, _ = api
+    response = client.post("/api/admin/events/ticket", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["expires_in"] == server.ADMIN_EVENTS_TICKET_SECONDS
+
+    ticket = response.json()["ticket"]
+    assert _authenticate(client, ticket) == "admin"
+    assert _authenticate(client, ticket) == 401
+
+
+def test_expired_ticket_is_refused(api):
+    client, headers, database = api
+    ticket = client.post("/api/admin/events/ticket", headers=headers).json()["ticket"]
+    database.stream_tickets.update_many({}, {"$set": {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+
+    assert _authenticate(client, ticket) == 401
+
+
+def test_only_the_ticket_hash_is_stored(api):
+    client, headers, database = api
+    ticket = client.post("/api/admin/events/ticket", headers=headers).json()["ticket"]
+    assert database.stream_tickets.find_one({"ticket_hash": ticket}) is None
+    assert database.stream_tickets.find_one({"ticket_hash": server._ticket_hash(ticket)}) is not None
+
+
+def test_stream_refuses_jwt_in_query_string(api):
+    client, headers, _ = api
+    token = headers["Authorization"].removeprefix("Bearer ")
+    assert client.get("/api/admin/events", params={"token": token}).status_code == 401
+    assert client.get("/api/admin/events", params={"ticket": "unknown"}).status_code == 401
+
+
+def test_ticket_requires_admin(api):
+    client, _, _ = api
+    assert client.post("/api/admin/events/ticket").status_code in (401, 403)
@@ -0,0 +1,87 @@
+"""RSS/Atom news feeds and the sitemap.
+
+The rendering tests run anywhere; the endpoint tests need a mongod at
+MONGO_URL (default mongodb://localhost:27017) and are skipped without one.
+"""
+import asyncio
+import os
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+from snapshots import render_atom, render_rss, render_sitemap
+
+SITE = "https://stadtwache.example"
+ATOM = "{http://www.w3.org/2005/Atom}"
+FIRST = server.NewsItem(id="n1", title="Straßenfest & Umleitung", content="<b>Text</b>", excerpt="Kurz",
+                        date=datetime(2024, 5, 1, tzinfo=timezone.utc))
+SECOND = server.NewsItem(id="n2", title="Sprechstunde", content="Text", date=datetime(2024, 5, 2, tzinfo=timezone.utc),
+                         updated_at=datetime(2024, 5, 3, tzinfo=timezone.utc))
+
+
+def test_rss_links_are_absolute():
+    channel = ElementTree.fromstring(render_rss([SECOND, FIRST], SITE, "/api/pages", "Stadtwache")).find("channel")
+    items = channel.findall("item")
+    assert [item.findtext("link") for item in items] == [f"{SITE}/api/pages/news/n2", f"{SITE}/api/pages/news/n1"]
+    assert items[1].findtext("title") == "Straßenfest & Umleitung"
+    assert items[1].findtext("pubDate") == "Wed, 01 May 2024 00:00:00 GMT"
+
+
+def test_atom_is_updated_with_its_latest_entry():
+    feed = ElementTree.fromstring(render_atom([SECOND, FIRST], SITE, "/api/pages", "Stadtwache"))
+    assert feed.findtext(f"{ATOM}updated") == "2024-05-03T00:00:00Z"
+    entries = feed.findall(f"{ATOM}entry")
+    assert entries[0].findtext(f"{ATOM}updated") == "2024-05-03T00:00:00Z"
+    assert entries[1].findtext(f"{ATOM}content") == "<b>Text</b>"
+
+
+def test_sitemap_lists_pages_and_news():
+    sitemap = ElementTree.fromstring(render_sitemap([("n1", FIRST.date)], SITE, "/api/pages"))
+    namespace = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+    locations = [url.findtext(f"{namespace}loc") for url in sitemap]
+    assert locations == [f"{SITE}/api/pages/{page}" for page in ("home", "news", "about", "news/n1")]
+    assert sitemap[-1].findtext(f"{namespace}lastmod") == "2024-05-01T00:00:00Z"
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+        yield client, {"Authorization": f"Bearer {token}"}
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+def test_feed_answers_304_until_news_change(api, monkeypatch):
+    client, headers = api
+    monkeypatch.setattr(server.page_snapshots, "refresh_delay", 0)
+    news = client.post("/api/admin/news", data={"title": "Neu", "content": "Text"}, headers=headers).json()
+
+    first = client.get("/api/feeds/news.rss")
+    assert first.status_code == 200
+    assert first.headers["content-type"].startswith("application/rss+xml")
+    assert client.get("/api/feeds/news.rss", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    client.put(f"/api/admin/news/{news['id']}", json={"title": "Geändert"}, headers=headers)
+    client.portal.call(asyncio.sleep, 0.2)  # the background re-render
+
+    changed = client.get("/api/feeds/news.rss", headers={"If-None-Match": first.headers["etag"]})
+    assert changed.status_code == 200
+    assert "Geändert" in changed.text
+
+
+def test_feeds_need_a_configured_site_url(api, monkeypatch):
+    client, _ = api
+    monkeypatch.setattr(server.page_snapshots, "site_url", "")
+    for path in ["/api/feeds/news.rss", "/api/feeds/news.atom", "/api/sitemap.xml"]:
+        assert client.get(path).status_code == 503
@@ -0,0 +1,220 @@
+"""Idempotency-Key handling on the public create endpoints.
+
+The fingerprint tests run anywhere; the endpoint tests need a mongod at
+MONGO_URL (default mongodb://localhost:27017) and are skipped without one.
+"""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import server
+from idempotency import IdempotencyMiddleware, body_fingerprint, scoped_key
+
+FEEDBACK = {"name": "Test", "email": "test@example.de", "subject": "Lob", "message": "Danke", "rating": 5}
+ROUTE = "POST /api/feedback"
+
+
+def test_multipart_boundary_is_not_fingerprinted():
+    def form(boundary):
+        return (f"--{boundary}\r\nContent-Disposition: form-data; name=\"name\"\r\n\r\nTest\r\n--{boundary}--\r\n").encode()
+
+    first = body_fingerprint("multipart/form-data; boundary=abc123", form("abc123"))
+    assert body_fingerprint('multipart/form-data; boundary="xyz789"', form("xyz789")) == first
+    assert body_fingerprint("multipart/form-data; boundary=abc123", form("abc123").replace(b"Test", b"Other")) != first
+
+
+def test_keys_are_scoped_by_route():
+    assert scoped_key("POST /api/feedback", "key") != scoped_key("POST /api/reports", "key")
+
+
+class MemoryStore:
+    def __init__(self):
+        self.records = {}
+
+    async def claim(self, key, method, path, fingerprint):
+        if key in self.records:
+            return self.records[key]
+        self.records[key] = {"method": method, "path": path, "fingerprint": fingerprint, "state": "pending"}
+        return None
+
+    async def complete(self, key, status_code, media_type, body):
+        self.records[key].update(state="done", status_code=status_code, media_type=media_type, body=body)
+
+    async def release(self, key):
+        self.records.pop(key, None)
+
+
+async def _call(app, body, client=("192.0.2.1", 1234), chunk_size=None):
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1} for i, chunk in enumerate(chunks)]
+    headers = [(b"idempotency-key", b"key"), (b"content-type", b"application/json")]
+    if not chunk_size:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/api/feedback", "headers": headers, "client": client,
+             "query_string": b"", "root_path": ""}
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+    await app(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def _middleware():
+    calls = []
+
+    async def endpoint(request):
+        calls.append(await request.body())
+        return JSONResponse({"id": len(calls)})
+
+    app = Starlette(routes=[Route("/api/feedback", endpoint, methods=["POST"])])
+    return IdempotencyMiddleware(app, MemoryStore(), ["/api/feedback"], max_body_size=64), calls
+
+
+def test_retry_from_a_new_address_is_replayed():
+    middleware, calls = _middleware()
+
+    async def run():
+        first = await _call(middleware, b'{"rating": 5}', client=("192.0.2.1", 1234))
+        retry = await _call(middleware, b'{"rating": 5}', client=("198.51.100.7", 4321))
+        return first, retry
+
+    first, retry = asyncio.run(run())
+    assert first[2] == retry[2] == b'{"id":1}'
+    assert retry[1][b"idempotent-replayed"] == b"true"
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("chunk_size", [None, 16])
+def test_oversized_body_is_refused(chunk_size):
+    middleware, calls = _middleware()
+    status, _, _ = asyncio.run(_call(middleware, b"x" * 65, chunk_size=chunk_size))
+    assert status == 413
+    assert calls == []
+
+
+def test_lookup_of_a_taken_key_keeps_to_the_time_budget(monkeypatch):
+    class SlowKeys:
+        async def insert_one(self, document):
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+        async def find_one(self, *args, **kwargs):
+            await asyncio.sleep(10)
+
+    class SlowDatabase:
+        idempotency_keys = SlowKeys()
+
+    monkeypatch.setattr(server, "db", SlowDatabase())
+    monkeypatch.setattr(server, "SPOOL_WRITE_BUDGET_SECONDS", 0.05)
+    store = server.IdempotencyStore(60, 10, 120)
+
+    record = asyncio.run(asyncio.wait_for(store.claim("key", "POST", "/api/feedback", "fingerprint"), 1))
+
+    # Answered as still in progress, so the client retries
+    assert record["state"] == "pending"
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        yield client, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+def _post(client, key, payload=FEEDBACK):
+    return client.post(
+        "/api/feedback",
+        content=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json", "Idempotency-Key": key},
+    )
+
+
+def _pending_claim(database, key, claimed_at, payload=FEEDBACK):
+    database.idempotency_keys.insert_one({
+        "key": scoped_key(ROUTE, key),
+        "method": "POST",
+        "path": "/api/feedback",
+        "fingerprint": body_fingerprint("application/json", json.dumps(payload).encode()),
+        "state": "pending",
+        "claimed_at": claimed_at,
+        "created_at": claimed_at,
+    })
+
+
+def test_completed_key_is_replayed(api):
+    client, database = api
+    key = str(uuid.uuid4())
+
+    first = _post(client, key)
+    retry = _post(client, key)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert database.feedback.count_documents({"id": first.json()["id"]}) == 1
+
+
+def test_pending_key_answers_409(api):
+    client, database = api
+    key = str(uuid.uuid4())
+    _pending_claim(database, key, datetime.now(timezone.utc))
+
+    response = _post(client, key)
+
+    assert response.status_code == 409
+    assert database.idempotency_keys.find_one({"key": scoped_key(ROUTE, key)})["state"] == "pending"
+
+
+def test_stale_pending_claim_is_taken_over(api):
+    client, database = api
+    key = str(uuid.uuid4())
+    _pending_claim(database, key, datetime.now(timezone.utc) - timedelta(seconds=server.IDEMPOTENCY_PENDING_LEASE_SECONDS + 5))
+
+    response = _post(client, key)
+
+    assert response.status_code == 200
+    assert database.idempotency_keys.find_one({"key": scoped_key(ROUTE, key)})["state"] == "done"
+    assert database.feedback.count_documents({"id": response.json()["id"]}) == 1
+
+
+def test_key_reused_for_another_body_is_rejected(api):
+    client, database = api
+    key = str(uuid.uuid4())
+    assert _post(client, key).status_code == 200
+
+    response = _post(client, key, {**FEEDBACK, "message": "Etwas anderes"})
+
+    assert response.status_code == 422
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_failed_request_releases_its_key(api):
+    client, database = api
+    key = str(uuid.uuid4())
+
+    rejected = _post(client, key, {**FEEDBACK, "rating": 9})
+    assert rejected.status_code == 422
+    assert database.idempotency_keys.find_one({"key": scoped_key(ROUTE, key)}) is None
+
+    accepted = _post(client, key)
+    assert accepted.status_code == 200
+    assert "idempotent-replayed" not in accepted.headers
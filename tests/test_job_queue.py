@@ -0,0 +1,200 @@
+"""Durable job queue: retries, dead-lettering, lease reclaim and the mail job.
+
+Needs a mongod at MONGO_URL (default mongodb://localhost:27017); skipped
+without one. No workers run (JOB_WORKERS=0), the tests claim and run jobs
+themselves.
+"""
+import os
+import smtplib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+REPORT = {
+    "incident_type": "Diebstahl", "description": "Fahrrad weg", "location": "Marktplatz",
+    "incident_date": "2024-05-01", "incident_time": "12:00", "reporter_name": "Test",
+    "reporter_email": "test@example.de", "reporter_phone": "0123",
+}
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+        yield client, {"Authorization": f"Bearer {token}"}, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.fixture
+def database(api):
+    _, _, database = api
+    database.jobs.delete_many({})
+    database.jobs_dead_letter.delete_many({})
+    return database
+
+
+def _queue(max_attempts=3):
+    return server.JobQueue(0, max_attempts, backoff_seconds=10, max_backoff_seconds=60, lease_seconds=30, poll_seconds=1)
+
+
+def _claim_and_run(client, queue):
+    job = client.portal.call(queue._claim)
+    if job is not None:
+        client.portal.call(queue._run, job)
+    return job
+
+
+def _make_due(database):
+    database.jobs.update_many({}, {"$set": {"run_at": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+
+
+def _failing(calls):
+    async def handler(payload):
+        calls.append(payload)
+        raise RuntimeError("SMTP down")
+    return handler
+
+
+def test_backoff_doubles_up_to_the_maximum(monkeypatch):
+    monkeypatch.setattr(server.random, "uniform", lambda low, high: 1)
+    queue = _queue()
+    assert [queue.backoff(attempts) for attempts in (1, 2, 3, 4, 5)] == [10, 20, 40, 60, 60]
+
+
+def test_failed_job_is_retried_later(api, database):
+    client, _, _ = api
+    queue, calls = _queue(), []
+    queue.handler("flaky")(_failing(calls))
+    client.portal.call(queue.enqueue, "flaky", {"n": 1})
+
+    before = datetime.now(timezone.utc)
+    _claim_and_run(client, queue)
+
+    job = database.jobs.find_one()
+    assert calls == [{"n": 1}]
+    assert job["status"] == "queued" and job["attempts"] == 1
+    assert "SMTP down" in job["last_error"]
+    # backoff_seconds=10 with jitter between 0.5 and 1.5
+    assert server.parse_datetime(job["run_at"]) >= before + timedelta(seconds=5)
+    assert client.portal.call(queue._claim) is None
+
+
+def test_job_is_dead_lettered_after_max_attempts(api, database):
+    client, _, _ = api
+    queue, calls = _queue(max_attempts=2), []
+    queue.handler("flaky")(_failing(calls))
+    client.portal.call(queue.enqueue, "flaky", {"n": 1})
+
+    _claim_and_run(client, queue)
+    _make_due(database)
+    _claim_and_run(client, queue)
+
+    assert len(calls) == 2
+    assert database.jobs.count_documents({}) == 0
+    dead = database.jobs_dead_letter.find_one()
+    assert dead["status"] == "dead" and dead["attempts"] == 2
+
+
+def test_expired_lease_is_reclaimed(api, database):
+    client, _, _ = api
+    queue, calls = _queue(), []
+
+    async def handler(payload):
+        calls.append(payload)
+    queue.handler("mail")(handler)
+    client.portal.call(queue.enqueue, "mail", {"n": 1})
+
+    # The first worker claims the job and dies
+    assert client.portal.call(queue._claim)["attempts"] == 1
+    assert client.portal.call(queue._claim) is None
+    database.jobs.update_many({}, {"$set": {"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+
+    assert _claim_and_run(client, queue)["attempts"] == 2
+    assert calls == [{"n": 1}]
+    assert database.jobs.find_one()["status"] == "done"
+
+
+def test_reclaimed_last_attempt_is_not_run_again(api, database):
+    client, _, _ = api
+    queue, calls = _queue(max_attempts=1), []
+    queue.handler("flaky")(_failing(calls))
+    client.portal.call(queue.enqueue, "flaky", {"n": 1})
+
+    client.portal.call(queue._claim)
+    database.jobs.update_many({}, {"$set": {"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)}})
+    _claim_and_run(client, queue)
+
+    assert calls == []
+    assert database.jobs.count_documents({}) == 0
+    assert database.jobs_dead_letter.find_one()["attempts"] == 1
+
+
+def test_mail_job_reaches_the_smtp_sink(api, database, monkeypatch):
+    client, _, _ = api
+    sent = []
+    monkeypatch.setattr(server, "_send_smtp", sent.append)
+
+    client.portal.call(server.notify_by_email, "buerger@example.de", "Antwort", "Hallo", "leitung@example.de")
+    _claim_and_run(client, server.job_queue)
+
+    assert len(sent) == 1
+    assert sent[0]["To"] == "buerger@example.de"
+    assert sent[0]["Reply-To"] == "leitung@example.de"
+    assert sent[0]["Message-ID"] == database.jobs.find_one()["payload"]["message_id"]
+    assert database.jobs.find_one()["status"] == "done"
+
+
+def test_refused_recipient_is_dead_lettered_at_once(api, database, monkeypatch):
+    client, _, _ = api
+
+    def refuse(message):
+        raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"No such user")})
+    monkeypatch.setattr(server, "_send_smtp", refuse)
+
+    client.portal.call(server.notify_by_email, "niemand@example.de", "Antwort", "Hallo")
+    _claim_and_run(client, server.job_queue)
+
+    assert database.jobs.count_documents({}) == 0
+    assert database.jobs_dead_letter.find_one()["attempts"] == 1
+
+
+def test_report_update_mails_only_a_new_response(api, database):
+    client, headers, _ = api
+    report_id = client.post("/api/reports", json=REPORT).json()["id"]
+
+    def update(**fields):
+        response = client.put(f"/api/admin/reports/{report_id}", json=fields, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    update(admin_response="Wir kümmern uns.")
+    assert update(status="in_progress", admin_response="Wir kümmern uns.")["status"] == "in_progress"
+    assert database.jobs.count_documents({"type": "send_email"}) == 1
+
+    update(admin_response="Fall abgeschlossen.")
+    assert database.jobs.count_documents({"type": "send_email"}) == 2
+
+
+def test_report_update_survives_a_failed_enqueue(api, database, monkeypatch):
+    client, headers, _ = api
+    report_id = client.post("/api/reports", json=REPORT).json()["id"]
+
+    async def unavailable(*args, **kwargs):
+        raise PyMongoError("jobs collection unavailable")
+    monkeypatch.setattr(server.job_queue, "enqueue", unavailable)
+
+    response = client.put(f"/api/admin/reports/{report_id}", json={"admin_response": "Erledigt."}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["admin_response"] == "Erledigt."
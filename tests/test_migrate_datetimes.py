@@ -0,0 +1,93 @@
+"""Online migration of ISO-string datetimes to BSON dates.
+
+Needs a mongod at MONGO_URL (default mongodb://localhost:27017); skipped
+without one.
+"""
+import os
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import migrate_datetimes
+import server
+
+COLLECTION = "migration_test"
+FIELDS = ["created_at", "updated_at"]
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        yield client, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.fixture
+def database(api):
+    client, database = api
+    database[COLLECTION].drop()
+    database.migrations.delete_many({})
+    return database
+
+
+def _migrate(client, batch_size=2):
+    return client.portal.call(migrate_datetimes.migrate_collection, COLLECTION, FIELDS, batch_size, 0)
+
+
+def test_string_dates_become_bson_dates(api, database):
+    client, _ = api
+    native = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    database[COLLECTION].insert_many([
+        {"id": "a", "created_at": "2024-05-01T12:00:00+00:00", "updated_at": None},
+        {"id": "b", "created_at": "2024-05-02T08:30:00Z", "updated_at": "2024-05-03T09:00:00"},
+        {"id": "c", "created_at": native, "updated_at": native},
+    ])
+
+    assert _migrate(client) == 2
+
+    documents = {doc["id"]: doc for doc in database[COLLECTION].find()}
+    assert server.parse_datetime(documents["a"]["created_at"]) == datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert documents["a"]["updated_at"] is None
+    assert server.parse_datetime(documents["b"]["created_at"]) == datetime(2024, 5, 2, 8, 30, tzinfo=timezone.utc)
+    # Naive legacy strings are taken as UTC
+    assert server.parse_datetime(documents["b"]["updated_at"]) == datetime(2024, 5, 3, 9, 0, tzinfo=timezone.utc)
+    state = database.migrations.find_one({"_id": migrate_datetimes.MIGRATION_ID})
+    assert state["migrated"][COLLECTION] == 2
+    assert COLLECTION not in state.get("checkpoints", {})
+
+
+def test_unparseable_values_are_left_alone(api, database):
+    client, _ = api
+    database[COLLECTION].insert_many([
+        {"id": "a", "created_at": "gestern", "updated_at": "2024-05-03T09:00:00Z"},
+    ])
+
+    assert _migrate(client) == 1
+
+    document = database[COLLECTION].find_one({"id": "a"})
+    assert document["created_at"] == "gestern"
+    assert server.parse_datetime(document["updated_at"]) == datetime(2024, 5, 3, 9, 0, tzinfo=timezone.utc)
+
+
+def test_resumes_after_the_checkpoint(api, database):
+    client, _ = api
+    database[COLLECTION].insert_many([{"id": str(index), "created_at": "2024-05-01T12:00:00Z"} for index in range(4)])
+    first_two = [doc["_id"] for doc in database[COLLECTION].find().sort("_id", 1).limit(2)]
+    database.migrations.insert_one({"_id": migrate_datetimes.MIGRATION_ID, "checkpoints": {COLLECTION: first_two[-1]}})
+
+    assert _migrate(client) == 2
+
+    still_strings = [doc["_id"] for doc in database[COLLECTION].find({"created_at": {"$type": "string"}}).sort("_id", 1)]
+    assert still_strings == first_two
+    # The checkpoint is cleared at the end, so the next run picks up the rest
+    assert _migrate(client) == 2
+    assert database[COLLECTION].count_documents({"created_at": {"$type": "string"}}) == 0
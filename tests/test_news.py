@@ -0,0 +1,82 @@
+"""News list with excerpts only, and the detail endpoint with the content.
+
+The excerpt tests run anywhere; the endpoint tests need a mongod at
+MONGO_URL (default mongodb://localhost:27017) and are skipped without one.
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+CONTENT = "Die Stadtwache sucht Verstärkung. " * 20
+
+
+def test_short_content_is_its_own_excerpt():
+    assert server.make_excerpt("  Kurze\n Meldung  ") == "Kurze Meldung"
+
+
+def test_long_content_is_cut_at_a_word_boundary():
+    excerpt = server.make_excerpt(CONTENT, length=50)
+    assert excerpt == "Die Stadtwache sucht Verstärkung. Die Stadtwache…"
+    assert len(excerpt) <= 51
+
+
+def test_summary_projection_leaves_out_the_content():
+    assert "content" not in server.NEWS_SUMMARY_PROJECTION
+    assert {"id", "title", "excerpt", "date"} <= server.NEWS_SUMMARY_PROJECTION.keys()
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json={"username": "admin", "password": "admin123"}).json()["access_token"]
+        yield client, {"Authorization": f"Bearer {token}"}
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+def _create(client, headers, **fields):
+    response = client.post("/api/admin/news", data={"title": "Neu", "content": CONTENT, **fields}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_list_has_excerpts_and_detail_has_content(api):
+    client, headers = api
+    news = _create(client, headers)
+
+    listed = next(item for item in client.get("/api/news").json() if item["id"] == news["id"])
+    assert "content" not in listed
+    assert listed["excerpt"] == server.make_excerpt(CONTENT)
+
+    detail = client.get(f"/api/news/{news['id']}")
+    assert detail.status_code == 200
+    assert detail.json()["content"] == CONTENT
+
+
+def test_unpublished_news_has_no_detail(api):
+    client, headers = api
+    news = _create(client, headers, published="false")
+    assert client.get(f"/api/news/{news['id']}").status_code == 404
+
+
+def test_new_content_regenerates_only_a_generated_excerpt(api):
+    client, headers = api
+    generated = _create(client, headers)
+    written = _create(client, headers, excerpt="Von Hand geschrieben")
+
+    for news in (generated, written):
+        response = client.put(f"/api/admin/news/{news['id']}", json={"content": "Ganz neuer Text"}, headers=headers)
+        assert response.status_code == 200
+
+    assert client.get(f"/api/news/{generated['id']}").json()["excerpt"] == "Ganz neuer Text"
+    assert client.get(f"/api/news/{written['id']}").json()["excerpt"] == "Von Hand geschrieben"
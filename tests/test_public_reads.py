@@ -0,0 +1,32 @@
+"""Routing of public content reads between secondaries and the primary.
+
+No query is sent, so these tests need no mongod.
+"""
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def no_page_refresh(monkeypatch):
+    # Re-rendering snapshots needs a running event loop
+    monkeypatch.setattr(server.page_snapshots, "refresh_later", lambda collection_name: None)
+
+
+def test_reads_go_to_the_primary_right_after_an_admin_write(monkeypatch):
+    monkeypatch.setattr(server, "last_public_writes", {})
+    assert server.public_database("services") is server.public_db
+
+    server.invalidate_public_cache("services")
+
+    assert server.public_database("services") is server.db
+    assert server.public_database("team") is server.public_db
+
+
+def test_reads_return_to_secondaries_after_the_window(monkeypatch):
+    monkeypatch.setattr(server, "last_public_writes", {})
+    server.invalidate_public_cache("services")
+
+    monkeypatch.setattr(server, "PUBLIC_READ_PRIMARY_AFTER_WRITE_SECONDS", 0)
+
+    assert server.public_database("services") is server.public_db
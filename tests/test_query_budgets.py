@@ -0,0 +1,250 @@
+"""MongoDB round-trip budgets per route.
+
+Every route must declare the maximum number of MongoDB commands one request
+may issue. The count comes from the server's CommandMonitor via the
+``mongo-ops`` entry of the Server-Timing header, so an extra query (an
+update_one + find_one pair, an N+1 loop) fails here before it ships.
+
+The declaration check always runs; exercising the routes needs a mongod at
+MONGO_URL (default mongodb://localhost:27017) and is skipped without one.
+"""
+import os
+import re
+import uuid
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+# Maximum MongoDB commands per request. Admin routes pay one lookup for
+# get_current_admin, responses to reporters, applicants and chat visitors one
+# insert for the notification job. DELETE routes are listed last because they
+# remove the seeded documents the other routes use.
+BUDGETS = {
+    "GET /metrics": 0,
+    "GET /api/": 0,
+    "GET /api/homepage": 1,
+    "GET /api/services": 1,
+    "GET /api/team": 1,
+    "GET /api/statistics": 1,
+    "GET /api/navigation": 1,
+    "POST /api/applications": 1,
+    "POST /api/feedback": 1,
+    "POST /api/reports": 1,
+    "GET /api/reports/types": 0,
+    "GET /api/about": 1,
+    "GET /api/chat-widget": 1,
+    "POST /api/chat/messages": 1,
+    "GET /api/chat/buttons": 1,
+    "GET /api/news": 1,
+    "GET /api/news/latest": 1,
+    "GET /api/news/featured": 1,
+    "GET /api/news/{news_id}": 1,
+    "GET /api/pages/home": 2,
+    "GET /api/pages/news": 1,
+    "GET /api/pages/news/{news_id}": 1,
+    "GET /api/pages/about": 1,
+    "GET /api/feeds/news.rss": 1,
+    "GET /api/feeds/news.atom": 1,
+    "GET /api/sitemap.xml": 1,
+    "GET /api/uploads/{filename}": 0,
+    "POST /api/admin/login": 1,
+    "GET /api/admin/me": 1,
+    "GET /api/admin/news": 2,
+    "POST /api/admin/news": 2,
+    "PUT /api/admin/news/{news_id}": 3,
+    "GET /api/admin/reports": 2,
+    "PUT /api/admin/reports/{report_id}": 3,
+    "PUT /api/admin/reports/{report_id}/status": 2,
+    "GET /api/admin/reports/stats": 4,
+    "GET /api/admin/about": 2,
+    "PUT /api/admin/about": 2,
+    "GET /api/admin/chat/messages": 2,
+    "PUT /api/admin/chat/messages/{message_id}/respond": 3,
+    "GET /api/admin/chat/stats": 3,
+    "GET /api/admin/chat/buttons": 2,
+    "POST /api/admin/chat/buttons": 2,
+    "PUT /api/admin/chat/buttons/{button_id}": 2,
+    "GET /api/admin/chat-widget": 2,
+    "PUT /api/admin/chat-widget": 2,
+    "GET /api/admin/applications": 2,
+    "PUT /api/admin/applications/{application_id}/respond": 3,
+    "GET /api/admin/feedback": 2,
+    "PUT /api/admin/feedback/{feedback_id}/respond": 2,
+    "GET /api/admin/homepage": 2,
+    "PUT /api/admin/homepage": 2,
+    "GET /api/admin/services": 2,
+    "POST /api/admin/services": 2,
+    "PUT /api/admin/services/{service_id}": 2,
+    "GET /api/admin/team": 2,
+    "POST /api/admin/team": 2,
+    "PUT /api/admin/team/{member_id}": 2,
+    "GET /api/admin/statistics": 2,
+    "POST /api/admin/statistics": 2,
+    "PUT /api/admin/statistics/{stat_id}": 2,
+    "GET /api/admin/navigation": 2,
+    "PUT /api/admin/navigation": 5,
+    "GET /api/admin/database/collections": 2,
+    "POST /api/admin/database/query": 2,
+    "POST /api/admin/database/aggregate": 2,
+    "GET /api/admin/traces": 2,
+    "POST /api/admin/events/ticket": 2,
+    "GET /api/admin/write-batches/stats": 1,
+    "GET /api/admin/jobs/stats": 3,
+    "GET /api/admin/jobs/dead-letter": 2,
+    "GET /api/admin/spool/stats": 1,
+    "POST /api/admin/jobs/dead-letter/{job_id}/retry": 3,
+    "DELETE /api/admin/news/{news_id}": 3,
+    "DELETE /api/admin/reports/{report_id}": 3,
+    "DELETE /api/admin/chat/buttons/{button_id}": 3,
+    "DELETE /api/admin/services/{service_id}": 3,
+    "DELETE /api/admin/team/{member_id}": 3,
+    "DELETE /api/admin/statistics/{stat_id}": 3,
+}
+
+# Routes without a fixed budget, with the reason
+UNBOUNDED = {
+    "GET /api/admin/database/stats": "one count per collection",
+    "GET /api/admin/events": "long-lived event stream",
+    "POST /api/admin/archive/run": "one round of queries per archived batch",
+    "POST /api/admin/uploads/sweep": "one lookup per referencing field and batch of files",
+    "POST /api/admin/spool/replay": "one bulk write per collection and spooled segment",
+}
+
+REPORT = {
+    "incident_type": "Diebstahl",
+    "description": "Fahrrad entwendet",
+    "location": "Hauptstraße 1",
+    "incident_date": "2024-05-01",
+    "incident_time": "14:30",
+    "reporter_name": "Test",
+    "reporter_email": "test@example.de",
+    "reporter_phone": "123",
+}
+FEEDBACK = {"name": "Test", "email": "test@example.de", "subject": "Lob", "message": "Danke", "rating": 5}
+CHAT_MESSAGE = {"visitor_name": "Test", "visitor_email": "test@example.de", "message": "Hallo"}
+APPLICATION = {"name": "Test", "email": "test@example.de", "phone": "123", "position": "Test", "message": "Bewerbung"}
+CV_FILE = {"cv_file": ("cv.pdf", b"%PDF-1.4 test", "application/pdf")}
+
+REQUEST_KWARGS = {
+    "POST /api/applications": {"data": APPLICATION, "files": CV_FILE},
+    "POST /api/feedback": {"json": FEEDBACK},
+    "POST /api/reports": {"json": REPORT},
+    "POST /api/chat/messages": {"json": CHAT_MESSAGE},
+    "POST /api/admin/login": {"json": {"username": "admin", "password": "admin123"}},
+    "POST /api/admin/news": {"data": {"title": "Budget", "content": "Inhalt"}},
+    "PUT /api/admin/news/{news_id}": {"json": {"title": "Budget 2"}},
+    "PUT /api/admin/reports/{report_id}": {"json": {"status": "under_review"}},
+    "PUT /api/admin/reports/{report_id}/status": {"data": {"status": "closed"}},
+    "PUT /api/admin/about": {"data": {"title": "Über uns"}},
+    "PUT /api/admin/chat/messages/{message_id}/respond": {"json": {"message_id": "{message_id}", "admin_response": "Danke"}},
+    "POST /api/admin/chat/buttons": {"json": {"label": "Mail", "action": "email", "value": "a@example.de"}},
+    "PUT /api/admin/chat/buttons/{button_id}": {"json": {"label": "Mail 2"}},
+    "PUT /api/admin/chat-widget": {"json": {"title": "Hilfe"}},
+    "PUT /api/admin/applications/{application_id}/respond": {"json": {
+        "application_id": "{application_id}", "status": "reviewed", "admin_response": "Danke", "admin_email": "hr@example.de",
+    }},
+    "PUT /api/admin/feedback/{feedback_id}/respond": {"data": {"admin_response": "Danke"}},
+    "PUT /api/admin/homepage": {"data": {"hero_title": "Stadtwache"}},
+    "POST /api/admin/services": {"data": {"title": "Dienst", "description": "Beschreibung"}},
+    "PUT /api/admin/services/{service_id}": {"json": {"title": "Dienst 2"}},
+    "POST /api/admin/team": {"data": {"name": "Name", "position": "Position"}},
+    "PUT /api/admin/team/{member_id}": {"json": {"name": "Name 2"}},
+    "POST /api/admin/statistics": {"json": {"title": "Zahl", "value": "1"}},
+    "PUT /api/admin/statistics/{stat_id}": {"json": {"value": "2"}},
+    "PUT /api/admin/navigation": {"json": {"items": [{"label": "Startseite", "section": "home"}]}},
+    "POST /api/admin/database/query": {"json": {"collection": "reports", "query": {}}},
+    "POST /api/admin/database/aggregate": {"json": {"collection": "reports", "pipeline": [{"$match": {}}]}},
+}
+
+MONGO_OPS = re.compile(r'mongo-ops;desc="(\d+)"')
+
+
+def _declared_routes():
+    return {
+        f"{method} {route.path}"
+        for route in server.app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+
+def test_every_route_declares_a_budget():
+    routes = _declared_routes()
+    missing = routes - BUDGETS.keys() - UNBOUNDED.keys()
+    stale = (BUDGETS.keys() | UNBOUNDED.keys()) - routes
+    assert not missing, f"Declare a Mongo round-trip budget for: {sorted(missing)}"
+    assert not stale, f"Budgets declared for routes that no longer exist: {sorted(stale)}"
+
+
+def _fill(value, ids):
+    if isinstance(value, str):
+        return value.format(**ids) if "{" in value else value
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    return value
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    server.UPLOAD_DIR = tmp_path_factory.mktemp("uploads")
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/admin/login", json=REQUEST_KWARGS["POST /api/admin/login"]["json"]).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        application = client.post("/api/applications", data=APPLICATION, files=CV_FILE).json()
+        ids = {
+            "report_id": client.post("/api/reports", json=REPORT).json()["id"],
+            "feedback_id": client.post("/api/feedback", json=FEEDBACK).json()["id"],
+            "message_id": client.post("/api/chat/messages", json=CHAT_MESSAGE).json()["id"],
+            "application_id": application["id"],
+            "filename": application["cv_filename"],
+            "news_id": client.post("/api/admin/news", data={"title": "Seed", "content": "Seed"}, headers=headers).json()["id"],
+            "button_id": client.get("/api/admin/chat/buttons", headers=headers).json()[0]["id"],
+            "service_id": client.get("/api/admin/services", headers=headers).json()[0]["id"],
+            "member_id": client.get("/api/admin/team", headers=headers).json()[0]["id"],
+            "stat_id": client.get("/api/admin/statistics", headers=headers).json()[0]["id"],
+        }
+        ids["job_id"] = str(uuid.uuid4())
+        MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]].jobs_dead_letter.insert_one(
+            {"id": ids["job_id"], "type": "budget", "payload": {}, "status": "dead", "attempts": 1, "max_attempts": 1}
+        )
+        # Create the default singleton documents outside the measured requests
+        for path in ["/api/homepage", "/api/about", "/api/chat-widget"]:
+            client.get(path)
+
+        yield client, headers, ids
+
+        MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.mark.parametrize("route", list(BUDGETS))
+def test_route_stays_within_budget(api, route):
+    client, headers, ids = api
+    method, template = route.split(" ", 1)
+    kwargs = _fill(REQUEST_KWARGS.get(route, {}), ids)
+    if template.startswith("/api/admin") and template != "/api/admin/login":
+        kwargs["headers"] = headers
+
+    # Public reads must pay their queries here, not be answered from what the
+    # fixture or an earlier route left in the caches
+    server.public_cache.clear()
+    server.page_snapshots.clear()
+    response = client.request(method, template.format(**ids), **kwargs)
+    assert response.status_code < 400, response.text
+
+    match = MONGO_OPS.search(response.headers.get("server-timing", ""))
+    operations = int(match.group(1)) if match else 0
+    assert operations <= BUDGETS[route], f"{route} issued {operations} MongoDB commands, budget is {BUDGETS[route]}"
@@ -0,0 +1,110 @@
+"""Coalescing of concurrent loads for the same public cache key.
+
+Loads are plain coroutines, so these tests need no mongod.
+"""
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+import server
+
+
+def _counting_load(calls, result="body", delay=0.01):
+    async def load():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return load
+
+
+def test_concurrent_calls_share_one_load():
+    flights, calls = server.SingleFlight("test"), []
+
+    async def run():
+        load = _counting_load(calls)
+        results = await asyncio.gather(*(flights.do("key", load) for _ in range(10)))
+        return results, flights.in_flight()
+
+    results, in_flight = asyncio.run(run())
+    assert calls == ["body"]
+    assert results == ["body"] * 10
+    assert in_flight == 0
+
+
+def test_different_keys_load_separately():
+    flights, calls = server.SingleFlight("test"), []
+
+    async def run():
+        return await asyncio.gather(flights.do("a", _counting_load(calls, "a")), flights.do("b", _counting_load(calls, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_failure_reaches_every_caller_and_is_not_kept():
+    flights, calls = server.SingleFlight("test"), []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def run():
+        results = await asyncio.gather(*(flights.do("key", failing) for _ in range(3)), return_exceptions=True)
+        again = await flights.do("key", _counting_load(calls))
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The next call after the failure starts a fresh load
+    assert again == "body" and calls == [1, "body"]
+
+
+def test_cancelled_caller_does_not_cancel_the_load():
+    flights, calls = server.SingleFlight("test"), []
+
+    async def run():
+        load = _counting_load(calls, delay=0.05)
+        leader = asyncio.ensure_future(flights.do("key", load))
+        follower = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "body"
+    assert calls == ["body"]
+
+
+def test_forget_starts_a_new_load_for_later_callers():
+    flights, calls = server.SingleFlight("test"), []
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("key", _counting_load(calls, "old", delay=0.05)))
+        await asyncio.sleep(0)
+        flights.forget(lambda key: key == "key")
+        second = await flights.do("key", _counting_load(calls, "new"))
+        return await first, second
+
+    assert asyncio.run(run()) == ("old", "new")
+    assert calls == ["old", "new"]
+
+
+@pytest.fixture
+def public_key():
+    key = ("single_flight_test",)
+    yield key
+    server.public_cache.invalidate(lambda cached: cached == key)
+
+
+def test_concurrent_cache_misses_load_once(public_key):
+    calls = []
+    request = Request({"type": "http", "headers": []})
+
+    async def run():
+        load = _counting_load(calls, {"title": "Streifendienst"})
+        return await asyncio.gather(*(server.cached_public_response(request, public_key, load) for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert len(calls) == 1
+    assert {response.body for response in responses} == {b'{"title":"Streifendienst"}'}
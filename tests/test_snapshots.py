@@ -0,0 +1,89 @@
+"""Pre-rendered HTML snapshots: validators, conditional requests and rendering.
+
+The snapshots are built from in-memory models, so these tests need no
+mongod.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from starlette.datastructures import Headers
+
+import server
+from snapshots import Snapshot, render_about, render_home, render_news_detail
+
+UPDATED = datetime(2024, 5, 1, 12, 0, 30, 500000, tzinfo=timezone.utc)
+
+
+def _snapshot(body=b"<p>Hallo</p>"):
+    return Snapshot(body, "text/html; charset=utf-8", UPDATED)
+
+
+def _get(snapshot, **headers):
+    return snapshot.response(Headers({key.replace("_", "-"): value for key, value in headers.items()}))
+
+
+def test_full_response_carries_validators():
+    snapshot = _snapshot()
+    response = _get(snapshot)
+    assert response.status_code == 200
+    assert response.headers["etag"] == snapshot.etag
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:00:30 GMT"
+    assert response.headers["cache-control"] == "no-cache"
+
+
+def test_matching_etag_answers_304():
+    snapshot = _snapshot()
+    response = _get(snapshot, if_none_match=f'"other", W/{snapshot.etag}')
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == snapshot.etag
+    assert _get(snapshot, if_none_match="*").status_code == 304
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    snapshot = _snapshot()
+    later = format_datetime(UPDATED + timedelta(days=1), usegmt=True)
+    assert _get(snapshot, if_none_match='"other"', if_modified_since=later).status_code == 200
+
+
+def test_if_modified_since_uses_second_precision():
+    snapshot = _snapshot()
+    assert _get(snapshot, if_modified_since="Wed, 01 May 2024 12:00:30 GMT").status_code == 304
+    assert _get(snapshot, if_modified_since="Wed, 01 May 2024 12:00:29 GMT").status_code == 200
+    assert _get(snapshot, if_modified_since="gestern").status_code == 200
+
+
+def test_unchanged_render_keeps_the_previous_validators():
+    previous = _snapshot()
+    assert Snapshot(b"<p>Hallo</p>", "text/html").replaces(previous) is previous
+    changed = Snapshot(b"<p>Neu</p>", "text/html")
+    assert changed.replaces(previous) is changed
+
+
+def test_pages_escape_content():
+    homepage = server.HomepageContent(hero_title="<script>alert(1)</script>")
+    news = server.NewsItem(title="A & B", content="Zeile 1\nZeile 2", excerpt="Kurz")
+    about = server.AboutPage(mission="<b>Schutz</b>")
+
+    assert b"<script>alert" not in render_home(homepage, [], "/api/pages")
+    assert b"Zeile 1<br>\nZeile 2" in render_news_detail(news, "/api/pages", "Stadtwache")
+    assert b"A &amp; B" in render_news_detail(news, "/api/pages", "Stadtwache")
+    assert b"&lt;b&gt;Schutz&lt;/b&gt;" in render_about(about, "/api/pages", "Stadtwache")
+
+
+def test_write_marks_only_pages_built_from_the_collection():
+    pages = server.PageSnapshots("Stadtwache", "https://stadtwache.example", 60, 10, 20)
+    for name in ["home", "news", "about", "rss", "news/1"]:
+        pages._pages[name] = _snapshot()
+
+    async def mark(collection_name):
+        pages.refresh_later(collection_name)
+        stale = set(pages._stale)
+        pages.stop()
+        pages._stale.clear()
+        return stale
+
+    assert asyncio.run(mark("about")) == {"about"}
+    assert asyncio.run(mark("news")) == {"home", "news", "rss", "news/1"}
+    assert asyncio.run(mark("team")) == set()
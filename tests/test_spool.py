@@ -0,0 +1,141 @@
+"""Local submission spool and its replay into MongoDB.
+
+The Spool tests run anywhere; the replay tests need a mongod at MONGO_URL
+(default mongodb://localhost:27017) and are skipped without one.
+"""
+import os
+
+import pytest
+from bson import json_util
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+import server
+from spool import Spool
+
+REPORT = {
+    "incident_type": "Diebstahl",
+    "description": "Fahrrad entwendet",
+    "location": "Hauptstraße 1",
+    "incident_date": "2024-05-01",
+    "incident_time": "14:30",
+    "reporter_name": "Test",
+    "reporter_email": "test@example.de",
+    "reporter_phone": "123",
+}
+
+
+def _record(collection_name, document):
+    return json_util.dumps({"collection": collection_name, "document": document}).encode()
+
+
+def _report_document(**fields):
+    return server.prepare_for_mongo(server.Report(**REPORT, **fields).dict())
+
+
+def test_records_survive_a_reopened_spool(tmp_path):
+    spool = Spool(tmp_path)
+    spool.append(b"first")
+    spool.append(b"second")
+    spool.close()
+
+    [segment] = Spool(tmp_path).seal()
+    assert Spool.read(segment) == [b"first", b"second"]
+
+
+def test_full_segment_is_rotated(tmp_path):
+    spool = Spool(tmp_path, segment_bytes=4)
+    for record in (b"one", b"two", b"three"):
+        spool.append(record)
+
+    segments = spool.seal()
+    assert len(segments) == 3
+    assert [Spool.read(path) for path in segments] == [[b"one"], [b"two"], [b"three"]]
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    segment = tmp_path / f"{Spool.prefix}00000000000000000001{Spool.suffix}"
+    segment.write_bytes(b"complete\n\n{\"collection\": \"rep")
+
+    assert Spool.read(segment) == [b"complete"]
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        yield client, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    spool = Spool(tmp_path)
+    monkeypatch.setattr(server, "submission_spool", spool)
+    return spool
+
+
+@pytest.fixture
+def events():
+    queue = server.admin_events.subscribe()
+    yield queue
+    server.admin_events.unsubscribe(queue)
+
+
+def _published(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait().decode())
+    return messages
+
+
+def test_spooled_submission_is_replayed(api, spool, events, monkeypatch):
+    client, database = api
+
+    async def unreachable(collection_name, document):
+        raise ConnectionFailure("primary unreachable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(server.insert_batcher, "insert", unreachable)
+        response = client.post("/api/reports", json=REPORT)
+    assert response.status_code == 202
+    report_id = response.json()["id"]
+    assert database.reports.find_one({"id": report_id}) is None
+    assert not _published(events)
+
+    assert client.portal.call(server.submission_replayer.run) == {"replayed": 1, "duplicates": 0}
+    assert database.reports.find_one({"id": report_id})["description"] == REPORT["description"]
+    assert spool.segments() == []
+    assert [message for message in _published(events) if report_id in message]
+
+
+def test_replay_keeps_an_insert_that_landed_late(api, spool, events):
+    client, database = api
+    document = _report_document()
+    database.reports.insert_one({**document, "status": "under_review"})
+    spool.append(_record("reports", document))
+
+    assert client.portal.call(server.submission_replayer.run) == {"replayed": 0, "duplicates": 1}
+    assert database.reports.count_documents({"id": document["id"]}) == 1
+    assert database.reports.find_one({"id": document["id"]})["status"] == "under_review"
+    # The late original insert published nothing, so the replay does
+    assert [message for message in _published(events) if document["id"] in message]
+
+
+def test_replay_skips_corrupted_and_torn_records(api, spool):
+    client, database = api
+    document = _report_document()
+    segment = spool.directory / f"{Spool.prefix}00000000000000000001{Spool.suffix}"
+    spool.directory.mkdir(parents=True, exist_ok=True)
+    torn = _record("reports", _report_document())
+    segment.write_bytes(b"not json\n" + _record("reports", document) + b"\n" + torn[:len(torn) // 2])
+
+    assert client.portal.call(server.submission_replayer.run) == {"replayed": 1, "duplicates": 0}
+    assert database.reports.find_one({"id": document["id"]}) is not None
+    assert spool.segments() == []
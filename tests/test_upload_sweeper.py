@@ -0,0 +1,86 @@
+"""The sweeper for uploads no document references.
+
+Needs a mongod at MONGO_URL (default mongodb://localhost:27017); skipped
+without one. Uploads go to a temporary directory, never backend/uploads.
+"""
+import os
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+import server
+
+
+@pytest.fixture(scope="module")
+def api():
+    try:
+        MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000).admin.command("ping")
+    except PyMongoError:
+        pytest.skip("No MongoDB reachable at MONGO_URL")
+
+    with TestClient(server.app) as client:
+        yield client, MongoClient(os.environ["MONGO_URL"])[os.environ["DB_NAME"]]
+
+    MongoClient(os.environ["MONGO_URL"]).drop_database(os.environ["DB_NAME"])
+
+
+@pytest.fixture
+def uploads(api, tmp_path, monkeypatch):
+    _, database = api
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(server, "SPOOL_DIRS", [])
+    database.news.delete_many({})
+    database.applications.delete_many({})
+    return tmp_path
+
+
+def _upload(directory, prefix="", age_seconds=7200):
+    path = directory / f"{prefix}{uuid.uuid4()}.jpg"
+    path.write_bytes(b"jpeg")
+    past = time.time() - age_seconds
+    os.utime(path, (past, past))
+    return path
+
+
+def _sweep(client, dry_run=None, grace_seconds=3600):
+    return client.portal.call(server.UploadSweeper(100, grace_seconds, 0).run, dry_run)
+
+
+def test_referenced_uploads_are_kept(api, uploads):
+    client, database = api
+    image = _upload(uploads)
+    cv = _upload(uploads, "cv_")
+    orphan = _upload(uploads)
+    database.news.insert_one({"id": "n", "title": "Neu", "image": image.name})
+    database.applications.insert_one({"id": "a", "name": "Test", "cv_filename": cv.name})
+
+    result = _sweep(client)
+
+    assert result["scanned"] == 3 and result["deleted"] == 1
+    assert image.exists() and cv.exists()
+    assert not orphan.exists()
+
+
+def test_recent_and_foreign_files_are_kept(api, uploads):
+    client, _ = api
+    recent = _upload(uploads, age_seconds=60)
+    foreign = uploads / "logo.png"
+    foreign.write_bytes(b"png")
+
+    assert _sweep(client)["scanned"] == 0
+    assert recent.exists() and foreign.exists()
+
+
+def test_dry_run_only_reports_orphans(api, uploads):
+    client, _ = api
+    orphan = _upload(uploads)
+
+    result = _sweep(client, dry_run=True)
+
+    assert result == {"scanned": 1, "unreferenced": 1, "deleted": 0, "dry_run": True}
+    assert orphan.exists()
+
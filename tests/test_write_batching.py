@@ -0,0 +1,99 @@
+"""Group-commit of public submissions and how batch errors reach callers.
+
+MongoDB's answers are replayed by a fake collection, so these tests need no
+mongod.
+"""
+import asyncio
+
+from pymongo.errors import BulkWriteError, WriteConcernError
+
+import server
+
+CONCERN_ERROR = {"code": 64, "errmsg": "waiting for replication timed out"}
+DUPLICATE = {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"}
+
+
+class FakeCollection:
+    def __init__(self, error=None):
+        self.error = error
+        self.batches = []
+
+    def with_options(self, **options):
+        return self
+
+    async def insert_many(self, documents, ordered=True):
+        self.batches.append(documents)
+        if self.error:
+            raise self.error
+
+
+class FakeDatabase:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getitem__(self, name):
+        return self.collection
+
+
+def _insert_all(monkeypatch, error, count=3):
+    collection = FakeCollection(error)
+    monkeypatch.setattr(server, "db", FakeDatabase(collection))
+    batcher = server.InsertBatcher(True, max_size=count, max_latency_ms=50)
+
+    async def run():
+        return await asyncio.gather(
+            *(batcher.insert("reports", {"id": str(index)}) for index in range(count)), return_exceptions=True
+        )
+
+    return collection, asyncio.run(run())
+
+
+def test_batch_is_written_with_one_insert(monkeypatch):
+    collection, results = _insert_all(monkeypatch, None)
+    assert results == [None, None, None]
+    assert len(collection.batches) == 1
+
+
+def test_write_error_fails_only_its_document(monkeypatch):
+    _, results = _insert_all(monkeypatch, BulkWriteError({"writeErrors": [DUPLICATE], "writeConcernErrors": []}))
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], BulkWriteError)
+
+
+def test_write_concern_error_is_spoolable(monkeypatch):
+    _, results = _insert_all(monkeypatch, BulkWriteError({"writeErrors": [], "writeConcernErrors": [CONCERN_ERROR]}))
+    assert all(isinstance(result, WriteConcernError) for result in results)
+    assert all(isinstance(result, server.SPOOLABLE_ERRORS) for result in results)
+
+
+def test_mixed_write_and_write_concern_errors(monkeypatch):
+    _, results = _insert_all(monkeypatch, BulkWriteError({"writeErrors": [DUPLICATE], "writeConcernErrors": [CONCERN_ERROR]}))
+    assert isinstance(results[0], WriteConcernError) and isinstance(results[2], WriteConcernError)
+    assert isinstance(results[1], BulkWriteError)
+    assert not isinstance(results[1], server.SPOOLABLE_ERRORS)
+
+
+def test_write_concern_error_without_spool_counts_as_stored(monkeypatch):
+    monkeypatch.setattr(server, "submission_spool", None)
+
+    async def unconfirmed(collection_name, document):
+        raise WriteConcernError(CONCERN_ERROR["errmsg"], CONCERN_ERROR["code"], CONCERN_ERROR)
+
+    monkeypatch.setattr(server.insert_batcher, "insert", unconfirmed)
+    response = server.Response()
+    assert asyncio.run(server.store_submission("reports", {"id": "r"}, response)) is True
+    assert response.status_code == 200
+
+
+def test_write_concern_error_with_spool_is_spooled(monkeypatch, tmp_path):
+    spool = server.Spool(tmp_path)
+    monkeypatch.setattr(server, "submission_spool", spool)
+
+    async def unconfirmed(collection_name, document):
+        raise WriteConcernError(CONCERN_ERROR["errmsg"], CONCERN_ERROR["code"], CONCERN_ERROR)
+
+    monkeypatch.setattr(server.insert_batcher, "insert", unconfirmed)
+    response = server.Response()
+    assert asyncio.run(server.store_submission("reports", {"id": "r"}, response)) is False
+    assert response.status_code == 202
+    assert len(spool.seal()) == 1